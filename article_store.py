@@ -0,0 +1,277 @@
+"""
+Article Store
+Compact SQLite archive of fetched and summarized articles with streaming reads
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+
+try:
+    from settings import load_settings
+    ARTICLE_STORE_PATH = load_settings().article_store_path
+except ImportError:
+    ARTICLE_STORE_PATH = "articles.db"
+
+# Files written by earlier versions (see migrate_json_files)
+LEGACY_JSON_FILES = ("fetched_articles.json", "summarized_articles.json")
+
+
+@dataclass(slots=True)
+class ArticleRecord:
+    """
+    One stored article
+
+    Slots keep each record small when a large archive is read into memory;
+    to_dict() gives the article dictionary used by the rest of the pipeline.
+    """
+    url: str
+    topic: str = ""
+    title: str = ""
+    description: str = ""
+    content: str = ""
+    published_at: str = ""
+    source: str = ""
+    relevance_score: float = None
+    summary: str = None
+
+    @classmethod
+    def from_dict(cls, article):
+        """Build a record from an article dictionary (unknown keys are ignored)"""
+        return cls(**{name: article[name] for name in _FIELD_NAMES if article.get(name) is not None})
+
+    def to_dict(self):
+        """Article dictionary without the fields that are not set"""
+        return {name: value for name, value in asdict(self).items() if value is not None}
+
+
+_FIELD_NAMES = tuple(field.name for field in fields(ArticleRecord))
+_COLUMNS = ", ".join(_FIELD_NAMES)
+
+
+class ArticleStore:
+    """
+    Archive of articles keyed by URL
+
+    Each save belongs to a batch (usually a run ID), and articles keep their
+    order within the batch, so the last batch can be read back exactly as
+    it was written. Storing an article again updates it; its summary is kept
+    unless a new one is given or the content changed. Reads stream rows in
+    chunks instead of loading the whole archive.
+    """
+
+    def __init__(self, path=ARTICLE_STORE_PATH):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                content TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                source TEXT NOT NULL,
+                relevance_score REAL,
+                summary TEXT,
+                batch TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_articles_topic ON articles (topic, published_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_articles_batch ON articles (batch, position)")
+        self._db.commit()
+
+    def add(self, articles, batch):
+        """
+        Store articles in one transaction
+
+        Args:
+            articles (iterable): Article dictionaries or ArticleRecords
+            batch (str): Batch the articles belong to (e.g. a run ID)
+
+        Returns:
+            int: Number of articles stored
+        """
+        now = time.time()
+        rows = []
+        for position, article in enumerate(articles):
+            record = article if isinstance(article, ArticleRecord) else ArticleRecord.from_dict(article)
+            if not record.url:
+                continue
+            rows.append((record.url, record.topic or "", record.title or "", record.description or "",
+                         record.content or "", record.published_at or "", record.source or "",
+                         record.relevance_score, record.summary, batch, position, now))
+        with self._lock:
+            self._db.executemany(f"""
+                INSERT INTO articles ({_COLUMNS}, batch, position, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    topic = excluded.topic,
+                    title = excluded.title,
+                    description = excluded.description,
+                    published_at = excluded.published_at,
+                    source = excluded.source,
+                    relevance_score = COALESCE(excluded.relevance_score, articles.relevance_score),
+                    summary = CASE
+                        WHEN excluded.summary IS NOT NULL THEN excluded.summary
+                        WHEN excluded.content = articles.content THEN articles.summary
+                    END,
+                    content = excluded.content,
+                    batch = excluded.batch,
+                    position = excluded.position,
+                    stored_at = excluded.stored_at
+            """, rows)
+            self._db.commit()
+        return len(rows)
+
+    def get(self, url):
+        """
+        Returns:
+            ArticleRecord or None: Stored article with this URL
+        """
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM articles WHERE url = ?", (url,)).fetchone()
+        return ArticleRecord(*row) if row else None
+
+    def iter_records(self, topic=None, since=None, until=None, batch=None, summarized=None, chunk_size=500):
+        """
+        Stream stored articles
+
+        Args:
+            topic (str): Only this topic
+            since (str): Only articles published at or after this ISO 8601 time
+            until (str): Only articles published before this ISO 8601 time
+            batch (str): Only this batch (in the order it was stored)
+            summarized (bool): Only articles with (True) or without (False) a summary
+            chunk_size (int): Rows fetched from SQLite at a time
+
+        Yields:
+            ArticleRecord: Matching articles, newest first (or in batch order)
+        """
+        conditions = []
+        params = []
+        for column, operator, value in (("topic", "=", topic), ("published_at", ">=", since),
+                                        ("published_at", "<", until), ("batch", "=", batch)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        if summarized is not None:
+            conditions.append("summary IS NOT NULL" if summarized else "summary IS NULL")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "position" if batch is not None else "published_at DESC"
+
+        # A separate cursor per read; the lock is only held while a chunk is fetched
+        with self._lock:
+            cursor = self._db.execute(f"SELECT {_COLUMNS} FROM articles {where} ORDER BY {order}", params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            for row in rows:
+                yield ArticleRecord(*row)
+
+    def load(self, **filters):
+        """
+        Read matching articles as dictionaries (same filters as iter_records)
+
+        Returns:
+            list: Article dictionaries
+        """
+        return [record.to_dict() for record in self.iter_records(**filters)]
+
+    def latest_batch(self):
+        """
+        Returns:
+            str or None: Batch stored most recently
+        """
+        with self._lock:
+            row = self._db.execute("SELECT batch FROM articles ORDER BY stored_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def migrate_json_files(store, paths=LEGACY_JSON_FILES):
+    """
+    Import article lists saved as JSON files by earlier versions
+
+    Files are imported in the order given, so summaries from
+    summarized_articles.json are added to the articles from
+    fetched_articles.json. Each file becomes its own batch, named after the
+    file's modification time.
+
+    Args:
+        store (ArticleStore): Store to import into
+        paths (iterable): JSON files holding lists of article dictionaries
+
+    Returns:
+        dict: path -> number of articles imported (missing files are skipped,
+            and files that are not valid JSON are reported and skipped)
+    """
+    imported = {}
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                articles = json.load(f)
+            modified = os.path.getmtime(path)
+        except FileNotFoundError:
+            continue
+        except json.JSONDecodeError as e:
+            print(f"⚠️  Skipping '{path}': not valid JSON ({e})")
+            continue
+        batch = time.strftime("%Y%m%d-%H%M%S", time.localtime(modified))
+        imported[path] = store.add(articles, batch)
+    return imported
+
+
+def main():
+    """
+    Inspect the article store or migrate the old JSON files into it
+    """
+    parser = argparse.ArgumentParser(description="Article store maintenance")
+    parser.add_argument("--migrate", nargs="*", metavar="FILE",
+                        help=f"import JSON article files (default: {' '.join(LEGACY_JSON_FILES)})")
+    parser.add_argument("--topic", help="list stored articles for a topic")
+    args = parser.parse_args()
+
+    store = ArticleStore()
+    try:
+        if args.migrate is not None:
+            imported = migrate_json_files(store, args.migrate or LEGACY_JSON_FILES)
+            if not imported:
+                print("No JSON article files found to migrate.")
+            for path, count in imported.items():
+                print(f"✓ Imported {count} articles from '{path}'")
+
+        if args.topic:
+            for record in store.iter_records(topic=args.topic):
+                print(f"{record.published_at}  {record.title[:70]}")
+                print(f"    {record.url}")
+
+        print(f"Articles stored in '{store.path}': {len(store)} (latest batch: {store.latest_batch()})")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,589 @@
+"""
+Async Newsletter Engine
+asyncio version of the whole pipeline so one worker can build many newsletters at once
+"""
+
+import asyncio
+import time
+
+import httpx
+from openai import APIConnectionError, AsyncOpenAI
+
+from bulk_email import message_limiter, reply_action, send_bulk_email
+from dedup import NearDuplicateIndex
+from metrics import METRICS
+from fetch_news import (
+    NEWS_API_URL,
+    NEWSAPI_BREAKER,
+    NEWSAPI_RETRY_POLICY,
+    NEWSAPI_RETRY_STATUSES,
+    NEWSAPI_TIMEOUT_SECONDS,
+    RESPONSE_CACHE,
+    acquire_quota,
+    apply_watermarks,
+    build_query_params,
+    cached_response,
+    fall_back,
+    format_articles,
+    paged_query,
+    plan_topic_queries,
+    select_unique_article,
+    split_query_results
+)
+from rate_limiter import RateLimiter
+from resilience import CircuitOpenError, DeadlineExceeded, RetryPolicy, call_with_retries_async, remaining_seconds
+from send_email import (
+    SMTP_MESSAGES_PER_MINUTE,
+    SMTP_PORT,
+    SMTP_SERVER,
+    SMTP_USE_TLS,
+    NewsletterTemplate,
+    build_message
+)
+from summarize_articles import (
+    ERROR_PREFIX,
+    OPENAI_BREAKER,
+    OPENAI_MAX_RETRIES,
+    PROMPT_VERSION,
+    SYSTEM_PROMPT,
+    OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_TOKENS_PER_MINUTE,
+    OPENAI_TIMEOUT_SECONDS,
+    ROUTER,
+    SUMMARY_STREAMING,
+    CompletionStream,
+    article_deadline,
+    build_prompt,
+    estimate_tokens,
+    record_usage,
+    request_timeout,
+    reusable_summary,
+    streamed_summary,
+    with_summary
+)
+from summary_cache import cache_key
+
+
+class StageLimits:
+    """
+    Concurrency limits shared by every newsletter running on one worker
+
+    However many newsletters run at once, at most `fetch` NewsAPI requests,
+    `summarize` OpenAI calls and `send` SMTP sessions are in flight.
+    """
+
+    def __init__(self, fetch=10, summarize=8, send=4):
+        self.fetch = asyncio.Semaphore(fetch)
+        self.summarize = asyncio.Semaphore(summarize)
+        self.send = asyncio.Semaphore(send)
+
+
+async def load_response_async(http, topic, params, limits):
+    """
+    Get a NewsAPI response without blocking the event loop
+
+    The response cache, quota counter, retries and circuit breaker are used
+    as in fetch_news.load_response; the cache and quota live in SQLite, so
+    they are read and updated in a worker thread.
+
+    Args:
+        http (httpx.AsyncClient): Shared HTTP client
+        topic (str): Topic being fetched (for messages)
+        params (dict): Query parameters from build_query_params()
+        limits (StageLimits): Shared concurrency limits
+
+    Returns:
+        tuple: (decoded response or None, request latency in seconds)
+    """
+    data, expired = await asyncio.to_thread(cached_response, topic, params)
+    latency = 0.0
+
+    async def attempt():
+        nonlocal latency
+        if not await asyncio.to_thread(acquire_quota, topic):
+            return None
+        async with limits.fetch:
+            started = time.perf_counter()
+            try:
+                response = await http.get(NEWS_API_URL, params=params, timeout=NEWSAPI_TIMEOUT_SECONDS)
+            finally:
+                elapsed = time.perf_counter() - started
+                latency += elapsed
+        METRICS.observe("request_seconds", elapsed, service="newsapi")
+        METRICS.increment("bytes_received_total", len(response.content), service="newsapi")
+        if response.status_code in NEWSAPI_RETRY_STATUSES:
+            raise httpx.HTTPStatusError(f"Status code {response.status_code}", request=response.request,
+                                        response=response)
+        return response
+
+    if data is None:
+        try:
+            response = await call_with_retries_async(attempt, "newsapi", (httpx.TransportError,),
+                                                     NEWSAPI_RETRY_STATUSES, NEWSAPI_RETRY_POLICY, NEWSAPI_BREAKER)
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            response = None
+            METRICS.increment("errors_total", service="newsapi")
+            print(f"Error fetching news for '{topic}': {e}")
+
+        if response is not None:
+            if response.status_code == 200:
+                data = response.json()
+                if RESPONSE_CACHE is not None:
+                    await asyncio.to_thread(RESPONSE_CACHE.store, NEWS_API_URL, params, data, response.headers)
+            else:
+                METRICS.increment("errors_total", service="newsapi")
+                if response.status_code == 429 and RESPONSE_CACHE is not None:
+                    # Stop asking for the rest of the day
+                    await asyncio.to_thread(RESPONSE_CACHE.exhaust_quota)
+                print(f"Error fetching news for '{topic}': Status code {response.status_code}")
+    if data is None:
+        data = await asyncio.to_thread(fall_back, topic, expired)
+    return data, latency
+
+
+async def fetch_topic_async(http, topic, api_key, max_articles, limits, watermarks=None):
+    """
+    Fetch one topic from NewsAPI without blocking the event loop
+
+    Args:
+        http (httpx.AsyncClient): Shared HTTP client
+        topic (str): The topic/keyword to search for
+        api_key (str): Your NewsAPI key
+        max_articles (int): Maximum number of articles to fetch
+        limits (StageLimits): Shared concurrency limits
+        watermarks (WatermarkStore): Optional per-topic watermarks
+
+    Returns:
+        tuple: (list of new articles for the topic, fetch latency in seconds)
+    """
+    since = watermarks.since(topic) if watermarks is not None else None
+    params = build_query_params(topic, api_key, max_articles, since)
+    data, latency = await load_response_async(http, topic, params, limits)
+    if data is None:
+        return [], latency
+
+    articles = format_articles(data.get("articles", []), topic)
+    return apply_watermarks(topic, articles, watermarks), latency
+
+
+async def fetch_query_async(http, query, api_key, max_articles, limits, watermarks=None):
+    """
+    Fetch every topic of one planned query (see fetch_news.fetch_query)
+
+    Args:
+        http (httpx.AsyncClient): Shared HTTP client
+        query (TopicQuery): Planned query
+        api_key (str): Your NewsAPI key
+        max_articles (int): Maximum number of articles per topic
+        limits (StageLimits): Shared concurrency limits
+        watermarks (WatermarkStore): Optional per-topic watermarks
+
+    Returns:
+        dict: topic -> (list of new articles, fetch latency in seconds)
+    """
+    if len(query.topics) == 1:
+        topic = query.topics[0]
+        return {topic: await fetch_topic_async(http, topic, api_key, max_articles, limits, watermarks)}
+
+    label = f"{len(query.topics)} topics ({query.topics[0]}, ...)"
+    latency = 0.0
+    pages = paged_query(query, max_articles)
+    while True:
+        params = build_query_params(query.q, api_key, pages.page_size, query.earliest, pages.page)
+        data, page_latency = await load_response_async(http, label, params, limits)
+        latency += page_latency
+        if not pages.add_page(data):
+            break
+    starved = pages.starved_topics()
+
+    results = {topic: (articles, latency) for topic, articles in
+               split_query_results(pages, max_articles, watermarks).items() if topic not in starved}
+    fetched = await asyncio.gather(*[
+        fetch_topic_async(http, topic, api_key, max_articles, limits, watermarks) for topic in starved
+    ])
+    results.update(zip(starved, fetched))
+    return results
+
+
+async def read_stream_async(stream, collector, deadline=None):
+    """
+    Read an AsyncStream of completion chunks into a CompletionStream until it ends or `deadline` passes
+
+    Returns:
+        tuple: (text received, finish reason), as CompletionStream.finish
+
+    Raises:
+        Exception: If the stream broke off before its first token
+    """
+    async def read():
+        async for chunk in stream:
+            collector.add(chunk)
+
+    stopped = None
+    try:
+        await asyncio.wait_for(read(), remaining_seconds(deadline))
+    except asyncio.TimeoutError:
+        if not collector.parts:
+            raise DeadlineExceeded("deadline passed before the first token") from None
+        stopped = "deadline"
+    except Exception:
+        if not collector.parts:
+            raise
+        stopped = "error"
+    finally:
+        await stream.close()
+    return collector.finish(stopped)
+
+
+async def summarize_article_async(client, article, model, max_tokens, limits, limiter,
+                                  max_retries=OPENAI_MAX_RETRIES, deadline=None):
+    """
+    Summarize one article with AsyncOpenAI
+
+    Retries, the circuit breaker, deadlines and SUMMARY_STREAMING work as in
+    summarize_articles.summarize_article (hedging is not used here).
+
+    Args:
+        client (AsyncOpenAI): Shared async OpenAI client
+        article (dict): Article dictionary with title, description, and content
+        model (str): OpenAI model to use
+        max_tokens (int): Maximum length of summary
+        limits (StageLimits): Shared concurrency limits
+        limiter (RateLimiter): Shared rate limiter
+        max_retries (int): How many times to retry a 429, 5xx or network error
+        deadline (float): Optional time.monotonic() deadline of the whole run
+
+    Returns:
+        str: AI-generated summary or error message
+    """
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_prompt(article)}
+    ]
+    estimated_tokens = estimate_tokens(SYSTEM_PROMPT + messages[1]["content"]) + max_tokens
+
+    # The per-article deadline starts when the summary gets a slot, not while it waits for one
+    slot_deadline = []
+
+    async def attempt():
+        request_timeout(deadline)
+        await asyncio.sleep(limiter.reserve(estimated_tokens))
+        async with limits.summarize:
+            if not slot_deadline:
+                slot_deadline.append(article_deadline(deadline))
+            if SUMMARY_STREAMING:
+                collector = CompletionStream()
+                raw_response = await client.chat.completions.with_raw_response.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.5,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    timeout=request_timeout(slot_deadline[0])
+                )
+                limiter.update_from_headers(raw_response.headers)
+                text, finish_reason = await read_stream_async(raw_response.parse(), collector, slot_deadline[0])
+                return streamed_summary(text, finish_reason)
+            started = time.perf_counter()
+            raw_response = await client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.5,
+                timeout=request_timeout(slot_deadline[0])
+            )
+        limiter.update_from_headers(raw_response.headers)
+        response = raw_response.parse()
+        record_usage(raw_response, response, time.perf_counter() - started)
+        return response.choices[0].message.content.strip()
+
+    try:
+        # After a 429 the limiter is paused, so every other summary backs off too
+        return await call_with_retries_async(attempt, "openai", (APIConnectionError,),
+                                             policy=RetryPolicy(max_retries), breaker=OPENAI_BREAKER,
+                                             on_rate_limit=limiter.pause, deadline=deadline)
+    except Exception as e:
+        ends = slot_deadline[0] if slot_deadline else deadline
+        if isinstance(e, DeadlineExceeded) or (ends is not None and time.monotonic() >= ends):
+            METRICS.increment("summary_deadline_misses_total")
+        else:
+            METRICS.increment("errors_total", service="openai")
+        error_msg = f"{ERROR_PREFIX}: {str(e)}"
+        print(f"  ❌ {error_msg}")
+        return error_msg
+
+
+class AsyncSMTPSession:
+    """
+    One aiosmtplib connection, opened lazily and replaced when it breaks
+
+    The async counterpart of a bulk_email.SMTPConnectionPool entry: after a
+    421 reply, a timeout or a dropped connection the session is discarded
+    and the next message logs in on a fresh one.
+    """
+
+    def __init__(self, aiosmtplib, sender_email, sender_password, timeout=30):
+        """
+        Args:
+            aiosmtplib (module): The imported aiosmtplib module
+            sender_email (str): Account to log in as
+            sender_password (str): App password (empty to skip login, e.g. for a local relay)
+            timeout (float): Socket timeout in seconds
+        """
+        self.aiosmtplib = aiosmtplib
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._smtp = None
+
+    async def connection(self):
+        """
+        Returns:
+            aiosmtplib.SMTP: The open connection, connecting and logging in if there is none
+        """
+        if self._smtp is None:
+            smtp = self.aiosmtplib.SMTP(hostname=SMTP_SERVER, port=SMTP_PORT, start_tls=SMTP_USE_TLS,
+                                        timeout=self.timeout)
+            await smtp.connect()
+            try:
+                if self.sender_password:
+                    await smtp.login(self.sender_email, self.sender_password)
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+            self.connections_opened += 1
+        return self._smtp
+
+    async def discard(self, broken=True):
+        """Drop the connection (logging out first unless it is broken)"""
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            if not broken and smtp.is_connected:
+                await smtp.quit()
+            else:
+                smtp.close()
+        except Exception:
+            pass
+
+
+async def send_one_async(session, limiter, subject, template, recipient, max_attempts):
+    """
+    Deliver one message, reconnecting on 421 responses and dropped connections
+
+    Mirrors bulk_email._send_one, with the throttle waited for on the event loop.
+
+    Returns:
+        dict: {"ok": bool, "error": str or None, "attempts": int}
+    """
+    aiosmtplib = session.aiosmtplib
+    connection_errors = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError,
+                         aiosmtplib.SMTPTimeoutError, asyncio.TimeoutError, OSError)
+    error = None
+    for attempt in range(1, max_attempts + 1):
+        if attempt > 1:
+            METRICS.increment("retries_total", service="smtp")
+        if limiter is not None:
+            await asyncio.sleep(limiter.reserve())
+
+        try:
+            smtp = await session.connection()
+        except aiosmtplib.SMTPAuthenticationError as e:
+            return {"ok": False, "error": f"Authentication failed: {e}", "attempts": attempt}
+        except (aiosmtplib.SMTPException, *connection_errors) as e:
+            error = f"Could not connect: {e}"
+            continue
+
+        try:
+            content = template.render(recipient)
+            with METRICS.timer("request_seconds", service="smtp"):
+                await smtp.send_message(build_message(subject, content, session.sender_email, recipient))
+            METRICS.increment("bytes_sent_total", len(content.encode("utf-8")), service="smtp")
+            return {"ok": True, "error": None, "attempts": attempt}
+
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            # Permanent for this address; the connection itself is fine
+            return {"ok": False, "error": f"Recipient refused: {[r.recipient for r in e.recipients]}",
+                    "attempts": attempt}
+
+        except aiosmtplib.SMTPResponseException as e:
+            retry, reconnect = reply_action(e.code)
+            if reconnect:
+                await session.discard()
+            error = f"SMTP {e.code}: {e.message!r}"
+            if not retry:
+                return {"ok": False, "error": error, "attempts": attempt}
+
+        except connection_errors as e:
+            await session.discard()
+            error = f"Connection lost: {e}"
+
+        except Exception as e:
+            await session.discard()
+            return {"ok": False, "error": f"Unexpected error: {e}", "attempts": attempt}
+
+    return {"ok": False, "error": error, "attempts": max_attempts}
+
+
+async def send_newsletter_async(subject, template, sender_email, sender_password, recipients, limits,
+                                messages_per_minute=SMTP_MESSAGES_PER_MINUTE, max_attempts=3):
+    """
+    Deliver a newsletter without blocking the event loop
+
+    Uses aiosmtplib when it is installed; otherwise the pooled synchronous
+    sender runs in a worker thread. Either way a 421 reply or dropped
+    connection is retried on a new connection, and no more than
+    `messages_per_minute` messages are sent.
+
+    Returns:
+        dict: recipient -> {"ok": bool, "error": str or None, "attempts": int}
+    """
+    try:
+        import aiosmtplib
+    except ImportError:
+        async with limits.send:
+            return await asyncio.to_thread(
+                send_bulk_email, subject, template.render, sender_email, sender_password, recipients,
+                messages_per_minute=messages_per_minute, max_attempts=max_attempts
+            )
+
+    limiter = message_limiter(messages_per_minute)
+    async with limits.send:
+        session = AsyncSMTPSession(aiosmtplib, sender_email, sender_password)
+        report = {}
+        try:
+            for recipient in recipients:
+                report[recipient] = await send_one_async(session, limiter, subject, template, recipient,
+                                                         max_attempts)
+        finally:
+            await session.discard(broken=False)
+        for result in report.values():
+            METRICS.increment("emails_total", result="sent" if result["ok"] else "failed")
+        return report
+
+
+async def run_newsletter_async(job, limits, http, openai_client, limiter, cache=None,
+                               watermarks=None, near_duplicates=None):
+    """
+    Build and send one newsletter
+
+    Args:
+        job (dict): Newsletter settings with keys topics, news_api_key, model,
+                    max_tokens, articles_per_topic, subject, sender_email,
+                    sender_password and recipients (list), and optionally deadline
+                    (time.monotonic() time the summaries have to be done by)
+        limits (StageLimits): Concurrency limits shared across newsletters
+        http (httpx.AsyncClient): Shared HTTP client
+        openai_client (AsyncOpenAI): Shared OpenAI client
+        limiter (RateLimiter): Shared OpenAI rate limiter
+        cache (SummaryCache): Optional summary cache
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        near_duplicates (NearDuplicateIndex): Optional near-duplicate story filter
+
+    Returns:
+        dict: {"articles": summarized articles, "report": delivery report (None if
+               nothing was sent), "latencies": topic -> seconds, "stages": stage -> seconds,
+               "near_duplicates": collapsed (duplicate, kept, similarity) tuples}
+    """
+    stages = {}
+    topics = job["topics"]
+
+    # Stage 1: fetch every topic concurrently, dedup in topic order
+    started = time.perf_counter()
+    results = {}
+    for fetched_query in await asyncio.gather(*[
+        fetch_query_async(http, query, job["news_api_key"], job["articles_per_topic"], limits, watermarks)
+        for query in plan_topic_queries(topics, watermarks)
+    ]):
+        results.update(fetched_query)
+    seen_urls = set()
+    fetched = []
+    latencies = {}
+    for topic in topics:
+        articles, latency = results[topic]
+        latencies[topic] = latency
+        article = select_unique_article(articles, seen_urls, near_duplicates)
+        if article is not None:
+            fetched.append(article)
+    stages["fetch"] = time.perf_counter() - started
+
+    # Stage 2: summarize, reusing cached summaries
+    started = time.perf_counter()
+    model, max_tokens = job["model"], job["max_tokens"]
+
+    async def summarize(article):
+        summary = ROUTER.local_summary(article)
+        key = None
+        if summary is None and cache is not None:
+            key = cache_key(article, model, max_tokens, PROMPT_VERSION)
+            summary = await asyncio.to_thread(cache.get, key)
+        if summary is None:
+            summary = await summarize_article_async(openai_client, article, model, max_tokens, limits, limiter,
+                                                    deadline=job.get("deadline"))
+            if cache is not None and reusable_summary(summary):
+                await asyncio.to_thread(cache.put, key, summary)
+        return with_summary(article, summary)
+
+    summarized = list(await asyncio.gather(*[summarize(article) for article in fetched]))
+    stages["summarize"] = time.perf_counter() - started
+
+    # Stage 3: render once, send to every recipient
+    report = None
+    if summarized:
+        started = time.perf_counter()
+        template = NewsletterTemplate(summarized)
+        report = await send_newsletter_async(
+            job["subject"], template, job["sender_email"], job["sender_password"], job["recipients"], limits
+        )
+        stages["send"] = time.perf_counter() - started
+
+    return {
+        "articles": summarized,
+        "report": report,
+        "latencies": latencies,
+        "stages": stages,
+        "near_duplicates": near_duplicates.collapsed if near_duplicates is not None else []
+    }
+
+
+async def run_newsletters_async(jobs, openai_api_key, limits=None, cache=None, watermarks=None,
+                                near_duplicate_threshold=0,
+                                requests_per_minute=OPENAI_REQUESTS_PER_MINUTE,
+                                tokens_per_minute=OPENAI_TOKENS_PER_MINUTE):
+    """
+    Run many newsletters concurrently on one event loop
+
+    All newsletters share one HTTP connection pool, one OpenAI client, one
+    rate limiter and the same per-stage concurrency limits.
+
+    Args:
+        jobs (list): Newsletter settings (see run_newsletter_async)
+        openai_api_key (str): OpenAI API key
+        limits (StageLimits): Shared concurrency limits (defaults created if omitted)
+        cache (SummaryCache): Optional summary cache
+        watermarks (WatermarkStore): Optional per-topic watermarks (only meaningful for a
+                                     single job, since watermarks are not per newsletter)
+        near_duplicate_threshold (float): Similarity for near-duplicate filtering (0 = off)
+        requests_per_minute (int): OpenAI request budget
+        tokens_per_minute (int): OpenAI token budget
+
+    Returns:
+        list: One result per job (see run_newsletter_async); a job that raised
+              an exception gets the exception object instead
+    """
+    limits = limits or StageLimits()
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+    async with httpx.AsyncClient() as http, \
+            AsyncOpenAI(api_key=openai_api_key, max_retries=0, timeout=OPENAI_TIMEOUT_SECONDS) as openai_client:
+        return await asyncio.gather(*[
+            run_newsletter_async(
+                job, limits, http, openai_client, limiter, cache, watermarks,
+                NearDuplicateIndex(near_duplicate_threshold) if near_duplicate_threshold else None
+            )
+            for job in jobs
+        ], return_exceptions=True)
@@ -0,0 +1,230 @@
+"""
+OpenAI Batch API Summarization
+Submits all summaries as one asynchronous batch job for non-urgent runs
+"""
+
+import json
+import os
+import time
+
+from summarize_articles import (
+    SYSTEM_PROMPT,
+    PROMPT_VERSION,
+    ERROR_PREFIX,
+    ROUTER,
+    build_prompt,
+    with_summary
+)
+from summary_cache import cache_key
+
+
+class OpenAIBatchBackend:
+    """
+    Batch backend talking to the real OpenAI Batch API
+
+    Any object with the same four methods (upload, submit, status, download)
+    can be passed to summarize_all_articles_batch_api instead, e.g. a client
+    for a local fake batch server.
+    """
+
+    def __init__(self, client):
+        """
+        Args:
+            client: OpenAI client instance
+        """
+        self.client = client
+
+    def upload(self, path):
+        """Upload a JSONL request file and return its file ID"""
+        with open(path, "rb") as f:
+            return self.client.files.create(file=f, purpose="batch").id
+
+    def submit(self, input_file_id):
+        """Start a batch job for an uploaded file and return the batch ID"""
+        batch = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+
+    def status(self, batch_id):
+        """
+        Returns:
+            tuple: (status string, output file ID or None, error file ID or None)
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        return batch.status, batch.output_file_id, batch.error_file_id
+
+    def download(self, file_id):
+        """Return the text content of a result file"""
+        return self.client.files.content(file_id).text
+
+
+FINISHED_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _load_state(state_file):
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _save_state(state_file, state):
+    # Write to a temp file first so a crash never leaves a half-written state
+    temp_file = state_file + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(temp_file, state_file)
+
+
+def write_batch_file(path, batch_requests, model, max_tokens):
+    """
+    Write batch requests as JSONL
+
+    Args:
+        path (str): Output file
+        batch_requests (list): List of (custom_id, article) pairs
+        model (str): OpenAI model to use
+        max_tokens (int): Maximum tokens per summary
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for custom_id, article in batch_requests:
+            line = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "messages": [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": build_prompt(article)}
+                    ],
+                    "max_tokens": max_tokens,
+                    "temperature": 0.5
+                }
+            }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def parse_batch_results(text):
+    """
+    Map batch output lines back to summaries
+
+    Args:
+        text (str): Content of the batch output file
+
+    Returns:
+        dict: custom_id -> summary (failed entries are left out)
+    """
+    summaries = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+        if content and content.strip():
+            summaries[result["custom_id"]] = content.strip()
+    return summaries
+
+
+def summarize_all_articles_batch_api(articles, backend, model="gpt-4o-mini", max_tokens=150,
+                                     cache=None, state_file="batch_state.json",
+                                     input_file="batch_input.jsonl", poll_interval=60,
+                                     timeout=None):
+    """
+    Summarize articles through an asynchronous batch job
+
+    Progress is recorded in `state_file` after every step (file uploaded,
+    batch submitted), so calling this again after a crash resumes polling
+    the same job instead of submitting a new one.
+
+    Args:
+        articles (list): List of article dictionaries
+        backend: Batch backend (see OpenAIBatchBackend)
+        model (str): OpenAI model to use
+        max_tokens (int): Maximum tokens per summary
+        cache (SummaryCache): Optional summary cache; hits are not submitted
+        state_file (str): Where to keep resume state
+        input_file (str): Where to write the JSONL request file
+        poll_interval (float): Seconds between status checks
+        timeout (float): Give up waiting after this many seconds (None = wait)
+
+    Returns:
+        list: Articles with added 'summary' field
+
+    Raises:
+        TimeoutError: If the batch does not finish within `timeout`
+    """
+
+    keys = [cache_key(article, model, max_tokens, PROMPT_VERSION) for article in articles]
+    custom_ids = [f"{index}-{key[:16]}" for index, key in enumerate(keys)]
+    summaries = {}
+    batch_requests = []
+    pending = []
+
+    for index, article in enumerate(articles):
+        local = ROUTER.local_summary(article)
+        if local is not None:
+            summaries[custom_ids[index]] = local
+            continue
+        cached = cache.get(keys[index]) if cache is not None else None
+        if cached is not None:
+            summaries[custom_ids[index]] = cached
+        else:
+            batch_requests.append((custom_ids[index], article))
+            pending.append(index)
+
+    print(f"Batch API: {len(batch_requests)} summaries to request, {len(summaries)} from cache or local")
+
+    if batch_requests:
+        pending_ids = [custom_ids[index] for index in pending]
+        state = _load_state(state_file)
+        if state is None or state.get("custom_ids") != pending_ids:
+            state = {"custom_ids": pending_ids}
+
+        if "input_file_id" not in state:
+            write_batch_file(input_file, batch_requests, model, max_tokens)
+            state["input_file_id"] = backend.upload(input_file)
+            _save_state(state_file, state)
+
+        if "batch_id" not in state:
+            state["batch_id"] = backend.submit(state["input_file_id"])
+            _save_state(state_file, state)
+            print(f"Submitted batch {state['batch_id']}")
+        else:
+            print(f"Resuming batch {state['batch_id']}")
+
+        started = time.monotonic()
+        while True:
+            status, output_file_id, error_file_id = backend.status(state["batch_id"])
+            if status in FINISHED_STATUSES:
+                break
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise TimeoutError(f"Batch {state['batch_id']} still '{status}' after {timeout} seconds")
+            time.sleep(poll_interval)
+
+        print(f"Batch {state['batch_id']} finished with status '{status}'")
+        results = parse_batch_results(backend.download(output_file_id)) if output_file_id else {}
+
+        for index in pending:
+            summary = results.get(custom_ids[index])
+            if summary is not None:
+                summaries[custom_ids[index]] = summary
+                if cache is not None:
+                    cache.put(keys[index], summary)
+
+        os.remove(state_file)
+
+    return [
+        with_summary(article, summaries.get(custom_id, f"{ERROR_PREFIX}: no result returned by batch job"))
+        for article, custom_id in zip(articles, custom_ids)
+    ]
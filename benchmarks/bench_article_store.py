@@ -0,0 +1,92 @@
+"""
+Benchmark: Article Archive
+Saves and reads back a large article archive with the SQLite ArticleStore,
+and compares it with the original pretty-printed JSON dump and load
+
+Memory is the peak traced by tracemalloc while reading; the store streams
+rows, so it only ever holds one chunk.
+
+Usage:
+    python benchmarks/bench_article_store.py [--articles 200000] [--topics 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_store import ArticleStore
+
+
+def make_articles(count, topics):
+    return [
+        {
+            "topic": f"topic {i % topics}",
+            "title": f"Headline number {i} about something important",
+            "description": "A short description of what happened and why it matters. " * 2,
+            "url": f"https://example.com/news/{i}",
+            "content": "The first paragraph of the story, as NewsAPI returns it. " * 4 + "[+2140 chars]",
+            "published_at": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00Z",
+            "source": "Example News",
+            "relevance_score": 0.5,
+            "summary": "A two sentence summary of the story. It mentions the key facts."
+        }
+        for i in range(count)
+    ]
+
+
+def measure(label, function):
+    """Run `function`, print its time and traced peak memory, and return its result"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<40} {elapsed:8.2f}s  peak {peak / 2 ** 20:8.1f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200000)
+    parser.add_argument("--topics", type=int, default=50)
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles, args.topics)
+    directory = tempfile.mkdtemp(prefix="bench_article_store_")
+    json_path = os.path.join(directory, "summarized_articles.json")
+    db_path = os.path.join(directory, "articles.db")
+    print(f"Archive of {args.articles} articles in {args.topics} topics")
+
+    print("JSON (indent=2):")
+
+    def dump_json():
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(articles, f, indent=2, ensure_ascii=False)
+
+    def load_json_topic():
+        with open(json_path, "r", encoding="utf-8") as f:
+            return [article for article in json.load(f) if article["topic"] == "topic 7"]
+
+    measure("write", dump_json)
+    measure("read one topic", load_json_topic)
+    print(f"  {'size':<40} {os.path.getsize(json_path) / 2 ** 20:8.1f} MB")
+
+    print("ArticleStore (SQLite):")
+    store = ArticleStore(db_path)
+    measure("write", lambda: store.add(articles, "bench"))
+    measure("read one topic", lambda: store.load(topic="topic 7"))
+    measure("stream everything", lambda: sum(1 for _ in store.iter_records()))
+    measure("look up 1000 URLs", lambda: [store.get(f"https://example.com/news/{i}") for i in range(1000)])
+    store.close()
+    print(f"  {'size':<40} {os.path.getsize(db_path) / 2 ** 20:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Benchmark: OpenAI Batch API Backend
+Runs summarize_all_articles_batch_api against an in-memory stand-in for the
+Batch API and checks the whole job life cycle without credentials
+
+Runs:
+    crash and resume   the process dies while polling; the second call must
+                       resume the same batch (no second upload or submit)
+    cached rerun       the same articles again: summaries that came back are
+                       served from the summary cache and only the failed ones
+                       are submitted in a new batch
+    failed batch       the job ends "failed" with no output file; every
+                       article falls back to a local summary
+
+The stand-in answers a share of the requests with a 500 (listed in the
+error file), leaves some out of the output, garbles some output lines and
+adds a result for a custom_id that was never requested. Articles whose
+result is missing or failed must get a fallback summary, every other one
+exactly its own summary. The script exits with status 1 when a check fails.
+
+Usage:
+    python benchmarks/bench_batch_api.py [--articles 200] [--fail-rate 0.05]
+        [--missing-rate 0.05] [--garbled-rate 0.02]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from replay_servers import synthetic_article
+
+
+class SimulatedCrash(Exception):
+    """Raised by the stand-in to stop a run part-way, as a killed process would"""
+
+
+class FakeBatchBackend:
+    """
+    In-memory Batch API with the interface of batch_api.OpenAIBatchBackend
+
+    A batch completes after `polls_until_done` status checks. Each request
+    then succeeds, fails with a 500, is missing from the output or comes
+    back garbled, at the given rates (deterministic per custom_id).
+    """
+
+    def __init__(self, fail_rate=0.05, missing_rate=0.05, garbled_rate=0.02, polls_until_done=3, seed=7):
+        self.fail_rate = fail_rate
+        self.missing_rate = missing_rate
+        self.garbled_rate = garbled_rate
+        self.polls_until_done = polls_until_done
+        self.seed = seed
+        self.crash_on_poll = None  # Raise SimulatedCrash on this status call (1 = the first)
+        self.final_status = "completed"
+        self.files = {}
+        self.batches = {}
+        self.uploads = 0
+        self.submits = 0
+        self.polls = 0
+        self.requested = []  # custom_ids of every submitted request
+        self.outcomes = {}  # custom_id -> outcome of its latest finished request
+
+    def outcome(self, custom_id):
+        """Return "ok", "failed", "missing" or "garbled" for a request"""
+        roll = random.Random(f"{self.seed}/{custom_id}").random()
+        for outcome, rate in (("failed", self.fail_rate), ("missing", self.missing_rate),
+                              ("garbled", self.garbled_rate)):
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return "ok"
+
+    def upload(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        for request in requests:
+            if request["url"] != "/v1/chat/completions" or not request["body"]["messages"]:
+                raise ValueError(f"Malformed batch request {request['custom_id']}")
+        self.uploads += 1
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = requests
+        return file_id
+
+    def submit(self, input_file_id):
+        self.submits += 1
+        batch_id = f"batch-{len(self.batches)}"
+        self.batches[batch_id] = {"input": input_file_id, "polls": 0}
+        self.requested.extend(request["custom_id"] for request in self.files[input_file_id])
+        return batch_id
+
+    def status(self, batch_id):
+        self.polls += 1
+        if self.crash_on_poll == self.polls:
+            raise SimulatedCrash(f"process killed while polling {batch_id}")
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        if batch["polls"] < self.polls_until_done:
+            return "in_progress", None, None
+        if self.final_status != "completed":
+            return self.final_status, None, None
+        if "output" not in batch:
+            batch["output"], batch["errors"] = self._results(self.files[batch["input"]])
+        return "completed", batch["output"], batch["errors"]
+
+    def download(self, file_id):
+        return self.files[file_id]
+
+    def _results(self, requests):
+        """Build the output and error files of a finished batch; returns their IDs"""
+        output, errors = [], []
+        for request in requests:
+            custom_id = request["custom_id"]
+            outcome = self.outcomes[custom_id] = self.outcome(custom_id)
+            if outcome == "missing":
+                continue
+            if outcome == "failed":
+                errors.append(json.dumps({"custom_id": custom_id, "response": {
+                    "status_code": 500, "body": {"error": {"message": "Injected error"}}}}))
+                continue
+            if outcome == "garbled":
+                output.append(json.dumps({"custom_id": custom_id, "response": {"status_code": 200, "body": {}}}))
+                continue
+            output.append(json.dumps({"custom_id": custom_id, "response": {"status_code": 200, "body": {
+                "choices": [{"message": {"role": "assistant", "content": f" {expected_summary(custom_id)} "}}]
+            }}}))
+        output.insert(len(output) // 2, "{ not json")
+        output.append(json.dumps({"custom_id": "never-requested", "response": {"status_code": 200, "body": {
+            "choices": [{"message": {"content": "Stray result"}}]}}}))
+        output_id, errors_id = f"file-{len(self.files)}", f"file-{len(self.files) + 1}"
+        self.files[output_id] = "\n".join(output) + "\n"
+        self.files[errors_id] = "\n".join(errors) + "\n"
+        return output_id, errors_id
+
+
+def expected_summary(custom_id):
+    return f"Batch summary for request {custom_id}."
+
+
+def install_stub_config():
+    """Register a `config` module good enough to import the summarizer (no request is ever sent)"""
+    config = types.ModuleType("config")
+    config.OPENAI_API_KEY = "stub"
+    config.OPENAI_MODEL = "gpt-4o-mini"
+    config.MAX_SUMMARY_TOKENS = 150
+    config.SUMMARY_CACHE_PATH = ""
+    sys.modules["config"] = config
+
+
+def check_summaries(batch_api, backend, articles, results, label):
+    """
+    Compare each article's summary with what the stand-in returned for it
+
+    Returns:
+        tuple: (list of problems, summaries received, fallbacks)
+    """
+    from summary_cache import cache_key
+
+    problems = []
+    received = fallbacks = 0
+    for index, (article, result) in enumerate(zip(articles, results)):
+        key = cache_key(article, "gpt-4o-mini", 150, batch_api.PROMPT_VERSION)
+        custom_id = f"{index}-{key[:16]}"
+        outcome = backend.outcomes.get(custom_id, "ok")
+        ok = outcome == "ok"
+        if ok and result.get("summary") == expected_summary(custom_id) and "summary_fallback" not in result:
+            received += 1
+        elif not ok and "summary_fallback" in result:
+            fallbacks += 1
+        else:
+            problems.append(f"{label}: article {index} ({outcome}) got {result.get('summary')!r}")
+    return problems, received, fallbacks
+
+
+def run(batch_api, backend, articles, cache, workdir):
+    """Call summarize_all_articles_batch_api quietly; returns (results, seconds)"""
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = batch_api.summarize_all_articles_batch_api(
+            articles, backend, cache=cache, poll_interval=0,
+            state_file=os.path.join(workdir, "batch_state.json"),
+            input_file=os.path.join(workdir, "batch_input.jsonl")
+        )
+    return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="share of requests answered with a 500")
+    parser.add_argument("--missing-rate", type=float, default=0.05, help="share left out of the output file")
+    parser.add_argument("--garbled-rate", type=float, default=0.02, help="share with an unusable output line")
+    args = parser.parse_args()
+
+    install_stub_config()
+    import batch_api
+    from summary_cache import SummaryCache
+
+    articles = [synthetic_article(f"topic {i % 20}", i) for i in range(args.articles)]
+    for article in articles:
+        article["topic"] = "replay"
+    workdir = tempfile.mkdtemp(prefix="bench_batch_api_")
+    state_file = os.path.join(workdir, "batch_state.json")
+    cache = SummaryCache(":memory:")
+    backend = FakeBatchBackend(args.fail_rate, args.missing_rate, args.garbled_rate)
+    problems = []
+    print(f"{len(articles)} articles; {args.fail_rate:.0%} of requests fail, {args.missing_rate:.0%} are missing "
+          f"and {args.garbled_rate:.0%} are garbled")
+
+    try:
+        # 1. Crash while polling, then resume
+        backend.crash_on_poll = 2
+        try:
+            run(batch_api, backend, articles, cache, workdir)
+            problems.append("crash and resume: the simulated crash did not stop the run")
+        except SimulatedCrash:
+            pass
+        with open(state_file, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if "batch_id" not in saved:
+            problems.append("crash and resume: no batch ID in the state file after the crash")
+        results, elapsed = run(batch_api, backend, articles, cache, workdir)
+        if (backend.uploads, backend.submits) != (1, 1):
+            problems.append(f"crash and resume: {backend.uploads} uploads and {backend.submits} submits (expected 1 each)")
+        found, received, fallbacks = check_summaries(batch_api, backend, articles, results, "crash and resume")
+        problems += found
+        print(f"  {'crash and resume':<20} {backend.submits} batch, {len(backend.requested):4d} requests, "
+              f"{received:4d} summaries, {fallbacks:3d} fallbacks  {elapsed:6.3f}s")
+        if os.path.exists(state_file):
+            problems.append("crash and resume: state file left behind")
+
+        # 2. The same articles again: only the failed ones are submitted
+        first_requests = len(backend.requested)
+        retried = [custom_id for custom_id, outcome in backend.outcomes.items() if outcome != "ok"]
+        backend.seed += 1  # The retried requests get a fresh chance
+        hits_before = cache.hits
+        results, elapsed = run(batch_api, backend, articles, cache, workdir)
+        resubmitted = len(backend.requested) - first_requests
+        if resubmitted != len(retried):
+            problems.append(f"cached rerun: {resubmitted} requests submitted, expected the {len(retried)} that failed")
+        found, received, fallbacks = check_summaries(batch_api, backend, articles, results, "cached rerun")
+        problems += found
+        print(f"  {'cached rerun':<20} {backend.submits - 1} batch, {resubmitted:4d} requests, "
+              f"{received:4d} summaries, {fallbacks:3d} fallbacks  {elapsed:6.3f}s  "
+              f"({cache.hits - hits_before} cache hits)")
+
+        # 3. A job that fails as a whole
+        failed_backend = FakeBatchBackend(polls_until_done=1)
+        failed_backend.final_status = "failed"
+        results, elapsed = run(batch_api, failed_backend, articles, None, workdir)
+        fallbacks = sum("summary_fallback" in result for result in results)
+        if fallbacks != len(articles):
+            problems.append(f"failed batch: {len(articles) - fallbacks} articles without a fallback summary")
+        print(f"  {'failed batch':<20} 1 batch, {len(articles):4d} requests, {0:4d} summaries, "
+              f"{fallbacks:3d} fallbacks  {elapsed:6.3f}s")
+    finally:
+        cache.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if problems:
+        print(f"{len(problems)} problems:")
+        for problem in problems[:20]:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("All checks passed")
+
+
+if __name__ == "__main__":
+    main()
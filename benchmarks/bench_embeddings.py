@@ -0,0 +1,169 @@
+"""
+Benchmark: Embedding Index
+Embeds a large synthetic article set, assigns every article to a topic and
+clusters the articles into stories, and times each step
+
+The articles are generated in stories: each story is rewritten by a few
+"outlets" (some words swapped, one dropped), so the benchmark knows which
+articles are one story and which topic each belongs to. Some stories are
+follow-ups that reuse half of the previous story's words; they must not
+be merged with it. Cluster quality is measured as pairwise precision and recall
+against those stories. The script exits with status 1 when cluster
+precision is below --min-precision, since a false merge means an article
+goes out with another story's summary.
+
+The hashing embedder is used by default so no model or API key is needed.
+Its topic assignment suffers from hash collisions between the one-word
+topics and article words; a longer vector (--model 4096) reduces them.
+
+Usage:
+    python benchmarks/bench_embeddings.py [--articles 20000] [--topics 40]
+        [--backend hashing] [--model ""] [--threshold 0.85] [--min-precision 0.98]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from replay_servers import _WORDS
+
+import embeddings
+
+# Topic words; none of them occur in the article vocabulary
+_TOPIC_WORDS = """
+aerospace algae antarctic antibiotics archaeology asteroid astronomy autism ballet bitcoin
+biodiversity biotech blockchain broadband cancer chess cinema cloud comet coral cricket
+cybersecurity dementia diabetes dinosaur drones earthquake eclipse esports exoplanet fashion
+fintech fusion galaxy genetics geothermal glacier gravity hurricane hydrogen jazz lithium
+""".split()
+
+
+def rewrite(words, rng, swap_rate):
+    """Swap a share of the words for other vocabulary words and drop one, as a second outlet might"""
+    words = [rng.choice(_WORDS) if rng.random() < swap_rate else word for word in words]
+    if len(words) > 8:
+        del words[rng.randrange(len(words))]
+    return words
+
+
+def make_articles(count, topics, max_outlets=4, swap_rate=0.08, follow_up_rate=0.2, seed=7):
+    """
+    Returns:
+        tuple: (articles, story number per article, topic per article)
+    """
+    rng = random.Random(seed)
+    articles, stories, labels = [], [], []
+    story = 0
+    previous = None
+    while len(articles) < count:
+        topic = rng.choice(topics)
+        title = rng.sample(_WORDS, 7) + [topic]
+        description = rng.sample(_WORDS, 18) + [topic]
+        content = [word for _ in range(4) for word in rng.sample(_WORDS, 12)]
+        if previous is not None and rng.random() < follow_up_rate:
+            topic = previous[0]
+            fresh = (title[:-1] + [topic], description[:-1] + [topic], content)
+            title, description, content = (
+                [old if rng.random() < 0.5 else new for old, new in zip(old_part, new_part)]
+                for old_part, new_part in zip(previous[1:], fresh)
+            )
+        previous = (topic, title, description, content)
+        for outlet in range(rng.randint(1, max_outlets)):
+            if len(articles) == count:
+                break
+            if outlet:
+                title, description, content = (rewrite(part, rng, swap_rate) for part in (title, description, content))
+            articles.append({
+                "source": {"id": None, "name": f"Outlet {outlet}"},
+                "title": " ".join(title).capitalize(),
+                "description": " ".join(description),
+                "url": f"https://bench.example.com/{story}/{outlet}",
+                "content": " ".join(content).capitalize() + f". [+{rng.randint(800, 4000)} chars]",
+            })
+            stories.append(story)
+            labels.append(topic)
+        story += 1
+    return articles, stories, labels
+
+
+def pairwise_quality(clusters, stories):
+    """
+    Pairwise precision and recall: of the article pairs put in one cluster,
+    how many are one story, and of the pairs that are one story, how many share a cluster
+
+    Returns:
+        tuple: (precision, recall)
+    """
+    def pairs(counts):
+        return sum(n * (n - 1) // 2 for n in counts.values())
+
+    together = pairs(Counter(clusters))
+    same_story = pairs(Counter(stories))
+    correct = pairs(Counter(zip(clusters, stories)))
+    precision = correct / together if together else 1.0
+    recall = correct / same_story if same_story else 1.0
+    return precision, recall
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--backend", choices=embeddings.BACKENDS, default="hashing")
+    parser.add_argument("--model", default="", help="model name (\"\" = the backend's default)")
+    parser.add_argument("--threshold", type=float, default=0.85, help="STORY_CLUSTER_THRESHOLD")
+    parser.add_argument("--min-precision", type=float, default=0.98,
+                        help="minimum pairwise cluster precision")
+    args = parser.parse_args()
+
+    topics = _TOPIC_WORDS[:args.topics]
+    articles, stories, labels = make_articles(args.articles, topics)
+    print(f"{len(articles)} articles, {len(set(stories))} stories, {len(topics)} topics "
+          f"({args.backend} embedder)")
+
+    cache_path = os.path.join(tempfile.mkdtemp(prefix="bench_embeddings_"), "embeddings.db")
+    try:
+        embedder = embeddings.open_article_embedder(args.backend, args.model, os.environ.get("OPENAI_API_KEY"),
+                                                    cache_path)
+        vectors, cold = timed(embedder.embed, articles)
+        _, warm = timed(embedder.embed, articles)
+        print(f"  {'embed (cold)':<24} {cold:7.2f}s  ({len(articles) / cold:,.0f} articles/s)")
+        print(f"  {'embed (cached)':<24} {warm:7.2f}s  ({len(articles) / warm:,.0f} articles/s)")
+
+        scorer, _ = timed(embeddings.EmbeddingScorer, topics, embedder)
+        assigned, assign_time = timed(scorer.index.search, vectors, k=1)
+        accuracy = sum(topics[index] == label for index, label in zip(assigned[0][:, 0], labels)) / len(labels)
+        print(f"  {'topic assignment':<24} {assign_time:7.2f}s  (accuracy {accuracy:.1%})")
+
+        clusters, cluster_time = timed(embeddings.cluster_stories, vectors, args.threshold)
+        precision, recall = pairwise_quality(clusters, stories)
+        print(f"  {'story clustering':<24} {cluster_time:7.2f}s  ({len(set(clusters))} clusters, "
+              f"precision {precision:.1%}, recall {recall:.1%})")
+        print(f"  Summaries needed: {len(set(clusters))} instead of {len(articles)} "
+              f"({1 - len(set(clusters)) / len(articles):.0%} fewer)")
+    finally:
+        embedder.cache.close()
+        os.remove(cache_path)
+        os.rmdir(os.path.dirname(cache_path))
+
+    if precision < args.min_precision:
+        print(f"Cluster precision below {args.min_precision:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Benchmark: End-to-End Pipeline Replay
+Runs main.run_newsletter against local NewsAPI, OpenAI and SMTP stand-ins
+(see replay_servers.py) at several newsletter sizes, and reports throughput,
+p50/p95 call latency, stage timings and peak RSS. No credentials or network
+access are needed.
+
+Every size runs in its own subprocess so peak RSS is measured per size and
+the module-level config is fresh. Results can be saved as a baseline and
+later runs compared against it.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--sizes 10,100,10000] [--engine threads|async]
+        [--mode staged|streaming] [--openai-latency-ms 50] [--openai-error-rate 0.02]
+        [--fixtures benchmarks/fixtures/newsapi_everything.json]
+        [--save benchmarks/baselines/pipeline.json] [--compare benchmarks/baselines/pipeline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from replay_servers import ReplayServers
+
+# Baseline file format version (bump when the structure changes)
+BASELINE_SCHEMA = 1
+
+
+def install_replay_config(settings):
+    """
+    Register a `config` module pointing every external service at the replay servers
+
+    Args:
+        settings (dict): Child settings built by run_size()
+    """
+    config = types.ModuleType("config")
+    config.NEWS_API_KEY = "replay"
+    config.OPENAI_API_KEY = "replay"
+    config.SENDER_EMAIL = "bench@example.com"
+    config.SENDER_PASSWORD = "replay"
+    config.RECIPIENT_EMAIL = [f"reader{i}@example.com" for i in range(settings["recipients"])]
+    config.TOPICS = [f"topic {i}" for i in range(settings["articles"])]
+    if settings.get("fixture_topics"):
+        config.TOPICS[:len(settings["fixture_topics"])] = settings["fixture_topics"][:settings["articles"]]
+    config.ARTICLES_PER_TOPIC = 3
+    config.OPENAI_MODEL = "gpt-4o-mini"
+    config.MAX_SUMMARY_TOKENS = 150
+    config.NEWS_API_URL = settings["newsapi_url"]
+    config.SMTP_SERVER = "127.0.0.1"
+    config.SMTP_PORT = settings["smtp_port"]
+    config.SMTP_USE_TLS = False
+    config.SMTP_POOL_SIZE = settings["smtp_pool_size"]
+    config.SMTP_MESSAGES_PER_MINUTE = 0
+    config.MAX_CONCURRENT_FETCHES = settings["fetch_workers"]
+    config.SUMMARY_WORKERS = settings["summary_workers"]
+    config.OPENAI_REQUESTS_PER_MINUTE = 10 ** 7
+    config.OPENAI_TOKENS_PER_MINUTE = 10 ** 10
+    config.SUMMARY_CACHE_PATH = ""
+    config.WATERMARKS_PATH = ""
+    config.NEWSAPI_CACHE_PATH = ""  # Every size must really hit the replay server
+    config.ENGINE = settings["engine"]
+    config.PIPELINE_MODE = settings["mode"]
+    config.METRICS_REPORT_PATH = ""
+    sys.modules["config"] = config
+    os.environ["OPENAI_BASE_URL"] = settings["openai_url"]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 2 ** 20  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def child_main(settings_json, result_path):
+    """Run one newsletter inside the subprocess and write its measurements"""
+    settings = json.loads(settings_json)
+    install_replay_config(settings)
+    os.chdir(tempfile.mkdtemp(prefix="bench_pipeline_"))  # Generated files stay out of the repo
+
+    import main
+    from metrics import METRICS
+
+    started = time.perf_counter()
+    success = main.run_newsletter()
+    elapsed = time.perf_counter() - started
+
+    from article_store import ArticleStore
+    store = ArticleStore()  # Fresh temporary directory, so it holds only this run's articles
+    articles = len(store)
+    store.close()
+
+    report = METRICS.report()
+    latency = {}
+    stages = {}
+    for histogram in report["histograms"]:
+        if histogram["name"] == "request_seconds":
+            latency[histogram["labels"]["service"]] = {
+                "count": histogram["count"],
+                "p50_ms": round(histogram["p50"] * 1000, 2),
+                "p95_ms": round(histogram["p95"] * 1000, 2)
+            }
+        elif histogram["name"] == "stage_seconds":
+            stages[histogram["labels"]["stage"]] = round(histogram["sum"], 3)
+    counters = {
+        "_".join([counter["name"], *map(str, counter["labels"].values())]): counter["value"]
+        for counter in report["counters"]
+    }
+
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "success": success,
+            "articles": articles,
+            "seconds": round(elapsed, 3),
+            "throughput_articles_per_s": round(articles / elapsed, 2) if elapsed else 0.0,
+            "latency": latency,
+            "stages": stages,
+            "retries_openai": counters.get("retries_total_openai", 0),
+            "emails_sent": counters.get("emails_total_sent", 0),
+            "peak_rss_mb": round(peak_rss_mb(), 1) if peak_rss_mb() is not None else None
+        }, f)
+
+
+def run_size(articles, args, servers, fixture_topics):
+    """
+    Benchmark one newsletter size in a fresh subprocess
+
+    Returns:
+        dict: Measurements written by child_main
+    """
+    settings = {
+        "articles": articles,
+        "recipients": args.recipients,
+        "fetch_workers": args.fetch_workers,
+        "summary_workers": args.summary_workers,
+        "smtp_pool_size": args.smtp_pool_size,
+        "engine": args.engine,
+        "mode": args.mode,
+        "newsapi_url": servers.newsapi_url,
+        "openai_url": servers.openai_url,
+        "smtp_port": servers.smtp_port,
+        "fixture_topics": fixture_topics
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        result_path = os.path.join(workdir, "result.json")
+        output = None if args.verbose else subprocess.DEVNULL
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", json.dumps(settings), result_path],
+            stdout=output, stderr=output, check=True
+        )
+        with open(result_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def print_result(size, result):
+    print(f"  {size:>6} articles: {result['seconds']:8.2f} s, "
+          f"{result['throughput_articles_per_s']:8.1f} articles/s, "
+          f"peak RSS {result['peak_rss_mb']} MB, {result['emails_sent']} emails"
+          + ("" if result["success"] else "  (run FAILED)"))
+    for service, stats in sorted(result["latency"].items()):
+        print(f"      {service:8} p50 {stats['p50_ms']:8.1f} ms   p95 {stats['p95_ms']:8.1f} ms   ({stats['count']} calls)")
+    print("      stages: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in sorted(result["stages"].items())))
+
+
+def compare(baseline, results, tolerance):
+    """
+    Print changes against a saved baseline
+
+    Returns:
+        bool: True if no size regressed beyond `tolerance` (throughput or p95)
+    """
+    ok = True
+    print(f"\nComparison with baseline ({baseline.get('recorded_at', 'unknown date')}):")
+    if baseline.get("schema") != BASELINE_SCHEMA:
+        print(f"  ⚠ baseline schema {baseline.get('schema')} differs from {BASELINE_SCHEMA}")
+    for size, result in results.items():
+        before = baseline["results"].get(size)
+        if before is None:
+            print(f"  {size:>6} articles: not in baseline")
+            continue
+        change = result["throughput_articles_per_s"] / before["throughput_articles_per_s"] - 1
+        line = f"  {size:>6} articles: throughput {change:+.1%}"
+        if change < -tolerance:
+            ok = False
+            line += "  REGRESSION"
+        for service, stats in sorted(result["latency"].items()):
+            old = before["latency"].get(service)
+            if old and old["p95_ms"]:
+                p95_change = stats["p95_ms"] / old["p95_ms"] - 1
+                line += f", {service} p95 {p95_change:+.1%}"
+                if p95_change > tolerance:
+                    ok = False
+                    line += " REGRESSION"
+        print(line)
+    return ok
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        return child_main(sys.argv[2], sys.argv[3])
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,10000", help="comma separated article counts")
+    parser.add_argument("--recipients", type=int, default=5)
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads")
+    parser.add_argument("--mode", choices=("staged", "streaming"), default="staged")
+    parser.add_argument("--fetch-workers", type=int, default=10)
+    parser.add_argument("--summary-workers", type=int, default=8)
+    parser.add_argument("--smtp-pool-size", type=int, default=2)
+    parser.add_argument("--newsapi-latency-ms", type=float, default=30)
+    parser.add_argument("--openai-latency-ms", type=float, default=50)
+    parser.add_argument("--smtp-latency-ms", type=float, default=2)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--newsapi-error-rate", type=float, default=0.0)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--smtp-error-rate", type=float, default=0.0)
+    parser.add_argument("--fixtures", help="recorded NewsAPI responses keyed by topic (used for the first topics)")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a baseline file")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative drop in throughput / rise in p95 before failing")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    servers = ReplayServers(
+        newsapi_latency_ms=args.newsapi_latency_ms,
+        openai_latency_ms=args.openai_latency_ms,
+        smtp_latency_ms=args.smtp_latency_ms,
+        jitter_ms=args.jitter_ms,
+        newsapi_error_rate=args.newsapi_error_rate,
+        openai_error_rate=args.openai_error_rate,
+        smtp_error_rate=args.smtp_error_rate,
+        fixtures_path=args.fixtures
+    ).start()
+    fixture_topics = list(servers.newsapi.fixtures)
+
+    print(f"Replaying the pipeline (engine={args.engine}, mode={args.mode}, "
+          f"latency newsapi/openai/smtp = {args.newsapi_latency_ms:g}/{args.openai_latency_ms:g}/"
+          f"{args.smtp_latency_ms:g} ms, openai errors {args.openai_error_rate:.0%})")
+    results = {}
+    try:
+        for size in sizes:
+            results[str(size)] = result = run_size(size, args, servers, fixture_topics)
+            print_result(size, result)
+    finally:
+        stats = servers.stats()
+        servers.stop()
+    print(f"  servers: {stats['newsapi']['requests']} NewsAPI requests ({stats['newsapi']['errors']} failed), "
+          f"{stats['openai']['requests']} completions ({stats['openai']['errors']} rate limited), "
+          f"{stats['smtp']['messages']} messages accepted")
+
+    if args.save:
+        settings = {key: value for key, value in vars(args).items()
+                    if key not in ("save", "compare", "verbose", "tolerance")}
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "schema": BASELINE_SCHEMA,
+                "recorded_at": time.strftime("%Y-%m-%d"),
+                "python": platform.python_version(),
+                "platform": platform.platform(terse=True),
+                "settings": settings,
+                "results": results
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline saved to '{args.save}'")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        current = {key: value for key, value in vars(args).items()
+                   if key not in ("save", "compare", "verbose", "tolerance", "sizes")}
+        changed = sorted(key for key, value in current.items() if baseline["settings"].get(key) != value)
+        if changed:
+            print(f"\n⚠ Settings differ from the baseline: {', '.join(changed)}")
+        if not compare(baseline, results, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
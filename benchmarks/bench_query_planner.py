@@ -0,0 +1,228 @@
+"""
+Benchmark: NewsAPI Query Planner
+Fetches the same topic list from the replay NewsAPI (see replay_servers.py)
+once with one query per topic, as before the planner, and once with topics
+combined into OR-queries, and compares the request counts and the articles
+each topic ends up with
+
+Quality is the share of each topic's per-topic articles that the planned
+fetch also returned for it, and the share of topics whose chosen article
+(first unique one, as in fetch_all_topics) is the same. The script exits
+with status 1 when the mean overlap is below --min-overlap.
+
+The replay server only returns a topic's own synthetic stories, while real
+NewsAPI would also return a "climate policy" story for "climate". So the
+benchmark topics use words that no other topic or article text contains,
+which makes the per-topic run an exact reference.
+
+A second, small check covers topics that do overlap ("climate", "climate
+policy" and "AI", with stories mentioning two of them): each topic's
+per-topic articles must all be among the ones the planned fetch gives it.
+
+Usage:
+    python benchmarks/bench_query_planner.py [--topics 40] [--articles-per-topic 3]
+        [--topics-per-query 10] [--max-pages 3] [--min-overlap 0.95]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from relevance import tokenize
+from replay_servers import ReplayServers
+
+# Topic words; none of them occur in the replay server's article vocabulary
+_TOPIC_WORDS = """
+aerospace algae antarctic antibiotics archaeology asteroid astronomy autism ballet bitcoin
+biodiversity biotech blockchain broadband cancer chess cinema cloud comet coral cricket
+cybersecurity dementia diabetes dinosaur drones earthquake eclipse esports exoplanet fashion
+fintech fusion galaxy genetics geothermal glacier gravity hurricane hydrogen jazz lithium
+malaria marathon meteor microbiome nanotech neuroscience nuclear obesity olympics opera
+orbit pandemic photography podcast quantum rainforest robotics rugby semiconductor smartphone
+solar submarine supercomputer surfing telescope tennis tsunami volcano whales wine yoga
+""".split()
+
+
+# Overlapping topics and the stories NewsAPI has for them, newest first; a topic's own
+# query returns every story containing all of its words
+OVERLAPPING_TOPICS = ["climate", "climate policy", "AI"]
+OVERLAPPING_STORIES = [
+    ("AI model predicts climate disasters",
+     "An AI model trained by an AI lab flags floods days ahead, AI researchers say"),
+    ("Senate passes climate policy package", "The bill sets emission targets for the next decade"),
+    ("Chipmakers race to build AI accelerators", "Demand for AI training hardware keeps growing"),
+    ("Heatwave breaks records as the climate warms", "Scientists link the heat to a warming climate"),
+    ("Carbon tax debate shapes climate policy", "Economists weigh in on the climate policy options"),
+    ("Startups bet on AI agents", "Investors pour money into AI agent companies"),
+    ("Glaciers retreat faster, climate study finds", "Ice loss doubled in twenty years"),
+    ("AI tutors enter classrooms", "Schools test AI tutoring for maths"),
+]
+
+
+def overlapping_fixtures():
+    """
+    Returns:
+        dict: topic -> recorded NewsAPI response for OVERLAPPING_TOPICS (ReplayServers fixtures format)
+    """
+    articles = []
+    for i, (title, description) in enumerate(OVERLAPPING_STORIES):
+        articles.append({
+            "source": {"id": None, "name": "Replay Source"},
+            "author": None,
+            "title": title,
+            "description": description,
+            "url": f"https://replay.example.com/overlap/{i}",
+            "publishedAt": f"2024-05-01T{12 - i:02d}:00:00Z",
+            "content": f"{description}. [+1200 chars]"
+        })
+    fixtures = {}
+    for topic in OVERLAPPING_TOPICS:
+        words = set(tokenize(topic))
+        matching = [a for a in articles if words <= set(tokenize(f"{a['title']} {a['description']}"))]
+        fixtures[topic] = {"status": "ok", "totalResults": len(matching), "articles": matching}
+    return fixtures
+
+
+def install_replay_config(newsapi_url, articles_per_topic):
+    """Register a `config` module that points NewsAPI at the replay server"""
+    config = types.ModuleType("config")
+    config.NEWS_API_KEY = "replay"
+    config.TOPICS = []
+    config.ARTICLES_PER_TOPIC = articles_per_topic
+    config.NEWS_API_URL = newsapi_url
+    config.NEWSAPI_CACHE_PATH = ""  # Both runs must really hit the replay server
+    sys.modules["config"] = config
+
+
+def make_topics(count, seed=11):
+    """One- and two-word topics that share no words (reusing words once the list runs out)"""
+    rng = random.Random(seed)
+    words = _TOPIC_WORDS[:]
+    rng.shuffle(words)
+    topics = []
+    while len(topics) < count:
+        size = rng.choice((1, 2, 2))
+        if len(words) < size:
+            words = _TOPIC_WORDS[:]
+            rng.shuffle(words)
+        topic = " ".join(words.pop() for _ in range(size))
+        if topic not in topics:
+            topics.append(topic)
+    return topics
+
+
+def fetch(fetch_news, servers, topics, max_articles, coalesce):
+    """
+    Returns:
+        tuple: (dict of topic -> article list, requests sent, seconds)
+    """
+    fetch_news.NEWSAPI_COALESCE_TOPICS = coalesce
+    before = servers.stats()["newsapi"]["requests"]
+    session = fetch_news.create_session()
+    started = time.perf_counter()
+    try:
+        results = fetch_news.fetch_topics(topics, "replay", max_articles, max_workers=5, session=session)
+    finally:
+        session.close()
+    elapsed = time.perf_counter() - started
+    articles = {topic: results[topic][0] for topic in topics}
+    return articles, servers.stats()["newsapi"]["requests"] - before, elapsed
+
+
+def article_overlap(baseline, planned):
+    """
+    Returns:
+        dict: topic -> share of its per-topic articles the planned fetch also returned for it
+    """
+    overlaps = {}
+    for topic, articles in baseline.items():
+        expected = {article["url"] for article in articles}
+        if expected:
+            got = {article["url"] for article in planned[topic]}
+            overlaps[topic] = len(expected & got) / len(expected)
+    return overlaps
+
+
+def chosen_articles(fetch_news, topics, articles):
+    """The article fetch_all_topics would keep for each topic (None if every candidate was a duplicate)"""
+    seen_urls = set()
+    chosen = {}
+    for topic in topics:
+        article = fetch_news.select_unique_article(articles[topic], seen_urls)
+        chosen[topic] = article["url"] if article else None
+    return chosen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--articles-per-topic", type=int, default=3)
+    parser.add_argument("--topics-per-query", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--max-pages", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--min-overlap", type=float, default=0.95,
+                        help="minimum mean share of per-topic articles the planned fetch must match")
+    args = parser.parse_args()
+
+    servers = ReplayServers(newsapi_latency_ms=args.latency_ms)
+    servers.start()
+    install_replay_config(servers.newsapi_url, args.articles_per_topic)
+    import fetch_news
+    fetch_news.NEWSAPI_TOPICS_PER_QUERY = args.topics_per_query
+    fetch_news.NEWSAPI_PAGE_SIZE = args.page_size
+    fetch_news.NEWSAPI_MAX_PAGES = args.max_pages
+
+    topics = make_topics(args.topics)
+    try:
+        baseline, baseline_requests, baseline_time = fetch(
+            fetch_news, servers, topics, args.articles_per_topic, coalesce=False)
+        planned, planned_requests, planned_time = fetch(
+            fetch_news, servers, topics, args.articles_per_topic, coalesce=True)
+
+        servers.newsapi.fixtures = overlapping_fixtures()
+        overlapping_baseline, _, _ = fetch(fetch_news, servers, OVERLAPPING_TOPICS, 2, coalesce=False)
+        overlapping_planned, _, _ = fetch(fetch_news, servers, OVERLAPPING_TOPICS, 2, coalesce=True)
+    finally:
+        servers.stop()
+
+    overlaps = list(article_overlap(baseline, planned).values())
+    overlap = sum(overlaps) / len(overlaps) if overlaps else 1.0
+    overlapping = article_overlap(overlapping_baseline, overlapping_planned)
+    baseline_chosen = chosen_articles(fetch_news, topics, baseline)
+    planned_chosen = chosen_articles(fetch_news, topics, planned)
+    same_choice = sum(baseline_chosen[topic] == planned_chosen[topic] for topic in topics) / len(topics)
+    empty = [topic for topic in topics if baseline[topic] and not planned[topic]]
+
+    print(f"{len(topics)} topics, {args.articles_per_topic} articles each")
+    print(f"  {'one query per topic':<28} {baseline_requests:5d} requests  {baseline_time:6.2f}s")
+    print(f"  {'query planner':<28} {planned_requests:5d} requests  {planned_time:6.2f}s  "
+          f"({baseline_requests / max(1, planned_requests):.1f}x fewer)")
+    print(f"  Per-topic article overlap: {overlap:.1%}")
+    print(f"  Same chosen article:       {same_choice:.1%}")
+    if empty:
+        print(f"  Topics left without articles: {', '.join(empty)}")
+    print("Overlapping topics, 2 articles each")
+    for topic, share in overlapping.items():
+        print(f"  {topic:<28} {share:6.1%} of its per-topic articles")
+
+    failures = []
+    if overlap < args.min_overlap:
+        failures.append(f"overlap below {args.min_overlap:.0%}")
+    missed = [topic for topic, share in overlapping.items() if share < 1]
+    if missed:
+        failures.append(f"overlapping topics missed per-topic articles ({', '.join(missed)})")
+    if failures:
+        print("Failed: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
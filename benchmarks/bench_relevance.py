@@ -0,0 +1,75 @@
+"""
+Benchmark: Relevance Scoring
+Compares the batched RelevanceScorer against the original per-article,
+per-topic substring scan that fetch_news.calculate_relevance_score used
+
+Usage:
+    python benchmarks/bench_relevance.py [--articles 5000] [--topics 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relevance import RelevanceScorer
+
+
+def legacy_relevance_score(article, topic):
+    """The original substring-based scorer, kept here as the baseline"""
+    topic_words = set(topic.lower().split())
+    title = article.get("title", "").lower()
+    description = article.get("description", "").lower()
+    content = article.get("content", "").lower()
+    return (sum(3 for word in topic_words if word in title)
+            + sum(2 for word in topic_words if word in description)
+            + sum(1 for word in topic_words if word in content))
+
+
+def make_corpus(n_articles, n_topics, seed=7):
+    """Build synthetic articles and topics from a shared vocabulary"""
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(20000)]
+    topics = [" ".join(rng.sample(vocabulary[:2000], rng.randint(1, 3))) for _ in range(n_topics)]
+
+    def text(words):
+        return " ".join(rng.choice(vocabulary[:5000]) for _ in range(words))
+
+    articles = [
+        {"title": text(12), "description": text(40), "content": text(200)}
+        for _ in range(n_articles)
+    ]
+    return articles, topics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--topics", type=int, default=50)
+    args = parser.parse_args()
+
+    articles, topics = make_corpus(args.articles, args.topics)
+    print(f"Scoring {len(articles)} articles x {len(topics)} topics")
+
+    started = time.perf_counter()
+    legacy = [[legacy_relevance_score(article, topic) for topic in topics] for article in articles]
+    legacy_time = time.perf_counter() - started
+    print(f"  legacy substring scan : {legacy_time:8.3f}s")
+
+    for weighting in RelevanceScorer.WEIGHTINGS:
+        started = time.perf_counter()
+        matrix = RelevanceScorer(topics, weighting).score_matrix(articles)
+        elapsed = time.perf_counter() - started
+        print(f"  RelevanceScorer {weighting:<6}: {elapsed:8.3f}s  ({legacy_time / elapsed:5.1f}x faster)")
+        if weighting == "binary":
+            # Differences are substring hits ("word1" inside "word12") the old scan counted
+            differing = sum(1 for old_row, new_row in zip(legacy, matrix)
+                            for old, new in zip(old_row, new_row) if old != new)
+            print(f"    scores differing from legacy (substring false positives): {differing}")
+
+
+if __name__ == "__main__":
+    main()
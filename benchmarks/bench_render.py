@@ -0,0 +1,97 @@
+"""
+Benchmark: Newsletter Rendering
+Renders a large newsletter for many recipients with the compiled
+NewsletterTemplate, and compares it with the original approach of
+rebuilding the whole document by string concatenation for every recipient
+
+Usage:
+    python benchmarks/bench_render.py [--articles 1000] [--recipients 10000] [--legacy-sample 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from send_email import EMAIL_HEAD, EMAIL_HEADER_TEMPLATE, NewsletterTemplate
+
+
+def legacy_create_email_html(articles, today):
+    """The original html += concatenation (unescaped), rebuilt from scratch each call"""
+    html = EMAIL_HEAD + EMAIL_HEADER_TEMPLATE.format(today=today)
+    for article in articles:
+        html += f"""
+        <div class="article">
+            <div class="topic">{article['topic']}</div>
+            <div class="title">{article['title']}</div>
+            <div class="source">Source: {article['source']}</div>
+            <div class="summary">{article['summary']}</div>
+            <a href="{article['url']}" class="read-more">Read Full Article →</a>
+        </div>
+        """
+    html += """
+        <div class="footer">
+            <p>This newsletter was automatically generated by your AI News Assistant</p>
+            <p>Powered by NewsAPI & OpenAI GPT-4o-mini</p>
+        </div>
+    </body>
+    </html>
+    """
+    return html
+
+
+def make_articles(count):
+    return [
+        {
+            "topic": f"topic {i % 20}",
+            "title": f"Headline number {i} & something <important>",
+            "source": "Example News",
+            "summary": "A three sentence summary of the story. " * 3,
+            "url": f"https://example.com/news/{i}?ref=newsletter&id={i}"
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--recipients", type=int, default=10000)
+    parser.add_argument("--legacy-sample", type=int, default=50,
+                        help="recipients rendered with the legacy builder (result is extrapolated)")
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles)
+    recipients = [f"reader{i}@example.com" for i in range(args.recipients)]
+    today = "January 01, 2026"
+    print(f"Rendering {args.articles} articles for {args.recipients} recipients")
+
+    started = time.perf_counter()
+    template = NewsletterTemplate(articles, today=today)
+    compile_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    total_bytes = 0
+    for recipient in recipients:
+        total_bytes += len(template.render(recipient))
+    render_time = time.perf_counter() - started
+    template_total = compile_time + render_time
+
+    sample = recipients[:args.legacy_sample]
+    started = time.perf_counter()
+    for _ in sample:
+        legacy_create_email_html(articles, today)
+    legacy_per_recipient = (time.perf_counter() - started) / max(1, len(sample))
+    legacy_total = legacy_per_recipient * len(recipients)
+
+    print(f"  template compile      : {compile_time * 1000:10.1f} ms (once)")
+    print(f"  template render       : {render_time:10.3f} s  ({render_time / len(recipients) * 1e6:.1f} µs/recipient, "
+          f"{total_bytes / 1e6:.0f} MB produced)")
+    print(f"  legacy (extrapolated) : {legacy_total:10.3f} s  ({legacy_per_recipient * 1e6:.1f} µs/recipient)")
+    print(f"  speedup               : {legacy_total / template_total:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
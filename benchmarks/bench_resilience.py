@@ -0,0 +1,202 @@
+"""
+Benchmark: Retries, Hedging and Circuit Breakers
+Runs the real summarize and fetch code against the replay servers (see
+replay_servers.py) with injected faults, with and without each part of the
+resilience layer (resilience.py)
+
+Scenarios:
+    tail      A share of completions is slow and a share answered with 500.
+              Compares per-article latency (p50/p95/p99) and failures with no
+              retries, with retries, and with retries plus hedged requests.
+    outage    OpenAI answers every request with a 503. Compares how long the
+              summaries take to fail, and how many requests are sent, with and
+              without the circuit breaker.
+    newsapi   A share of NewsAPI requests fails with a 500. Compares how many
+              topics end up without articles with and without retries.
+
+The script exits with status 1 when hedging does not cut the p99 latency of
+the tail scenario by at least --min-p99-speedup.
+
+Usage:
+    python benchmarks/bench_resilience.py [--articles 300] [--workers 8]
+        [--slow-rate 0.05] [--slow-ms 2000] [--error-rate 0.05] [--hedge-after 0.25]
+"""
+
+import argparse
+import os
+import sys
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from replay_servers import ReplayServers, synthetic_article
+
+
+def install_replay_config(servers):
+    """Register a `config` module that points NewsAPI and OpenAI at the replay servers"""
+    config = types.ModuleType("config")
+    config.NEWS_API_KEY = "replay"
+    config.OPENAI_API_KEY = "replay"
+    config.TOPICS = []
+    config.ARTICLES_PER_TOPIC = 1
+    config.OPENAI_MODEL = "gpt-4o-mini"
+    config.MAX_SUMMARY_TOKENS = 150
+    config.NEWS_API_URL = servers.newsapi_url
+    config.NEWSAPI_CACHE_PATH = ""  # Every request must really hit the replay server
+    config.NEWSAPI_COALESCE_TOPICS = False
+    config.SUMMARY_CACHE_PATH = ""
+    sys.modules["config"] = config
+    os.environ["OPENAI_BASE_URL"] = servers.openai_url
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize_run(summarize, servers, articles, workers, max_retries, hedge_after, breaker):
+    """
+    Summarize every article with summarize_article and time each one
+
+    Returns:
+        dict: latencies (sorted seconds), failed, requests, seconds
+    """
+    from openai import OpenAI
+    from rate_limiter import RateLimiter
+
+    summarize.OPENAI_MAX_RETRIES = max_retries
+    summarize.OPENAI_HEDGE_AFTER_SECONDS = hedge_after
+    summarize.OPENAI_BREAKER = breaker
+    client = OpenAI(api_key="replay", max_retries=0, timeout=30)
+    limiter = RateLimiter(10 ** 7, 10 ** 10)
+
+    def one(article):
+        started = time.perf_counter()
+        summary = summarize.summarize_article(client, article, "gpt-4o-mini", 150, limiter)
+        return time.perf_counter() - started, summary.startswith(summarize.ERROR_PREFIX)
+
+    before = servers.stats()["openai"]["requests"]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(one, articles))
+    elapsed = time.perf_counter() - started
+    client.close()
+    return {
+        "latencies": sorted(latency for latency, _ in results),
+        "failed": sum(failed for _, failed in results),
+        "requests": servers.stats()["openai"]["requests"] - before,
+        "seconds": elapsed
+    }
+
+
+def print_summary_run(label, run):
+    latencies = run["latencies"]
+    print(f"  {label:<28} p50 {percentile(latencies, 0.50) * 1000:6.0f} ms  "
+          f"p95 {percentile(latencies, 0.95) * 1000:6.0f} ms  p99 {percentile(latencies, 0.99) * 1000:6.0f} ms  "
+          f"failed {run['failed']:3d}  requests {run['requests']:4d}  total {run['seconds']:5.1f}s")
+
+
+def tail_scenario(summarize, servers, articles, args):
+    """
+    Returns:
+        tuple: (p99 with retries only, p99 with retries and hedging)
+    """
+    from resilience import CircuitBreaker
+
+    print(f"\nTail: {args.slow_rate:.0%} of completions +{args.slow_ms:.0f} ms, "
+          f"{args.error_rate:.0%} answered 500 ({len(articles)} articles, {args.workers} workers)")
+    servers.openai.injector.error_rate = args.error_rate
+    servers.openai.injector.slow_rate = args.slow_rate
+    runs = {}
+    for label, max_retries, hedge_after in (
+        ("no retries", 0, 0),
+        ("retries", 5, 0),
+        (f"retries + hedging ({args.hedge_after:g}s)", 5, args.hedge_after),
+    ):
+        runs[label] = summarize_run(summarize, servers, articles, args.workers, max_retries, hedge_after,
+                                    CircuitBreaker("openai", 0))
+        print_summary_run(label, runs[label])
+    servers.openai.injector.error_rate = 0.0
+    servers.openai.injector.slow_rate = 0.0
+    retries, hedged = list(runs.values())[1:]
+    return percentile(retries["latencies"], 0.99), percentile(hedged["latencies"], 0.99)
+
+
+def outage_scenario(summarize, servers, articles, args):
+    from resilience import CircuitBreaker
+
+    articles = articles[:args.outage_articles]
+    print(f"\nOutage: OpenAI answers 503 to every request ({len(articles)} articles, {args.workers} workers, "
+          f"{args.outage_retries} retries)")
+    servers.openai.injector.outage = True
+    for label, breaker in (("retries, no breaker", CircuitBreaker("openai", 0)),
+                           ("retries + circuit breaker", CircuitBreaker("openai", 5, 30))):
+        print_summary_run(label, summarize_run(summarize, servers, articles, args.workers,
+                                               args.outage_retries, 0, breaker))
+    servers.openai.injector.outage = False
+
+
+def newsapi_scenario(servers, args):
+    import fetch_news
+    from resilience import CircuitBreaker, RetryPolicy
+
+    topics = [f"topic {i}" for i in range(args.topics)]
+    print(f"\nNewsAPI: {args.newsapi_error_rate:.0%} of requests answered 500 ({len(topics)} topics)")
+    servers.newsapi.injector.error_rate = args.newsapi_error_rate
+    fetch_news.NEWSAPI_BREAKER = CircuitBreaker("newsapi", 0)
+    for label, retries in (("no retries", 0), ("retries", 2)):
+        fetch_news.NEWSAPI_RETRY_POLICY = RetryPolicy(retries, base_delay=0.1, max_delay=2)
+        before = servers.stats()["newsapi"]["requests"]
+        started = time.perf_counter()
+        results = fetch_news.fetch_topics(topics, "replay", 1, max_workers=5)
+        elapsed = time.perf_counter() - started
+        empty = sum(1 for articles, _ in results.values() if not articles)
+        print(f"  {label:<28} topics without articles {empty:3d}  "
+              f"requests {servers.stats()['newsapi']['requests'] - before:4d}  total {elapsed:5.1f}s")
+    servers.newsapi.injector.error_rate = 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="share of completions that are slow")
+    parser.add_argument("--slow-ms", type=float, default=2000, help="extra latency of a slow completion")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="share of completions answered 500")
+    parser.add_argument("--hedge-after", type=float, default=0.25, help="OPENAI_HEDGE_AFTER_SECONDS")
+    parser.add_argument("--outage-articles", type=int, default=40)
+    parser.add_argument("--outage-retries", type=int, default=2)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--newsapi-error-rate", type=float, default=0.2)
+    parser.add_argument("--min-p99-speedup", type=float, default=1.5,
+                        help="minimum p99 (retries) / p99 (retries + hedging) in the tail scenario")
+    args = parser.parse_args()
+
+    servers = ReplayServers(openai_latency_ms=args.latency_ms, slow_ms=args.slow_ms, openai_error_status=500)
+    servers.start()
+    install_replay_config(servers)
+    import summarize_articles
+
+    articles = [synthetic_article(f"topic {i % 20}", i) for i in range(args.articles)]
+    try:
+        p99_retries, p99_hedged = tail_scenario(summarize_articles, servers, articles, args)
+        outage_scenario(summarize_articles, servers, articles, args)
+        newsapi_scenario(servers, args)
+    finally:
+        servers.stop()
+
+    speedup = p99_retries / p99_hedged
+    print(f"\nHedging cut p99 latency {speedup:.1f}x ({p99_retries * 1000:.0f} ms -> {p99_hedged * 1000:.0f} ms)")
+    if speedup < args.min_p99_speedup:
+        print(f"Less than {args.min_p99_speedup:g}x")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: CLI Startup
+Measures how long `import main` and `main.py --check` take in a fresh
+interpreter, and which modules the import pulls in
+
+The import is timed with `python -X importtime`; the heaviest imports are
+listed so a new eager import of openai, requests or httpx shows up at once.
+The script exits with status 1 when the median `--check` time is over the
+budget, so it can guard startup time in CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--budget-ms 250] [--top 10]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a CLI start should not import: only the stages that call the APIs need them
+HEAVY_MODULES = ("openai", "requests", "httpx")
+
+# Appended to the example config so `--check` passes; nothing is ever sent
+PLACEHOLDER_VALUES = """
+NEWS_API_KEY = "bench"
+OPENAI_API_KEY = "bench"
+SENDER_EMAIL = "bench@example.com"
+SENDER_PASSWORD = "bench"
+RECIPIENT_EMAIL = "reader@example.com"
+"""
+
+
+def make_workdir():
+    """Create a directory with a config.py built from config.example.py, with the placeholders filled in"""
+    directory = tempfile.mkdtemp(prefix="bench_startup_")
+    with open(os.path.join(REPO, "config.example.py"), "r", encoding="utf-8") as f:
+        config = f.read()
+    with open(os.path.join(directory, "config.py"), "w", encoding="utf-8") as f:
+        f.write(config + PLACEHOLDER_VALUES)
+    return directory
+
+
+# Runs a script with the work directory ahead of the script's own directory on
+# sys.path, so a config.py in the repository does not shadow the placeholder one
+RUN_SCRIPT = ("import runpy, sys; sys.path.insert(0, {workdir!r}); "
+              "sys.argv[0] = {script!r}; runpy.run_path({script!r}, run_name='__main__')")
+
+
+def run(args, workdir):
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([workdir, REPO]))
+    return subprocess.run([sys.executable, *args], cwd=workdir, env=environment,
+                          capture_output=True, text=True, check=True)
+
+
+def import_times(workdir):
+    """
+    Returns:
+        dict: Cumulative import time in microseconds for each module imported by `import main`
+    """
+    result = run(["-X", "importtime", "-c", "import main"], workdir)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def time_interpreter(workdir):
+    """Wall-clock seconds to start and stop an interpreter that does nothing"""
+    started = time.perf_counter()
+    run(["-c", "pass"], workdir)
+    return time.perf_counter() - started
+
+
+def time_check(workdir, runs):
+    """
+    Returns:
+        list: Wall-clock seconds of each `main.py --check` run
+    """
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        script = os.path.join(REPO, "main.py")
+        run(["-c", RUN_SCRIPT.format(workdir=workdir, script=script), "--check"], workdir)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=250,
+                        help="maximum median time for `main.py --check` (0 = no budget)")
+    parser.add_argument("--top", type=int, default=10, help="how many of the heaviest imports to list")
+    args = parser.parse_args()
+
+    workdir = make_workdir()
+    try:
+        times = import_times(workdir)
+        print(f"import main: {times.get('main', 0) / 1000:.1f} ms cumulative")
+        print("Heaviest imports:")
+        for name, cumulative in sorted(times.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"  {name:<40} {cumulative / 1000:8.1f} ms")
+        loaded = [name for name in HEAVY_MODULES if name in times]
+        print(f"Heavy modules imported at startup: {', '.join(loaded) if loaded else 'none'}")
+
+        baseline = statistics.median(time_interpreter(workdir) for _ in range(args.runs))
+        timings = time_check(workdir, args.runs)
+        median = statistics.median(timings)
+        print(f"main.py --check: median {median * 1000:.0f} ms, best {min(timings) * 1000:.0f} ms "
+              f"over {args.runs} runs (bare interpreter {baseline * 1000:.0f} ms)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.budget_ms and median * 1000 > args.budget_ms:
+        print(f"Over budget: {median * 1000:.0f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    if args.budget_ms:
+        print(f"Within budget ({args.budget_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
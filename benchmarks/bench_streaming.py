@@ -0,0 +1,146 @@
+"""
+Benchmark: Streaming Summaries with Deadlines
+Runs the real summarize code against the replay OpenAI server (see
+replay_servers.py) with completions streamed token by token, a share of
+which stall part-way through, and compares full completions with
+streamed ones under a per-article and a whole-run deadline
+
+Runs:
+    full completions      SUMMARY_STREAMING off, no deadline (the old behaviour)
+    streamed              SUMMARY_STREAMING on, no deadline
+    streamed + deadline   SUMMARY_DEADLINE_SECONDS per article: a stalled
+                          summary keeps the sentences it finished
+    ... + run deadline    as above, and the whole run has to be done within
+                          --run-deadline seconds
+
+For each run the per-article latency (p50/p95/p99), the summaries cut short
+at a sentence, the summaries that fell back to a local extractive summary,
+time to first token and tokens per second are printed. The script exits
+with status 1 when a deadline is overrun by more than --max-overrun.
+
+Usage:
+    python benchmarks/bench_streaming.py [--articles 200] [--workers 8] [--token-ms 15]
+        [--slow-rate 0.05] [--slow-ms 5000] [--deadline 1.5] [--run-deadline 8]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_resilience import install_replay_config, percentile
+from replay_servers import ReplayServers, synthetic_article
+
+
+def summarize_run(summarize, servers, articles, workers, streaming, deadline_seconds, run_deadline_seconds):
+    """
+    Summarize every article with summarize_article and time each one
+
+    Returns:
+        dict: latencies (sorted seconds), cut_short, fallbacks, seconds and the METRICS report
+    """
+    from openai import OpenAI
+    from metrics import METRICS
+    from rate_limiter import RateLimiter
+
+    summarize.SUMMARY_STREAMING = streaming
+    summarize.SUMMARY_DEADLINE_SECONDS = deadline_seconds
+    client = OpenAI(api_key="replay", max_retries=0, timeout=30)
+    limiter = RateLimiter(10 ** 7, 10 ** 10)
+    METRICS.reset()
+    servers.openai.injector.reseed(1)
+
+    def one(article):
+        started = time.perf_counter()
+        summary = summarize.summarize_article(client, article, "gpt-4o-mini", 150, limiter, run_deadline)
+        return time.perf_counter() - started, summary.startswith(summarize.ERROR_PREFIX)
+
+    started = time.perf_counter()
+    run_deadline = time.monotonic() + run_deadline_seconds if run_deadline_seconds else None
+    # summarize_article reports every cut-short and failed summary; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(one, articles))
+    elapsed = time.perf_counter() - started
+    client.close()
+    report = METRICS.report()
+    cut_short = sum(c["value"] for c in report["counters"] if c["name"] == "summaries_cut_short_total")
+    return {
+        "latencies": sorted(latency for latency, _ in results),
+        "fallbacks": sum(failed for _, failed in results),
+        "cut_short": cut_short,
+        "seconds": elapsed,
+        "histograms": {h["name"]: h for h in report["histograms"]}
+    }
+
+
+def print_run(label, run):
+    latencies = run["latencies"]
+    print(f"  {label:<30} p50 {percentile(latencies, 0.50):5.2f}s  p95 {percentile(latencies, 0.95):5.2f}s  "
+          f"p99 {percentile(latencies, 0.99):5.2f}s  cut short {run['cut_short']:3d}  "
+          f"fallbacks {run['fallbacks']:3d}  total {run['seconds']:5.1f}s")
+    ttft = run["histograms"].get("time_to_first_token_seconds")
+    rate = run["histograms"].get("tokens_per_second")
+    if ttft is not None and rate is not None:
+        print(f"  {'':<30} time to first token p50 {ttft['p50'] * 1000:4.0f} ms, "
+              f"p95 {ttft['p95'] * 1000:4.0f} ms; {rate['p50']:.0f} tokens/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=100, help="time to first token")
+    parser.add_argument("--token-ms", type=float, default=15, help="gap between streamed tokens")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="share of completions that stall")
+    parser.add_argument("--slow-ms", type=float, default=5000, help="how long a stalled completion stalls")
+    parser.add_argument("--deadline", type=float, default=1.5, help="SUMMARY_DEADLINE_SECONDS")
+    parser.add_argument("--run-deadline", type=float, default=8, help="deadline of the whole run in seconds")
+    parser.add_argument("--max-overrun", type=float, default=0.25,
+                        help="seconds a summary or the run may finish after its deadline")
+    args = parser.parse_args()
+
+    servers = ReplayServers(openai_latency_ms=args.latency_ms, openai_slow_rate=args.slow_rate,
+                            slow_ms=args.slow_ms, openai_token_ms=args.token_ms)
+    servers.start()
+    install_replay_config(servers)
+    import summarize_articles
+
+    articles = [synthetic_article(f"topic {i % 20}", i) for i in range(args.articles)]
+    print(f"{len(articles)} articles, {args.workers} workers, {args.token_ms:g} ms per token, "
+          f"{args.slow_rate:.0%} of completions stall for {args.slow_ms / 1000:g}s after their first sentence")
+    try:
+        runs = {}
+        for label, streaming, deadline, run_deadline in (
+            ("full completions", False, 0, 0),
+            ("streamed", True, 0, 0),
+            (f"streamed + {args.deadline:g}s deadline", True, args.deadline, 0),
+            (f"  ... + {args.run_deadline:g}s run deadline", True, args.deadline, args.run_deadline),
+        ):
+            runs[label] = summarize_run(summarize_articles, servers, articles, args.workers,
+                                        streaming, deadline, run_deadline)
+            print_run(label, runs[label])
+    finally:
+        servers.stop()
+
+    full, _, per_article, whole_run = runs.values()
+    print(f"\nPer-article deadline cut p99 latency from {percentile(full['latencies'], 0.99):.2f}s "
+          f"to {percentile(per_article['latencies'], 0.99):.2f}s")
+    overruns = []
+    if per_article["latencies"][-1] > args.deadline + args.max_overrun:
+        overruns.append(f"slowest summary took {per_article['latencies'][-1]:.2f}s ({args.deadline:g}s deadline)")
+    if whole_run["seconds"] > args.run_deadline + args.max_overrun:
+        overruns.append(f"run took {whole_run['seconds']:.2f}s ({args.run_deadline:g}s deadline)")
+    if overruns:
+        print("Deadline overrun: " + "; ".join(overruns))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+"""
+Replay Servers
+Local stand-ins for NewsAPI, OpenAI and Gmail used by the pipeline benchmark
+
+Each server runs on 127.0.0.1 in a background thread and can add latency
+and inject errors, so the real fetch, summarize and send code can be
+exercised without credentials or network access.
+"""
+
+import base64
+import heapq
+import json
+import random
+import re
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from urllib.parse import parse_qs, urlparse
+
+# Vocabulary for synthetic articles (varied enough that near-duplicate detection does not fire)
+_WORDS = """
+agency airport analysts announced budget cabinet campaign capital ceasefire central
+championship charity cities climate coastal committee community companies council court
+crops currency customers data deal debate defence demand district doctors drought economy
+election energy engineers exports factory farmers festival finance flights forecast funding
+government growth harbour health hospital households housing industry inflation
+investigation investors island jobs judge launch lawmakers league market mayor minister
+mission museum network officials opposition parliament patients pension pilots plant police
+port prices production protest railway recovery refinery regulators report researchers
+reservoir residents retailers river rules satellite schools scientists season security
+shares shipping startup station storm strike students study summit supply survey talks
+tariffs teachers team technology tourism trade traffic transport treaty trial union
+university vaccine villages voters wages warehouse water weather wildfire workers
+""".split()
+
+
+class _Injector:
+    """
+    Seeded latency and error injection shared by a server's handler threads
+
+    A `slow_rate` share of requests takes `slow_ms` longer (a tail-latency
+    spike), and while `outage` is True every request fails with a 503.
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0, slow_rate=0.0, slow_ms=0.0):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow = slow_ms / 1000.0
+        self.outage = False
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def reseed(self, seed):
+        """Restart the random sequence, so runs compared with each other get the same faults"""
+        with self._lock:
+            self._random.seed(seed)
+
+    def sample(self):
+        """
+        Returns:
+            tuple: (one request's latency in seconds, extra seconds if it is a slow one)
+        """
+        with self._lock:
+            delay = self._random.gauss(self.latency, self.jitter) if self.jitter else self.latency
+            slow = self.slow if self.slow_rate > 0 and self._random.random() < self.slow_rate else 0.0
+        return delay, slow
+
+    def delay(self):
+        """Sleep for one request's worth of latency"""
+        delay = sum(self.sample())
+        if delay > 0:
+            time.sleep(delay)
+
+    def in_outage(self):
+        """Count a request refused by an outage"""
+        with self._lock:
+            if self.outage:
+                self.requests += 1
+                self.errors += 1
+            return self.outage
+
+    def should_fail(self):
+        """Count a request and decide whether it gets an injected error"""
+        with self._lock:
+            self.requests += 1
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return fail
+
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that gave up on a request (timeouts, dropped hedges) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+# Publish time of every topic's newest synthetic article
+_NEWEST = datetime(2025, 11, 28, 23, 0)
+
+
+@lru_cache(maxsize=None)
+def _story_interval(topic):
+    return random.Random(f"{topic}/rate").randint(5, 240)
+
+
+def synthetic_published_at(topic, i):
+    """
+    Publish time of a topic's i-th newest synthetic article
+
+    Each topic publishes at its own steady rate (one story every 5 minutes
+    to 4 hours), so combined queries see busy and quiet topics side by side.
+    """
+    interval = _story_interval(topic)
+    return (_NEWEST - timedelta(minutes=i * interval)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def synthetic_article(topic, i):
+    """
+    Generate a topic's i-th newest article in the NewsAPI format (deterministic per topic)
+    """
+    rng = random.Random(f"{topic}/{i}")
+    title = " ".join(rng.sample(_WORDS, 7)).capitalize()
+    description = " ".join(rng.sample(_WORDS, 18))
+    content = ". ".join(" ".join(rng.sample(_WORDS, 14)).capitalize() for _ in range(6)) + "."
+    return {
+        "source": {"id": None, "name": f"Replay Source {rng.randint(1, 40)}"},
+        "author": None,
+        "title": f"{topic.title()}: {title}",
+        "description": f"{description} ({topic})",
+        "url": f"https://replay.example.com/{_slug(topic)}/{i}",
+        "publishedAt": synthetic_published_at(topic, i),
+        "content": f"{content} [+{rng.randint(800, 4000)} chars]"
+    }
+
+
+def synthetic_articles(topic, count):
+    """
+    Generate NewsAPI-shaped articles for a topic, newest first (deterministic per topic)
+
+    Args:
+        topic (str): Query the articles should match
+        count (int): Number of articles
+
+    Returns:
+        list: Articles in the NewsAPI response format
+    """
+    return [synthetic_article(topic, i) for i in range(count)]
+
+
+def query_topics(q):
+    """Split an OR-query built by the query planner back into its topics"""
+    topics = []
+    for clause in q.split(" OR "):
+        clause = clause.strip()
+        if clause.startswith("(") and clause.endswith(")"):
+            clause = clause[1:-1]
+        topics.append(clause)
+    return topics
+
+
+class _NewsAPIHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if server.injector.in_outage():
+            return self._reply(503, {"status": "error", "code": "unexpectedError", "message": "Injected outage"})
+        server.injector.delay()
+        if server.injector.should_fail():
+            return self._reply(500, {"status": "error", "code": "unexpectedError", "message": "Injected error"})
+
+        query = parse_qs(urlparse(self.path).query)
+        topics = query_topics(query.get("q", [""])[0])
+        page_size = int(query.get("pageSize", ["1"])[0])
+        page = int(query.get("page", ["1"])[0])
+        since = query.get("from", [""])[0]
+
+        # Every topic's matches newest first, merged lazily so only the requested page is generated;
+        # an article matching several topics of an OR-query is returned once, as NewsAPI does
+        streams = [self._matches(topic, since) for topic in topics]
+        total = len({url for topic in topics for _, url, _ in self._matches(topic, since)})
+        merged = self._unique(heapq.merge(*streams, key=lambda match: match[0], reverse=True))
+        articles = [make() for _, _, make in islice(merged, (page - 1) * page_size, page * page_size)]
+        self._reply(200, {"status": "ok", "totalResults": total, "articles": articles})
+
+    @staticmethod
+    def _unique(matches):
+        seen = set()
+        for match in matches:
+            if match[1] not in seen:
+                seen.add(match[1])
+                yield match
+
+    def _matches(self, topic, since):
+        """Yield (publishedAt, url, article factory) for a topic's articles at or after `since`, newest first"""
+        recorded = self.server.fixtures.get(topic)
+        if recorded:
+            for article in sorted(recorded["articles"], key=lambda a: a["publishedAt"], reverse=True):
+                if article["publishedAt"] < since:
+                    return
+                yield article["publishedAt"], article["url"], lambda article=article: article
+            return
+        for i in range(self.server.results_per_topic):
+            published_at = synthetic_published_at(topic, i)
+            if published_at < since:
+                return
+            url = f"https://replay.example.com/{_slug(topic)}/{i}"
+            yield published_at, url, lambda i=i: synthetic_article(topic, i)
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if server.injector.in_outage():
+            return self._reply(503, {"error": {"message": "Injected outage", "type": "server_error"}})
+        delay, slow = server.injector.sample()
+        # A slow stream stalls part-way instead of before its first token
+        delay += 0.0 if body.get("stream") else slow
+        if delay > 0:
+            time.sleep(delay)
+        if server.injector.should_fail():
+            if server.error_status != 429:
+                return self._reply(server.error_status, {"error": {"message": "Injected error", "type": "server_error"}})
+            return self._reply(429, {"error": {"message": "Injected rate limit", "type": "requests"}},
+                               {"retry-after-ms": str(server.retry_after_ms)})
+
+        prompt = body["messages"][-1]["content"]
+        if body.get("response_format", {}).get("type") == "json_object":
+            ids = re.findall(r"### Article (\S+)\nTitle: (.*)", prompt)
+            content = json.dumps({"summaries": [
+                {"id": article_id, "summary": f"Replay summary of {title}."} for article_id, title in ids
+            ]})
+        else:
+            title = re.search(r"Title: (.*)", prompt)
+            content = (f"Replay summary of {title.group(1) if title else 'the article'}. "
+                       "It covers the key facts in two short sentences.")
+
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+        completion_tokens = len(content) // 4
+        if body.get("stream"):
+            return self._stream(body, content, prompt_tokens, slow)
+        if server.token_ms:
+            time.sleep(len(re.findall(r"\S+\s*", content)) * server.token_ms / 1000.0)  # Generation time
+        self._reply(200, {
+            "id": f"chatcmpl-replay-{server.injector.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "replay"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        })
+
+    def _stream(self, body, content, prompt_tokens, slow):
+        """
+        Send `content` as server-sent events, one word per chunk every token_ms
+
+        A slow completion stalls for `slow` seconds after its first sentence.
+        """
+        server = self.server
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()  # No Content-Length: the body ends when the connection closes
+        base = {"id": f"chatcmpl-replay-{server.injector.requests}", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": body.get("model", "replay")}
+
+        def event(choices, **extra):
+            self.wfile.write(f"data: {json.dumps({**base, 'choices': choices, **extra})}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        tokens = re.findall(r"\S+\s*", content)
+        for number, token in enumerate(tokens):
+            if number and server.token_ms:
+                time.sleep(server.token_ms / 1000.0)
+            event([{"index": 0, "delta": {"content": token}, "finish_reason": None}])
+            if slow and token.rstrip().endswith("."):
+                time.sleep(slow)
+                slow = 0.0
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (body.get("stream_options") or {}).get("include_usage"):
+            event([], usage={"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                             "total_tokens": prompt_tokens + len(tokens)})
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: accepts any login and discards every message"""
+
+    def _send(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        self._send("220 replay-sink ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            verb = command.split(" ", 1)[0]
+
+            if verb == "EHLO":
+                self._send("250-replay-sink")
+                self._send("250-AUTH PLAIN LOGIN")
+                self._send("250 8BITMIME")
+            elif verb == "HELO":
+                self._send("250 replay-sink")
+            elif verb == "AUTH":
+                if command.startswith("AUTH LOGIN"):
+                    # Username and password prompts ("Username:" / "Password:")
+                    for prompt in ("VXNlcm5hbWU6", "UGFzc3dvcmQ6"):
+                        self._send(f"334 {prompt}")
+                        self.rfile.readline()
+                elif command == "AUTH PLAIN":
+                    self._send("334 ")
+                    base64.b64decode(self.rfile.readline().strip() or b"")
+                self._send("235 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._send("250 OK")
+            elif verb == "DATA":
+                self._send("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data == b".\r\n":
+                        break
+                    size += len(data)
+                server.injector.delay()
+                if server.injector.should_fail():
+                    self._send("421 Injected error, closing connection")
+                    return
+                with server.lock:
+                    server.messages += 1
+                    server.bytes_received += size
+                self._send("250 OK queued")
+            elif verb == "QUIT":
+                self._send("221 Bye")
+                return
+            else:
+                self._send("502 Command not implemented")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ReplayServers:
+    """
+    Start the NewsAPI, OpenAI and SMTP stand-ins together
+
+    Example:
+        servers = ReplayServers(openai_latency_ms=40, openai_error_rate=0.02)
+        servers.start()
+        ...  # point NEWS_API_URL, OPENAI_BASE_URL and SMTP_* at servers.*_url / smtp_port
+        servers.stop()
+    """
+
+    def __init__(self, newsapi_latency_ms=30, openai_latency_ms=50, smtp_latency_ms=2, jitter_ms=5,
+                 newsapi_error_rate=0.0, openai_error_rate=0.0, smtp_error_rate=0.0,
+                 fixtures_path=None, retry_after_ms=20, results_per_topic=100, seed=42,
+                 newsapi_slow_rate=0.0, openai_slow_rate=0.0, slow_ms=2000, openai_error_status=429,
+                 openai_token_ms=0):
+        """
+        Args:
+            newsapi_latency_ms (float): Mean latency per NewsAPI request
+            openai_latency_ms (float): Mean latency per chat completion
+            smtp_latency_ms (float): Mean latency per accepted message
+            jitter_ms (float): Standard deviation added to every latency
+            newsapi_error_rate (float): Fraction of NewsAPI requests answered with HTTP 500
+            openai_error_rate (float): Fraction of completions answered with openai_error_status
+            smtp_error_rate (float): Fraction of messages answered with 421 (connection closed)
+            fixtures_path (str): Optional JSON file of recorded NewsAPI responses keyed by topic;
+                                 topics not in the file get synthetic articles
+            retry_after_ms (int): retry-after-ms header sent with injected 429s
+            results_per_topic (int): Synthetic articles NewsAPI "has" for each topic
+            seed (int): Seed for latency and error injection
+            newsapi_slow_rate (float): Fraction of NewsAPI requests delayed by slow_ms
+            openai_slow_rate (float): Fraction of completions delayed by slow_ms
+            slow_ms (float): Extra latency of a slow request
+            openai_error_status (int): Status of injected OpenAI errors (429 or e.g. 500)
+            openai_token_ms (float): Time to generate one word of a completion; a streamed
+                                     one (stream=True) sends a chunk per word and, if slow,
+                                     stalls after its first sentence
+
+        Set e.g. servers.openai.injector.outage = True to answer every request with a 503.
+        """
+        fixtures = {}
+        if fixtures_path:
+            with open(fixtures_path, "r", encoding="utf-8") as f:
+                fixtures = json.load(f)
+
+        self.newsapi = _ReplayHTTPServer(("127.0.0.1", 0), _NewsAPIHandler)
+        self.newsapi.injector = _Injector(newsapi_latency_ms, jitter_ms, newsapi_error_rate, seed,
+                                           newsapi_slow_rate, slow_ms)
+        self.newsapi.fixtures = fixtures
+        self.newsapi.results_per_topic = results_per_topic
+
+        self.openai = _ReplayHTTPServer(("127.0.0.1", 0), _OpenAIHandler)
+        self.openai.injector = _Injector(openai_latency_ms, jitter_ms, openai_error_rate, seed + 1,
+                                          openai_slow_rate, slow_ms)
+        self.openai.retry_after_ms = retry_after_ms
+        self.openai.error_status = openai_error_status
+        self.openai.token_ms = openai_token_ms
+
+        self.smtp = _ThreadingTCPServer(("127.0.0.1", 0), _SMTPSinkHandler)
+        self.smtp.injector = _Injector(smtp_latency_ms, jitter_ms, smtp_error_rate, seed + 2)
+        self.smtp.lock = threading.Lock()
+        self.smtp.messages = 0
+        self.smtp.bytes_received = 0
+
+        self._threads = []
+
+    @property
+    def newsapi_url(self):
+        return f"http://127.0.0.1:{self.newsapi.server_address[1]}/v2/everything"
+
+    @property
+    def openai_url(self):
+        return f"http://127.0.0.1:{self.openai.server_address[1]}/v1"
+
+    @property
+    def smtp_port(self):
+        return self.smtp.server_address[1]
+
+    def start(self):
+        """Serve all three stand-ins in background threads"""
+        for server in (self.newsapi, self.openai, self.smtp):
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Shut every server down"""
+        for server in (self.newsapi, self.openai, self.smtp):
+            server.shutdown()
+            server.server_close()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Requests served and errors injected per server, plus messages accepted by the sink
+        """
+        return {
+            "newsapi": {"requests": self.newsapi.injector.requests, "errors": self.newsapi.injector.errors},
+            "openai": {"requests": self.openai.injector.requests, "errors": self.openai.injector.errors},
+            "smtp": {"messages": self.smtp.messages, "bytes": self.smtp.bytes_received,
+                     "errors": self.smtp.injector.errors}
+        }
@@ -0,0 +1,262 @@
+"""
+Bulk Email Delivery
+Sends one newsletter to many recipients over a small pool of authenticated SMTP connections
+"""
+
+import queue
+import smtplib
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import METRICS
+from rate_limiter import RateLimiter
+from send_email import SMTP_SERVER, SMTP_PORT, SMTP_USE_TLS, build_message
+
+# Errors that mean the connection is unusable and the message should be retried on a new one
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, socket.timeout, ConnectionError, OSError)
+
+
+class SMTPConnectionPool:
+    """
+    Pool of logged-in SMTP connections
+
+    Connections are opened lazily, reused for many messages and recycled
+    after `max_messages_per_connection` sends (Gmail drops long sessions).
+    """
+
+    def __init__(self, sender_email, sender_password, server=SMTP_SERVER, port=SMTP_PORT,
+                 size=2, use_tls=SMTP_USE_TLS, timeout=30, max_messages_per_connection=100):
+        """
+        Args:
+            sender_email (str): Account to log in as
+            sender_password (str): App password (empty to skip login, e.g. for a local relay)
+            server (str): SMTP host
+            port (int): SMTP port
+            size (int): Maximum number of open connections
+            use_tls (bool): Upgrade connections with STARTTLS
+            timeout (float): Socket timeout in seconds
+            max_messages_per_connection (int): Reconnect after this many messages
+        """
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.server = server
+        self.port = port
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.connections_opened = 0
+        self._idle = queue.Queue()
+        self._slots = threading.Semaphore(size)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                connection.starttls()
+            if self.sender_password:
+                connection.login(self.sender_email, self.sender_password)
+        except Exception:
+            connection.close()
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return [connection, 0]
+
+    def acquire(self):
+        """
+        Take a connection from the pool, opening one if none is idle
+
+        Returns:
+            list: [smtplib.SMTP, messages sent on it]
+        """
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def release(self, entry, broken=False):
+        """
+        Return a connection to the pool
+
+        Args:
+            entry (list): Value returned by acquire()
+            broken (bool): True if the connection failed and must be discarded
+        """
+        if broken or entry[1] >= self.max_messages_per_connection:
+            self._discard(entry[0], quit=not broken)
+        else:
+            self._idle.put(entry)
+        self._slots.release()
+
+    @staticmethod
+    def _discard(connection, quit=True):
+        try:
+            if quit:
+                connection.quit()
+            else:
+                connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Log out of every idle connection"""
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+
+
+def message_limiter(messages_per_minute):
+    """
+    Create the throttle shared by every connection sending one newsletter
+
+    Args:
+        messages_per_minute (int): Messages allowed per minute (None or 0 = no throttle)
+
+    Returns:
+        RateLimiter or None: Limiter to reserve one request per message attempt
+    """
+    return RateLimiter(messages_per_minute) if messages_per_minute else None
+
+
+def reply_action(code):
+    """
+    Decide what to do after an SMTP error reply
+
+    Args:
+        code (int): SMTP reply code
+
+    Returns:
+        tuple: (retry, reconnect) - whether the message may be sent again, and whether
+               the connection has to be replaced first (421: the server is closing it)
+    """
+    return 400 <= code < 500, code == 421
+
+
+def _send_one(pool, limiter, subject, html_content, recipient, max_attempts):
+    """
+    Deliver one message, reconnecting on 421 responses and dropped connections
+
+    Returns:
+        dict: {"ok": bool, "error": str or None, "attempts": int}
+    """
+    error = None
+    for attempt in range(1, max_attempts + 1):
+        if attempt > 1:
+            METRICS.increment("retries_total", service="smtp")
+        if limiter is not None:
+            limiter.acquire()
+
+        try:
+            entry = pool.acquire()
+        except smtplib.SMTPAuthenticationError as e:
+            return {"ok": False, "error": f"Authentication failed: {e}", "attempts": attempt}
+        except (smtplib.SMTPException, *_CONNECTION_ERRORS) as e:
+            error = f"Could not connect: {e}"
+            continue
+
+        try:
+            content = html_content(recipient) if callable(html_content) else html_content
+            with METRICS.timer("request_seconds", service="smtp"):
+                entry[0].send_message(build_message(subject, content, pool.sender_email, recipient))
+            METRICS.increment("bytes_sent_total", len(content.encode("utf-8")), service="smtp")
+            entry[1] += 1
+            pool.release(entry)
+            return {"ok": True, "error": None, "attempts": attempt}
+
+        except smtplib.SMTPRecipientsRefused as e:
+            # Permanent for this address; the connection itself is fine
+            entry[1] += 1
+            pool.release(entry)
+            return {"ok": False, "error": f"Recipient refused: {e.recipients}", "attempts": attempt}
+
+        except smtplib.SMTPResponseException as e:
+            retry, reconnect = reply_action(e.smtp_code)
+            pool.release(entry, broken=reconnect)
+            error = f"SMTP {e.smtp_code}: {e.smtp_error!r}"
+            if not retry:
+                return {"ok": False, "error": error, "attempts": attempt}
+
+        except _CONNECTION_ERRORS as e:
+            pool.release(entry, broken=True)
+            error = f"Connection lost: {e}"
+
+        except Exception as e:
+            pool.release(entry, broken=True)
+            return {"ok": False, "error": f"Unexpected error: {e}", "attempts": attempt}
+
+    return {"ok": False, "error": error, "attempts": max_attempts}
+
+
+def send_bulk_email(subject, html_content, sender_email, sender_password, recipients,
+                    pool_size=2, messages_per_minute=None, max_attempts=3, pool=None,
+                    on_result=None):
+    """
+    Send a newsletter to many recipients
+
+    Messages are sent by `pool_size` workers, each reusing a logged-in SMTP
+    connection instead of connecting, running STARTTLS and logging in once
+    per recipient. A 421 reply, timeout or dropped connection discards that
+    connection and the message is retried on a fresh one.
+
+    Args:
+        subject (str): Email subject line
+        html_content (str or callable): HTML body, or a function recipient -> HTML body
+        sender_email (str): Sender's email address
+        sender_password (str): Sender's app password
+        recipients (list): Recipient addresses
+        pool_size (int): Number of SMTP connections used in parallel
+        messages_per_minute (int): Optional throttle across all connections
+        max_attempts (int): Tries per recipient for transient failures
+        pool (SMTPConnectionPool): Optional pool (one for SMTP_SERVER is created if omitted)
+        on_result (callable): Optional function (recipient, result) called as each message
+                              finishes, e.g. to checkpoint deliveries
+
+    Returns:
+        dict: recipient -> {"ok": bool, "error": str or None, "attempts": int}
+    """
+
+    owns_pool = pool is None
+    if owns_pool:
+        pool = SMTPConnectionPool(sender_email, sender_password, size=pool_size)
+    limiter = message_limiter(messages_per_minute)
+
+    def send(recipient):
+        result = _send_one(pool, limiter, subject, html_content, recipient, max_attempts)
+        if on_result is not None:
+            on_result(recipient, result)
+        return result
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, pool_size)) as executor:
+            results = list(executor.map(send, recipients))
+    finally:
+        if owns_pool:
+            pool.close()
+
+    for result in results:
+        METRICS.increment("emails_total", result="sent" if result["ok"] else "failed")
+    return dict(zip(recipients, results))
+
+
+def print_delivery_report(report):
+    """
+    Print a per-recipient delivery summary
+
+    Args:
+        report (dict): Value returned by send_bulk_email
+    """
+    delivered = sum(1 for result in report.values() if result["ok"])
+    print(f"Delivered {delivered} of {len(report)} messages")
+    for recipient, result in report.items():
+        if not result["ok"]:
+            print(f"  ❌ {recipient}: {result['error']} (after {result['attempts']} attempts)")
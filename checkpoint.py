@@ -0,0 +1,193 @@
+"""
+Run Checkpoints
+Persists each stage of a newsletter run so a failed run can be resumed without repeating API work
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+
+
+def _write_json_atomic(path, data):
+    """Write JSON to `path` via a temporary file so readers never see a partial file"""
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def new_run_id():
+    """
+    Returns:
+        str: Run ID based on the current time (sorts chronologically), with a random
+             suffix so runs started in the same second get their own checkpoint
+    """
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+
+
+def latest_incomplete_run(directory="runs"):
+    """
+    Find the most recent run that did not finish
+
+    Finished runs delete their checkpoint, so any run directory with a
+    readable manifest belongs to a run that stopped early.
+
+    Args:
+        directory (str): Checkpoint directory
+
+    Returns:
+        str or None: Run ID, or None if there is nothing to resume
+    """
+    try:
+        run_ids = sorted(os.listdir(directory), reverse=True)
+    except FileNotFoundError:
+        return None
+    for run_id in run_ids:
+        manifest = os.path.join(directory, run_id, "manifest.json")
+        try:
+            with open(manifest, "r", encoding="utf-8") as f:
+                json.load(f)
+            return run_id
+        except (OSError, json.JSONDecodeError):
+            continue
+    return None
+
+
+class RunCheckpoint:
+    """
+    On-disk record of one newsletter run
+
+    Layout of runs/<run_id>/:
+        manifest.json    - run ID, topics, model and the last completed stage
+        fetched.json     - articles chosen by the fetch stage
+        summaries/       - one file per summarized article, written as soon
+                           as its summary arrives
+        delivered.jsonl  - one line per recipient the newsletter reached
+
+    Every JSON file is replaced atomically. delivered.jsonl is append-only
+    and fsynced per line; a torn last line after a crash is ignored, and
+    the next delivery starts on a line of its own.
+    """
+
+    STAGES = ("started", "fetched", "summarized", "sent")
+
+    def __init__(self, run_id, directory="runs", topics=None, model=None):
+        """
+        Args:
+            run_id (str): Run ID (see new_run_id)
+            directory (str): Parent directory for all checkpoints
+            topics (list): Topics of the run (recorded in the manifest)
+            model (str): OpenAI model of the run (recorded in the manifest)
+        """
+        self.run_id = run_id
+        self.path = os.path.join(directory, run_id)
+        self._summaries_path = os.path.join(self.path, "summaries")
+        self._manifest_path = os.path.join(self.path, "manifest.json")
+        self._delivered_path = os.path.join(self.path, "delivered.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(self._summaries_path, exist_ok=True)
+
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            self.resumed = True
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.manifest = {"run_id": run_id, "created_at": datetime.now().isoformat(timespec="seconds"),
+                             "topics": topics, "model": model, "stage": "started"}
+            _write_json_atomic(self._manifest_path, self.manifest)
+            self.resumed = False
+
+    @property
+    def stage(self):
+        return self.manifest["stage"]
+
+    def reached(self, stage):
+        """Return True if the run already completed `stage`"""
+        return self.STAGES.index(self.manifest["stage"]) >= self.STAGES.index(stage)
+
+    def mark(self, stage):
+        """Record that `stage` completed"""
+        with self._lock:
+            self.manifest["stage"] = stage
+            self.manifest[f"{stage}_at"] = datetime.now().isoformat(timespec="seconds")
+            _write_json_atomic(self._manifest_path, self.manifest)
+
+    # ---------- fetch stage ----------
+
+    def save_fetched(self, articles):
+        """Persist the fetched articles and mark the fetch stage complete"""
+        _write_json_atomic(os.path.join(self.path, "fetched.json"), articles)
+        self.mark("fetched")
+
+    def load_fetched(self):
+        """
+        Returns:
+            list or None: Articles saved by save_fetched (None if the stage did not finish)
+        """
+        if not self.reached("fetched"):
+            return None
+        with open(os.path.join(self.path, "fetched.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # ---------- summarize stage ----------
+
+    def _summary_file(self, article):
+        digest = hashlib.sha1(article["url"].encode("utf-8")).hexdigest()
+        return os.path.join(self._summaries_path, f"{digest}.json")
+
+    def save_summary(self, article, summary):
+        """Persist one article's summary immediately"""
+        _write_json_atomic(self._summary_file(article), {"url": article["url"], "summary": summary})
+
+    def load_summary(self, article):
+        """
+        Returns:
+            str or None: Summary saved for the article in this run
+        """
+        try:
+            with open(self._summary_file(article), "r", encoding="utf-8") as f:
+                return json.load(f)["summary"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    # ---------- send stage ----------
+
+    def record_delivery(self, recipient):
+        """Append a delivered recipient (safe to call from several threads)"""
+        line = (json.dumps(recipient) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self._delivered_path, "a+b") as f:
+                # A crash mid-write leaves a torn line; end it so this one is not appended to it
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def delivered(self):
+        """
+        Returns:
+            set: Recipients that already received this run's newsletter
+        """
+        recipients = set()
+        try:
+            with open(self._delivered_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        recipients.add(json.loads(line))
+                    except json.JSONDecodeError:
+                        pass  # Torn write from a crash
+        except FileNotFoundError:
+            pass
+        return recipients
+
+    def remove(self):
+        """Delete the checkpoint once the run has finished"""
+        shutil.rmtree(self.path, ignore_errors=True)
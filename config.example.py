@@ -28,6 +28,7 @@ SENDER_EMAIL = "your_email@gmail.com"
 SENDER_PASSWORD = "your_16_char_app_password"
 
 # Who receives the newsletter (can be the same as SENDER_EMAIL)
+# For a mailing list use a list: RECIPIENT_EMAIL = ["a@example.com", "b@example.com"]
 RECIPIENT_EMAIL = "recipient@gmail.com"
 
 # ========== NEWSLETTER SETTINGS ==========
@@ -45,6 +46,26 @@ TOPICS = [
 # The script will automatically filter out duplicates
 ARTICLES_PER_TOPIC = 3  # Fetch 3 per topic, keep the best unique ones
 
+# Maximum number of NewsAPI requests in flight at once
+# Topics are fetched concurrently over one shared keep-alive connection pool
+MAX_CONCURRENT_FETCHES = 5
+
+# How fetched articles are ranked within a topic
+#   "binary" - whole-word topic matches, title 3x / description 2x / content 1x (default)
+#   "tfidf"  - rarer topic words count more
+#   "bm25"   - like tfidf, with diminishing returns for repeats and length normalisation
+RELEVANCE_WEIGHTING = "binary"
+
+# Near-duplicate detection: skip the same story syndicated under a different URL
+# Similarity (0-1) of title + description at which two articles count as the same story
+# Set to 0 to only drop exact URL duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.6
+
+# Incremental fetching: remember the newest article per topic and skip already-sent ones
+# Useful for hourly runs: set to a file name such as "watermarks.json" to enable.
+# Leave empty ("") to always fetch the latest articles.
+WATERMARKS_PATH = ""
+
 # OpenAI model to use for summaries
 OPENAI_MODEL = "gpt-4o-mini"
 
@@ -52,6 +73,152 @@ OPENAI_MODEL = "gpt-4o-mini"
 # Increase for longer summaries, decrease for shorter
 MAX_SUMMARY_TOKENS = 150
 
+# Prompt size control: article content is trimmed to this many tokens before it is sent
+# (title and description are always kept). Counted with tiktoken if installed.
+# Set to 0 to always send the full content.
+PROMPT_CONTENT_TOKEN_BUDGET = 1000
+#   "lead"       - keep the opening sentences (default; news puts key facts first)
+#   "extractive" - keep the sentences that best match the title and the article's main terms
+PROMPT_TRUNCATION = "lead"
+
+# Local summaries: skip OpenAI for articles that do not need it and use the
+# best sentences of the article instead (TF-IDF sentence scoring, runs locally)
+# Off by default; set LOCAL_SUMMARY_MAX_WORDS to e.g. 60 to summarize articles whose
+# description + content is that short locally
+LOCAL_SUMMARY_MAX_WORDS = 0          # Word limit for local summaries (0 = off)
+LOCAL_SUMMARY_MIN_RELEVANCE = None   # Articles scoring below this for their topic (e.g. 2) are summarized locally
+
+# Number of summaries generated in parallel
+SUMMARY_WORKERS = 4
+
+# OpenAI rate limits for your account tier (see https://platform.openai.com/account/limits)
+# Workers share these budgets and also slow down when OpenAI reports low remaining quota
+OPENAI_REQUESTS_PER_MINUTE = 500
+OPENAI_TOKENS_PER_MINUTE = 200000
+
+# ========== RETRIES AND CIRCUIT BREAKERS ==========
+# Network errors, timeouts and 5xx responses (and OpenAI 429s) are retried with exponential
+# backoff, never sooner than the Retry-After the server asks for.
+NEWSAPI_TIMEOUT_SECONDS = 10
+NEWSAPI_MAX_RETRIES = 2
+OPENAI_TIMEOUT_SECONDS = 60
+OPENAI_MAX_RETRIES = 5
+# Send a second identical summary request if the first has not answered after this many seconds,
+# and use whichever answers first (0 = off). Around the usual p95 latency in run_report.json
+# trims the slowest summaries for a few percent more requests.
+OPENAI_HEDGE_AFTER_SECONDS = 0
+# After this many failures in a row, stop calling NewsAPI / OpenAI for CIRCUIT_BREAKER_RESET_SECONDS
+# (0 = never). Articles whose summary failed get a local extractive summary instead of error text.
+CIRCUIT_BREAKER_FAILURES = 5
+CIRCUIT_BREAKER_RESET_SECONDS = 30
+
+# ========== STREAMING AND DEADLINES ==========
+# Stream summaries token by token (stream=True). A summary still being written at its deadline
+# keeps the sentences it finished; one without a complete sentence gets a local extractive summary.
+# Time to first token and tokens/sec of every summary are recorded in run_report.json.
+SUMMARY_STREAMING = False
+SUMMARY_DEADLINE_SECONDS = 0        # Wall-clock limit per summary (0 = none)
+SUMMARY_RUN_DEADLINE_SECONDS = 0    # All summaries done this long after the run starts (0 = none)
+DIGEST_READY_BY = ""                # e.g. "06:55": summaries done by then (local time; "" = none).
+                                    # Leave a few minutes before the digest is due for sending.
+
+# Summary cache: articles already summarized on a previous run are not sent to OpenAI again
+# Set SUMMARY_CACHE_PATH = "" to disable the cache
+SUMMARY_CACHE_PATH = "summary_cache.db"
+SUMMARY_CACHE_TTL_HOURS = 48       # Re-summarize after this long
+SUMMARY_CACHE_MAX_ENTRIES = 5000   # Least recently used summaries are dropped beyond this
+
+# Batch mode: summarize several articles per OpenAI request (fewer requests, shared prompt overhead)
+# Batches are sized automatically to stay under the token budget
+SUMMARY_BATCH_MODE = False
+SUMMARY_BATCH_TOKEN_BUDGET = 8000  # Prompt + completion tokens per request
+SUMMARY_BATCH_MAX_ARTICLES = 20
+
+# How the fetch and summarize steps run
+#   "staged"    - fetch every topic, then summarize everything (default)
+#   "streaming" - summarize each article as soon as its topic has been fetched
+#                 (always uses live calls; SUMMARY_BACKEND and SUMMARY_BATCH_MODE are ignored)
+PIPELINE_MODE = "staged"
+
+# Execution engine
+#   "threads" - thread pools (default)
+#   "async"   - asyncio end to end (httpx, AsyncOpenAI, aiosmtplib if installed)
+ENGINE = "threads"
+
+# Summarization backend
+#   "realtime"  - live chat completion calls (default)
+#   "batch_api" - OpenAI Batch API: cheaper, results can take up to 24h (for overnight digests)
+SUMMARY_BACKEND = "realtime"
+BATCH_POLL_SECONDS = 60  # How often to check on a submitted batch
+
+# ========== METRICS ==========
+# Per-stage and per-call latencies, bytes, OpenAI token usage, retries and cache hits
+# are written to a JSON report after each run ("" to disable)
+METRICS_REPORT_PATH = "run_report.json"
+# Optional Prometheus text export, e.g. for node_exporter's textfile collector ("" to disable)
+METRICS_PROMETHEUS_PATH = ""
+# To find hot spots, run: python main.py --profile  (saves newsletter.prof)
+
+# ========== NEWSAPI RESPONSE CACHE ==========
+# Identical queries within the TTL (e.g. a retry after a failed email) reuse the saved response
+# instead of using up NewsAPI quota. For NEWSAPI_CACHE_STALE_MINUTES after that, the old response
+# is still used while a background request refreshes it. ("" disables the cache and quota counter)
+NEWSAPI_CACHE_PATH = "newsapi_cache.db"
+NEWSAPI_CACHE_TTL_MINUTES = 15
+NEWSAPI_CACHE_STALE_MINUTES = 60
+# Requests your NewsAPI plan allows per day (100 on the free plan; 0 = don't count).
+# Requests stop NEWSAPI_QUOTA_RESERVE short of the limit; older cached responses are used instead.
+NEWSAPI_DAILY_QUOTA = 100
+NEWSAPI_QUOTA_RESERVE = 5
+
+# ========== NEWSAPI QUERY PLANNER ==========
+# Combine several topics into one OR-query (e.g. "(artificial intelligence) OR space") and split
+# the results back to every topic they match, so 30 topics cost a handful of requests instead of 30.
+# A combined query is paged (NEWSAPI_PAGE_SIZE articles per page, at most NEWSAPI_MAX_PAGES pages)
+# until every topic has ARTICLES_PER_TOPIC articles; a topic that is still short is queried alone.
+# Off by default; set to True to combine topics.
+NEWSAPI_COALESCE_TOPICS = False
+NEWSAPI_TOPICS_PER_QUERY = 10
+NEWSAPI_PAGE_SIZE = 100
+NEWSAPI_MAX_PAGES = 3
+
+# ========== EMBEDDINGS ==========
+# Optional semantic routing and story clustering (needs: pip install numpy).
+# EMBEDDING_BACKEND: "" (off), "hashing" (local, no model download), "local"
+# (sentence-transformers model) or "openai" (batched embeddings endpoint).
+# With a backend set, OR-query results are routed to the most similar topic, and articles whose
+# embeddings are at least STORY_CLUSTER_THRESHOLD similar are treated as one story and summarized
+# once (staged engine and multi-tenant mode). Vectors are cached in EMBEDDING_CACHE_PATH.
+EMBEDDING_BACKEND = ""
+EMBEDDING_MODEL = ""                  # "" = the backend's default model
+EMBEDDING_CACHE_PATH = "embeddings.db"
+EMBEDDING_MIN_SIMILARITY = 0.0        # Articles less similar than this to every topic are dropped
+STORY_CLUSTER_THRESHOLD = 0.85        # 0 = never merge stories
+
+# ========== ARTICLE ARCHIVE ==========
+# SQLite file holding every fetched article and summary (read by the per-part scripts too).
+# Import JSON files from older versions with: python article_store.py --migrate
+ARTICLE_STORE_PATH = "articles.db"
+
+# ========== CHECKPOINTS ==========
+# Every run saves its fetched articles, each summary and each delivery under CHECKPOINT_DIR/<run ID>
+# as it goes. After a failure, python main.py --resume continues the most recent run without
+# repeating completed API calls. Finished runs delete their checkpoint. ("" to disable;
+# the asyncio engine is not checkpointed)
+CHECKPOINT_DIR = "runs"
+
+# ========== MULTI-TENANT MODE ==========
+# python multi_tenant.py sends a personalised digest to every subscriber in SUBSCRIBERS_PATH
+# (see subscribers.example.json). Topics shared by subscribers are fetched and summarized once.
+# Schedules: "hourly", "daily HH:MM" or "mon,wed,fri HH:MM" (local time)
+SUBSCRIBERS_PATH = "subscribers.json"
+SUBSCRIBER_STATE_PATH = "subscriber_state.json"  # When each subscriber last got their digest
+
 # ========== SMTP SETTINGS (for Gmail) ==========
 SMTP_SERVER = "smtp.gmail.com"
-SMTP_PORT = 587
\ No newline at end of file
+SMTP_PORT = 587
+SMTP_USE_TLS = True  # Set to False only for a local relay or test sink
+
+# Mailing-list delivery (when RECIPIENT_EMAIL is a list)
+SMTP_POOL_SIZE = 2              # Logged-in SMTP connections used in parallel
+SMTP_MESSAGES_PER_MINUTE = 60   # Throttle across all connections (Gmail allows ~500/day)
\ No newline at end of file
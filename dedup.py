@@ -0,0 +1,147 @@
+"""
+Near-Duplicate Detection
+MinHash signatures with LSH buckets to spot the same story syndicated under different URLs
+"""
+
+import random
+import re
+import zlib
+
+_WORD = re.compile(r"[a-z0-9]+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text, size=3):
+    """
+    Split text into overlapping word n-grams
+
+    Args:
+        text (str): Text to shingle
+        size (int): Words per shingle
+
+    Returns:
+        set: Set of shingle strings (single words if the text is shorter than `size`)
+    """
+    words = _WORD.findall((text or "").lower())
+    if len(words) < size:
+        return set(words)
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _choose_bands(num_perm, threshold):
+    """
+    Pick the LSH band layout whose S-curve threshold (1/b)^(1/r) is closest to `threshold`
+
+    Returns:
+        tuple: (bands, rows per band)
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash/LSH index over article title + description
+
+    Each added article is hashed into LSH buckets; only articles that share
+    a bucket are compared, so lookups stay roughly constant-time as the
+    index grows. Candidates are confirmed with the exact Jaccard similarity
+    of their shingle sets.
+    """
+
+    def __init__(self, threshold=0.6, num_perm=64, seed=42):
+        """
+        Args:
+            threshold (float): Jaccard similarity at or above which two articles are duplicates
+            num_perm (int): Number of MinHash permutations
+            seed (int): Seed for the permutations (fixed so runs are reproducible)
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = _choose_bands(num_perm, threshold)
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+        self._buckets = [{} for _ in range(self.bands)]
+        self._entries = []
+        self.collapsed = []
+
+    @staticmethod
+    def article_text(article):
+        """Text used for comparison: title plus description"""
+        return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+    def _signature(self, shingle_set):
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingle_set] or [0]
+        return [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._permutations
+        ]
+
+    def _band_keys(self, signature):
+        return [tuple(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def find(self, article):
+        """
+        Look for an already indexed near-duplicate of `article`
+
+        Returns:
+            tuple: (matching article, similarity) or (None, 0.0)
+        """
+        shingle_set = shingles(self.article_text(article))
+        signature = self._signature(shingle_set)
+        return self._find(shingle_set, self._band_keys(signature))
+
+    def _find(self, shingle_set, band_keys):
+        candidates = set()
+        for band, key in enumerate(band_keys):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best, best_similarity = None, 0.0
+        for entry_id in sorted(candidates):
+            other_article, other_shingles = self._entries[entry_id]
+            similarity = jaccard(shingle_set, other_shingles)
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = other_article, similarity
+        return best, best_similarity
+
+    def add(self, article):
+        """
+        Index `article` unless it duplicates one already in the index
+
+        Duplicates are recorded in `self.collapsed` as
+        (duplicate article, kept article, similarity) tuples.
+
+        Returns:
+            bool: True if the article was added, False if it is a near-duplicate
+        """
+        shingle_set = shingles(self.article_text(article))
+        band_keys = self._band_keys(self._signature(shingle_set))
+
+        original, similarity = self._find(shingle_set, band_keys)
+        if original is not None:
+            self.collapsed.append((article, original, similarity))
+            return False
+
+        entry_id = len(self._entries)
+        self._entries.append((article, shingle_set))
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(entry_id)
+        return True
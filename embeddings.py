@@ -0,0 +1,520 @@
+"""
+Article Embeddings
+Embeds articles in batches, caches the vectors on disk, and uses a NumPy
+cosine-similarity index to route articles to topics and group them into stories
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+
+from metrics import METRICS
+from relevance import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only needed when EMBEDDING_BACKEND is set
+    np = None
+
+BACKENDS = ("hashing", "openai", "local")
+
+# Default model per backend when EMBEDDING_MODEL is empty
+DEFAULT_MODELS = {"hashing": "1024", "openai": "text-embedding-3-small", "local": "all-MiniLM-L6-v2"}
+
+# Words too common to say anything about a story (only used by the hashing embedder)
+_STOPWORDS = frozenset("""
+a an and are as at be been but by for from had has have he her his in into is it its of on or
+our over said says she that the their them they this to was we were what which who will with
+""".split())
+
+_TRUNCATION_MARKER = re.compile(r"\s*\[\+\d+ chars\]\s*$")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Embeddings need NumPy: pip install numpy (or set EMBEDDING_BACKEND = \"\")")
+
+
+def normalize(vectors):
+    """
+    Scale each row to unit length so dot products are cosine similarities
+
+    Args:
+        vectors (array-like): One vector per row
+
+    Returns:
+        numpy.ndarray: float32 matrix of unit rows (all-zero rows stay zero)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def article_text(article, max_chars=1500):
+    """
+    Text embedded for an article: title, description and the start of the content
+
+    Args:
+        article (dict): Article dictionary
+        max_chars (int): Longest text returned
+
+    Returns:
+        str: Text to embed
+    """
+    content = _TRUNCATION_MARKER.sub("", article.get("content") or "")
+    text = " ".join(part for part in (article.get("title"), article.get("description"), content) if part)
+    return text[:max_chars]
+
+
+# ---------- embedders ----------
+
+class HashingEmbedder:
+    """
+    Local embedder with no model to download
+
+    Words and word pairs are hashed into `dim` signed buckets (the
+    "hashing trick"), with log-scaled counts. It only knows which words an
+    article shares with another, not what they mean, but it is free, fast
+    and deterministic, so the cache and index work the same without
+    an API key.
+    """
+
+    def __init__(self, dim=1024):
+        """
+        Args:
+            dim (int): Vector length
+        """
+        _require_numpy()
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    @staticmethod
+    @lru_cache(maxsize=200000)
+    def _bucket(feature, dim):
+        hashed = zlib.crc32(feature.encode("utf-8"))
+        return hashed % dim, 1.0 if hashed & 0x80000000 else -1.0
+
+    def embed(self, texts):
+        """
+        Args:
+            texts (list): Texts to embed
+
+        Returns:
+            numpy.ndarray: (len(texts), dim) matrix of unit vectors
+        """
+        rows, columns, signs = [], [], []
+        for row, text in enumerate(texts):
+            words = [word for word in tokenize(text) if word not in _STOPWORDS]
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                column, sign = self._bucket(feature, self.dim)
+                rows.append(row)
+                columns.append(column)
+                signs.append(sign)
+
+        flat = np.asarray(rows, dtype=np.int64) * self.dim + np.asarray(columns, dtype=np.int64)
+        counts = np.bincount(flat, weights=np.asarray(signs), minlength=len(texts) * self.dim)
+        counts = counts.reshape(len(texts), self.dim)
+        return normalize(np.sign(counts) * np.log1p(np.abs(counts)))
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI embeddings endpoint, one request per batch of texts"""
+
+    def __init__(self, api_key, model=DEFAULT_MODELS["openai"], max_retries=5):
+        """
+        Args:
+            api_key (str): OpenAI API key
+            model (str): Embedding model
+            max_retries (int): Retries the SDK makes after a 429 or 5xx response
+        """
+        _require_numpy()
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key, max_retries=max_retries)
+        self.model = model
+        self.name = f"openai-{model}"
+
+    def embed(self, texts):
+        """
+        Args:
+            texts (list): Texts to embed (at most 2048 per call)
+
+        Returns:
+            numpy.ndarray: (len(texts), dim) matrix of unit vectors
+        """
+        with METRICS.timer("request_seconds", service="openai_embeddings"):
+            response = self.client.embeddings.create(model=self.model, input=list(texts))
+        if response.usage is not None:
+            METRICS.increment("openai_tokens_total", response.usage.prompt_tokens or 0, kind="embedding")
+        return normalize([item.embedding for item in sorted(response.data, key=lambda item: item.index)])
+
+
+class LocalModelEmbedder:
+    """Embeddings from a local sentence-transformers model (pip install sentence-transformers)"""
+
+    def __init__(self, model=DEFAULT_MODELS["local"]):
+        """
+        Args:
+            model (str): sentence-transformers model name or path
+        """
+        _require_numpy()
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model)
+        self.name = f"local-{model}"
+
+    def embed(self, texts):
+        """
+        Args:
+            texts (list): Texts to embed
+
+        Returns:
+            numpy.ndarray: (len(texts), dim) matrix of unit vectors
+        """
+        return normalize(self.model.encode(list(texts), batch_size=64, normalize_embeddings=True))
+
+
+# ---------- cache ----------
+
+class EmbeddingCache:
+    """
+    On-disk cache of embedding vectors, keyed by embedder and text
+
+    Vectors are stored as raw float32 bytes, and lookups are made for a
+    whole batch of keys at once.
+    """
+
+    def __init__(self, path="embeddings.db", max_entries=200000):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway cache)
+            max_entries (int): Maximum number of cached vectors (oldest are evicted)
+        """
+        _require_numpy()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_stored ON embeddings (stored_at)")
+        self._db.commit()
+
+    @staticmethod
+    def key(embedder_name, text):
+        """Cache key for a text embedded by a given embedder"""
+        return hashlib.sha256(f"{embedder_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys, chunk_size=500):
+        """
+        Look up many vectors
+
+        Returns:
+            dict: key -> numpy vector for the keys that are cached
+        """
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), chunk_size):
+                chunk = keys[start:start + chunk_size]
+                placeholders = ", ".join("?" * len(chunk))
+                for key, blob in self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ):
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        if found:
+            METRICS.increment("cache_lookups_total", len(found), cache="embeddings", result="hit")
+        if len(keys) > len(found):
+            METRICS.increment("cache_lookups_total", len(keys) - len(found), cache="embeddings", result="miss")
+        return found
+
+    def put_many(self, vectors):
+        """
+        Store vectors and evict the oldest entries if over size
+
+        Args:
+            vectors (dict): key -> vector
+        """
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in vectors.items()]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector, stored_at) VALUES (?, ?, ?)", rows)
+            self._db.execute("""
+                DELETE FROM embeddings WHERE key IN (
+                    SELECT key FROM embeddings ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ArticleEmbedder:
+    """
+    Embeds texts and articles through an embedder, in batches, reusing cached vectors
+
+    Identical texts in one call are embedded once, and only texts missing
+    from the cache are sent to the embedder.
+    """
+
+    def __init__(self, embedder, cache=None, batch_size=256):
+        """
+        Args:
+            embedder: HashingEmbedder, OpenAIEmbedder or LocalModelEmbedder
+            cache (EmbeddingCache): Optional vector cache
+            batch_size (int): Texts per embedder call
+        """
+        self.embedder = embedder
+        self.cache = cache
+        self.batch_size = batch_size
+
+    @property
+    def name(self):
+        return self.embedder.name
+
+    def embed_texts(self, texts):
+        """
+        Args:
+            texts (list): Texts to embed
+
+        Returns:
+            numpy.ndarray: (len(texts), dim) matrix of unit vectors
+        """
+        texts = list(texts)
+        keys = [EmbeddingCache.key(self.name, text) for text in texts]
+        unique = dict(zip(keys, texts))
+        vectors = self.cache.get_many(unique) if self.cache is not None else {}
+
+        missing = [key for key in unique if key not in vectors]
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            embedded = dict(zip(batch, self.embedder.embed([unique[key] for key in batch])))
+            if self.cache is not None:
+                self.cache.put_many(embedded)
+            vectors.update(embedded)
+        METRICS.increment("embeddings_total", len(missing), embedder=self.name)
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return normalize(np.stack([vectors[key] for key in keys]))
+
+    def embed(self, articles):
+        """
+        Args:
+            articles (list): Article dictionaries
+
+        Returns:
+            numpy.ndarray: (len(articles), dim) matrix of unit vectors
+        """
+        return self.embed_texts([article_text(article) for article in articles])
+
+
+_OPEN_EMBEDDERS = {}
+_OPEN_EMBEDDERS_LOCK = threading.Lock()
+
+
+def open_article_embedder(backend, model="", api_key=None, cache_path="embeddings.db"):
+    """
+    Build the embedder configured in config.py (shared by every caller with the same settings)
+
+    Args:
+        backend (str): "hashing", "openai" or "local"
+        model (str): Model name ("" = the backend's default; vector length for "hashing")
+        api_key (str): OpenAI API key (only for "openai")
+        cache_path (str): Vector cache file ("" = keep vectors in memory for this run only)
+
+    Returns:
+        ArticleEmbedder: Embedder with its cache
+    """
+    _require_numpy()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}' (expected one of {', '.join(BACKENDS)})")
+    model = model or DEFAULT_MODELS[backend]
+    with _OPEN_EMBEDDERS_LOCK:
+        key = (backend, model, cache_path)
+        if key not in _OPEN_EMBEDDERS:
+            if backend == "hashing":
+                embedder = HashingEmbedder(int(model))
+            elif backend == "openai":
+                embedder = OpenAIEmbedder(api_key, model)
+            else:
+                embedder = LocalModelEmbedder(model)
+            _OPEN_EMBEDDERS[key] = ArticleEmbedder(embedder, EmbeddingCache(cache_path or ":memory:"))
+        return _OPEN_EMBEDDERS[key]
+
+
+# ---------- index ----------
+
+class CosineIndex:
+    """
+    Exact cosine-similarity search over a matrix of unit vectors
+
+    Queries are answered with one matrix product per chunk of queries, so
+    memory stays at chunk_size x len(index) similarities however many
+    queries there are.
+    """
+
+    def __init__(self, vectors, chunk_size=1024):
+        """
+        Args:
+            vectors (array-like): One vector per row
+            chunk_size (int): Queries compared per matrix product
+        """
+        _require_numpy()
+        self.vectors = normalize(vectors)
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def similarities(self, queries):
+        """
+        Returns:
+            numpy.ndarray: (len(queries), len(index)) cosine similarities
+        """
+        return normalize(queries) @ self.vectors.T
+
+    def search(self, queries, k=1):
+        """
+        Find the k most similar indexed vectors for every query
+
+        Args:
+            queries (array-like): One query vector per row
+            k (int): Neighbours per query
+
+        Returns:
+            tuple: (indices, similarities), both (len(queries), k), best first
+        """
+        queries = normalize(queries)
+        k = min(k, len(self))
+        indices = np.empty((len(queries), k), dtype=np.intp)
+        scores = np.empty((len(queries), k), dtype=np.float32)
+        for start in range(0, len(queries), self.chunk_size):
+            similarities = queries[start:start + self.chunk_size] @ self.vectors.T
+            if k < len(self):
+                top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(k), similarities.shape).copy()
+            top_scores = np.take_along_axis(similarities, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            indices[start:start + len(top)] = np.take_along_axis(top, order, axis=1)
+            scores[start:start + len(top)] = np.take_along_axis(top_scores, order, axis=1)
+        return indices, scores
+
+    def pairs_above(self, threshold):
+        """
+        Every pair of indexed vectors at least `threshold` similar
+
+        Returns:
+            tuple: (rows, columns) arrays with rows < columns
+        """
+        rows, columns = [], []
+        for start in range(0, len(self), self.chunk_size):
+            similarities = self.vectors[start:start + self.chunk_size] @ self.vectors.T
+            chunk_rows, chunk_columns = np.nonzero(similarities >= threshold)
+            chunk_rows += start
+            keep = chunk_rows < chunk_columns
+            rows.append(chunk_rows[keep])
+            columns.append(chunk_columns[keep])
+        if not rows:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        return np.concatenate(rows), np.concatenate(columns)
+
+
+class EmbeddingScorer:
+    """
+    Scores articles against topics by cosine similarity
+
+    Has the same score_matrix / best_topics interface as RelevanceScorer,
+    so it can stand in for it when routing articles to topics.
+    """
+
+    def __init__(self, topics, embedder, min_similarity=0.0):
+        """
+        Args:
+            topics (list): Topic strings (columns of the score matrix)
+            embedder (ArticleEmbedder): Embedder for topics and articles
+            min_similarity (float): Similarities below this count as no match (score 0)
+        """
+        self.topics = list(topics)
+        self.embedder = embedder
+        self.min_similarity = min_similarity
+        self.index = CosineIndex(embedder.embed_texts(self.topics))
+
+    def score_matrix(self, articles):
+        """
+        Returns:
+            list: One row per article, one similarity per topic (0 below min_similarity)
+        """
+        if not articles:
+            return []
+        similarities = self.index.similarities(self.embedder.embed(articles))
+        similarities[similarities < self.min_similarity] = 0.0
+        return similarities.tolist()
+
+    def best_topics(self, articles):
+        """
+        Returns:
+            list: (topic, similarity) per article; topic is None below min_similarity
+        """
+        if not articles:
+            return []
+        indices, scores = self.index.search(self.embedder.embed(articles), k=1)
+        return [
+            (self.topics[index], float(score)) if score >= self.min_similarity else (None, 0.0)
+            for index, score in zip(indices[:, 0], scores[:, 0])
+        ]
+
+
+def cluster_stories(vectors, threshold=0.85, chunk_size=1024):
+    """
+    Group articles that tell the same story
+
+    Two articles at least `threshold` similar are linked, and every
+    connected group of links is one story (single-linkage clustering). The
+    links come from chunked matrix products and the groups from vectorized
+    label propagation, so tens of thousands of articles take seconds.
+
+    Args:
+        vectors (array-like): One article vector per row
+        threshold (float): Cosine similarity that makes two articles the same story
+        chunk_size (int): Rows compared per matrix product
+
+    Returns:
+        list: Story label per article: the position of the first article of its story
+    """
+    _require_numpy()
+    count = len(vectors)
+    if count == 0:
+        return []
+    rows, columns = CosineIndex(vectors, chunk_size).pairs_above(threshold)
+    labels = np.arange(count)
+    while len(rows):
+        previous = labels
+        labels = previous.copy()
+        np.minimum.at(labels, rows, previous[columns])
+        np.minimum.at(labels, columns, previous[rows])
+        labels = labels[labels]  # Pointer jumping: follow each label to its own label
+        if np.array_equal(labels, previous):
+            break
+    return labels.tolist()
@@ -0,0 +1,162 @@
+"""
+Local Extractive Summaries
+Summarizes short or low-value articles locally so only the rest need an OpenAI call
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+
+from metrics import METRICS
+from prompt_builder import split_sentences
+from relevance import RelevanceScorer, tokenize
+
+_TERMINAL = re.compile(r"[.!?][\"')\]]*$")
+
+
+def complete_sentences(text):
+    """Sentences of `text`, dropping a trailing fragment cut off mid-sentence (NewsAPI's truncation, a stopped stream)"""
+    sentences = split_sentences(text)
+    if sentences and not _TERMINAL.search(sentences[-1]):
+        sentences.pop()
+    return sentences
+
+
+def extractive_summary(article, max_sentences=2):
+    """
+    Pick the most informative sentences of an article
+
+    Every sentence of the description and content is scored by the mean
+    TF-IDF weight of its words (each sentence counts as a document), plus a
+    bonus for words shared with the title. The top sentences are returned in
+    their original order. A description that is already short enough is
+    used as is.
+
+    Args:
+        article (dict): Article dictionary with title, description and content
+        max_sentences (int): Maximum sentences in the summary
+
+    Returns:
+        str: Extractive summary (the title if the article has no usable text)
+    """
+    description = complete_sentences(article.get("description") or "")
+    if 0 < len(description) <= max_sentences:
+        return " ".join(description)
+
+    sentences = []
+    seen = set()
+    for sentence in description + complete_sentences(article.get("content") or ""):
+        normalized = " ".join(tokenize(sentence))
+        if normalized and normalized not in seen:  # Content often repeats the description
+            seen.add(normalized)
+            sentences.append(sentence)
+    if not sentences:
+        return (article.get("title") or "").strip()
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    tokenized = [tokenize(sentence) for sentence in sentences]
+    doc_freq = Counter()
+    for tokens in tokenized:
+        doc_freq.update(set(tokens))
+    title = set(tokenize(article.get("title")))
+    n_docs = len(sentences)
+
+    scores = []
+    for tokens in tokenized:
+        counts = Counter(tokens)
+        weight = sum((1 + math.log(count)) * math.log((1 + n_docs) / (1 + doc_freq[term]))
+                     for term, count in counts.items())
+        score = weight / len(tokens) if tokens else 0.0
+        score += 0.5 * len(title & counts.keys()) / (len(title) or 1)
+        scores.append(score)
+
+    best = sorted(range(n_docs), key=lambda i: (-scores[i], i))[:max_sentences]
+    return " ".join(sentences[i] for i in sorted(best))
+
+
+def word_count(article):
+    """Words in an article's description and content (without NewsAPI's "[+N chars]" marker)"""
+    text = " ".join(split_sentences(article.get("description") or "")
+                    + split_sentences(article.get("content") or ""))
+    return len(text.split())
+
+
+class SummaryRouter:
+    """
+    Decides which articles are worth an OpenAI call
+
+    An article is summarized locally when it is short (its description and
+    content fit in `max_words`) or when it scores below `min_relevance`
+    for its topic. Everything else goes to the LLM. The router counts the
+    calls it avoided, by reason.
+    """
+
+    def __init__(self, max_words=0, min_relevance=None, max_sentences=2, weighting="binary"):
+        """
+        Args:
+            max_words (int): Articles with at most this many words are summarized locally (0 = off)
+            min_relevance (float): Articles scoring below this are summarized locally (None = off)
+            max_sentences (int): Sentences in a local summary
+            weighting (str): Relevance weighting used when an article has no stored relevance_score
+        """
+        self.max_words = max_words
+        self.min_relevance = min_relevance
+        self.max_sentences = max_sentences
+        self.weighting = weighting
+        self.avoided = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.max_words) or self.min_relevance is not None
+
+    def route(self, article):
+        """
+        Decide where an article should be summarized
+
+        Args:
+            article (dict): Article dictionary
+
+        Returns:
+            str or None: Reason for a local summary ("short" or "low_relevance"),
+                         or None if the article should go to the LLM
+        """
+        if self.max_words and word_count(article) <= self.max_words:
+            return "short"
+        if self.min_relevance is not None:
+            score = article.get("relevance_score")
+            if score is None:
+                score = RelevanceScorer([article.get("topic", "")], self.weighting).score_matrix([article])[0][0]
+            if score < self.min_relevance:
+                return "low_relevance"
+        return None
+
+    def local_summary(self, article):
+        """
+        Summarize an article locally if the policy says so
+
+        Args:
+            article (dict): Article dictionary
+
+        Returns:
+            str or None: Local summary, or None if the article needs the LLM
+        """
+        if not self.enabled:
+            return None
+        reason = self.route(article)
+        if reason is None:
+            return None
+        METRICS.increment("llm_calls_avoided_total", reason=reason)
+        with self._lock:
+            self.avoided[reason] += 1
+        return extractive_summary(article, self.max_sentences)
+
+    def snapshot(self):
+        """
+        Returns:
+            Counter: Calls avoided so far, by reason
+        """
+        with self._lock:
+            return Counter(self.avoided)
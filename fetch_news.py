@@ -4,12 +4,23 @@ This script fetches the latest news articles from NewsAPI.org
 """
 
 import requests
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+
+from article_store import ArticleStore
+from dedup import NearDuplicateIndex
+from metrics import METRICS
+from query_planner import PagedQuery, plan_queries
+from relevance import RelevanceScorer
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, call_with_retries
+from response_cache import ResponseCache
 
 # Import configuration from config.py
 try:
-    from config import NEWS_API_KEY, TOPICS, ARTICLES_PER_TOPIC
+    from settings import load_settings
+    SETTINGS = load_settings(required=("NEWS_API_KEY", "TOPICS", "ARTICLES_PER_TOPIC"))
 except ImportError:
     print("ERROR: config.py not found!")
     print("\nPlease follow these steps:")
@@ -18,100 +29,561 @@ except ImportError:
     print("3. Run this script again")
     exit(1)
 
+NEWS_API_KEY = SETTINGS.news_api_key
+TOPICS = SETTINGS.topics
+ARTICLES_PER_TOPIC = SETTINGS.articles_per_topic
+MAX_CONCURRENT_FETCHES = SETTINGS.max_concurrent_fetches
+NEAR_DUPLICATE_THRESHOLD = SETTINGS.near_duplicate_threshold
+RELEVANCE_WEIGHTING = SETTINGS.relevance_weighting
+
+# NewsAPI endpoint for searching everything (overridable, e.g. to point at a replay server)
+NEWS_API_URL = SETTINGS.news_api_url
+
+# Query planner: several topics per request as an OR-query
+NEWSAPI_COALESCE_TOPICS = SETTINGS.newsapi_coalesce_topics
+NEWSAPI_TOPICS_PER_QUERY = SETTINGS.newsapi_topics_per_query
+NEWSAPI_PAGE_SIZE = SETTINGS.newsapi_page_size
+NEWSAPI_MAX_PAGES = SETTINGS.newsapi_max_pages
+
+# Route combined query results by embedding similarity instead of keywords ("" = keywords)
+EMBEDDING_BACKEND = SETTINGS.embedding_backend
+EMBEDDING_MIN_SIMILARITY = SETTINGS.embedding_min_similarity
+
+# Response cache and daily quota counter ("" disables both)
+NEWSAPI_CACHE_PATH = SETTINGS.newsapi_cache_path
+NEWSAPI_CACHE_TTL_MINUTES = SETTINGS.newsapi_cache_ttl_minutes
+NEWSAPI_CACHE_STALE_MINUTES = SETTINGS.newsapi_cache_stale_minutes
+NEWSAPI_DAILY_QUOTA = SETTINGS.newsapi_daily_quota
+NEWSAPI_QUOTA_RESERVE = SETTINGS.newsapi_quota_reserve
+
+# Timeouts, retries and circuit breaker
+NEWSAPI_TIMEOUT_SECONDS = SETTINGS.newsapi_timeout_seconds
+NEWSAPI_RETRY_POLICY = RetryPolicy(SETTINGS.newsapi_max_retries, base_delay=0.5, max_delay=30)
 
-def calculate_relevance_score(article, topic):
+# NewsAPI answers 429 when the daily quota is used up, so only server errors are retried
+NEWSAPI_RETRY_STATUSES = frozenset({500, 502, 503, 504})
+NEWSAPI_NETWORK_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+# Shared by every NewsAPI request in this process (the asyncio engine too)
+NEWSAPI_BREAKER = CircuitBreaker("newsapi", SETTINGS.circuit_breaker_failures,
+                                 SETTINGS.circuit_breaker_reset_seconds)
+
+# Shared by every fetch in this process, so a retry minutes later reuses the responses
+RESPONSE_CACHE = ResponseCache(
+    NEWSAPI_CACHE_PATH,
+    NEWSAPI_CACHE_TTL_MINUTES * 60,
+    NEWSAPI_CACHE_STALE_MINUTES * 60,
+    NEWSAPI_DAILY_QUOTA,
+    NEWSAPI_QUOTA_RESERVE
+) if NEWSAPI_CACHE_PATH else None
+
+
+def calculate_relevance_score(article, topic, weighting=None):
     """
     Calculate how relevant an article is to a topic
     
+    Topic words are matched as whole words in the title (weighted 3x),
+    description (2x) and content (1x). To score many articles or topics
+    at once, use RelevanceScorer.score_matrix directly.
+    
     Args:
         article (dict): Article dictionary
         topic (str): Topic to check against
+        weighting (str): "binary", "tfidf" or "bm25" (default from config)
+        
+    Returns:
+        float: Relevance score (higher = more relevant)
+    """
+    scorer = RelevanceScorer([topic], weighting or RELEVANCE_WEIGHTING)
+    return scorer.score_matrix([article])[0][0]
+
+
+def create_session(pool_size=10):
+    """
+    Create a keep-alive HTTP session shared by all NewsAPI requests
+    
+    Args:
+        pool_size (int): Number of connections kept open to NewsAPI
+        
+    Returns:
+        requests.Session: Session with a connection pool sized for pool_size
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def build_query_params(topic, api_key, max_articles=1, since=None, page=1):
+    """
+    Build the NewsAPI /v2/everything query for a topic
+    
+    Args:
+        topic (str): The topic/keyword to search for (or an OR-query of several)
+        api_key (str): Your NewsAPI key
+        max_articles (int): Maximum number of articles to fetch
+        since (str): Only return articles published at or after this ISO 8601 time
+        page (int): Result page to request
+        
+    Returns:
+        dict: Query parameters
+    """
+    params = {
+        "q": topic,                    # Search query
+        "apiKey": api_key,             # Your API key
+        "language": "en",              # English articles only
+        "sortBy": "publishedAt",       # Get the most recent articles
+        "pageSize": max_articles        # Limit results
+    }
+    if since:
+        params["from"] = since         # Only articles newer than the last run
+    if page > 1:
+        params["page"] = page
+    return params
+
+
+def format_articles(articles, topic):
+    """
+    Convert raw NewsAPI articles to our article format, ranked by relevance
+    
+    Args:
+        articles (list): "articles" list from a NewsAPI response
+        topic (str): Topic the articles were fetched for
+        
+    Returns:
+        list: Article dictionaries sorted by relevance score (highest first)
+    """
+    formatted_articles = []
+    for article in articles:
+        formatted_article = {
+            "topic": topic,
+            "title": article.get("title", "No title"),
+            "description": article.get("description", "No description"),
+            "url": article.get("url", ""),
+            "content": article.get("content", ""),
+            "published_at": article.get("publishedAt", ""),
+            "source": article.get("source", {}).get("name", "Unknown")
+        }
+        formatted_articles.append(formatted_article)
+    
+    # Score the whole page in one batch
+    scores = RelevanceScorer([topic], RELEVANCE_WEIGHTING).score_matrix(formatted_articles)
+    for formatted_article, (score,) in zip(formatted_articles, scores):
+        formatted_article["relevance_score"] = score
+    
+    # Sort by relevance score (highest first)
+    formatted_articles.sort(key=lambda x: x["relevance_score"], reverse=True)
+    
+    return formatted_articles
+
+
+def acquire_quota(topic):
+    """
+    Count a request against the daily NewsAPI quota
+    
+    Returns:
+        bool: True if the request may be sent
+    """
+    if RESPONSE_CACHE is None or RESPONSE_CACHE.acquire_quota():
+        return True
+    print(f"NewsAPI quota nearly used up ({RESPONSE_CACHE.quota_used()} of {NEWSAPI_DAILY_QUOTA} "
+          f"requests today): not requesting '{topic}'")
+    return False
+
+
+def cached_response(topic, params):
+    """
+    Look up a topic's query in the response cache
+    
+    A stale response is returned as well, and a background request is
+    scheduled to refresh it.
+    
+    Args:
+        topic (str): Topic being fetched
+        params (dict): Query parameters from build_query_params()
+        
+    Returns:
+        tuple: (response to use without a request or None,
+                expired response to fall back on if the request fails or None)
+    """
+    if RESPONSE_CACHE is None:
+        return None, None
+    data, state = RESPONSE_CACHE.lookup(NEWS_API_URL, params)
+    if state == "stale":
+        # The caller's session may be closed by then, so the refresh opens its own connection
+        RESPONSE_CACHE.revalidate(NEWS_API_URL, params, lambda: request_newsapi(topic, params))
+    if state in ("fresh", "stale"):
+        return data, None
+    return None, data
+
+
+def fall_back(topic, expired):
+    """
+    Use an expired cached response after a refused or failed request
+    
+    Returns:
+        dict or None: The expired response (None if there is none)
+    """
+    if expired is None:
+        return None
+    RESPONSE_CACHE.use_fallback()
+    print(f"Using an older cached response for '{topic}'")
+    return expired
+
+
+def request_newsapi(topic, params, http=requests):
+    """
+    Send one NewsAPI request, respecting the daily quota and updating the response cache
+    
+    Network errors, timeouts and 5xx responses are retried with
+    exponential backoff (honouring Retry-After), and every retry counts
+    against the quota. While NEWSAPI_BREAKER is open no request is sent.
+    
+    Args:
+        topic (str): Topic being fetched (for messages)
+        params (dict): Query parameters from build_query_params()
+        http (requests.Session): Session or the requests module
         
     Returns:
-        int: Relevance score (higher = more relevant)
+        dict or None: Decoded response, or None if the request was refused or failed
     """
-    topic_lower = topic.lower()
-    topic_words = set(topic_lower.split())
+    headers = RESPONSE_CACHE.validators(NEWS_API_URL, params) if RESPONSE_CACHE is not None else {}
+    
+    def attempt():
+        if not acquire_quota(topic):
+            return None
+        # Make the request to NewsAPI
+        with METRICS.timer("request_seconds", service="newsapi"):
+            response = http.get(NEWS_API_URL, params=params, headers=headers, timeout=NEWSAPI_TIMEOUT_SECONDS)
+        METRICS.increment("bytes_received_total", len(response.content), service="newsapi")
+        if response.status_code in NEWSAPI_RETRY_STATUSES:
+            raise requests.exceptions.HTTPError(f"Status code {response.status_code}", response=response)
+        return response
     
-    # Count topic mentions in title (weighted more heavily)
-    title = article.get("title", "").lower()
-    title_score = sum(3 for word in topic_words if word in title)
+    try:
+        response = call_with_retries(attempt, "newsapi", NEWSAPI_NETWORK_ERRORS, NEWSAPI_RETRY_STATUSES,
+                                     NEWSAPI_RETRY_POLICY, NEWSAPI_BREAKER)
+    except (requests.exceptions.RequestException, CircuitOpenError) as e:
+        METRICS.increment("errors_total", service="newsapi")
+        print(f"Error fetching news for '{topic}': {e}")
+        return None
+    if response is None:
+        return None
     
-    # Count topic mentions in description
-    description = article.get("description", "").lower()
-    desc_score = sum(2 for word in topic_words if word in description)
+    # Check if request was successful
+    if response.status_code == 304 and RESPONSE_CACHE is not None:
+        return RESPONSE_CACHE.refresh(NEWS_API_URL, params)
+    if response.status_code == 200:
+        data = response.json()
+        if RESPONSE_CACHE is not None:
+            RESPONSE_CACHE.store(NEWS_API_URL, params, data, response.headers)
+        return data
     
-    # Count topic mentions in content
-    content = article.get("content", "").lower()
-    content_score = sum(1 for word in topic_words if word in content)
+    METRICS.increment("errors_total", service="newsapi")
+    if response.status_code == 429 and RESPONSE_CACHE is not None:
+        RESPONSE_CACHE.exhaust_quota()  # Stop asking for the rest of the day
+    print(f"Error fetching news for '{topic}': Status code {response.status_code}")
+    print(f"Response: {response.text}")
+    return None
+
+
+def load_response(topic, params, session=None):
+    """
+    Get a NewsAPI response from the cache or with a request
     
-    return title_score + desc_score + content_score
+    Args:
+        topic (str): Topic being fetched (for messages)
+        params (dict): Query parameters from build_query_params()
+        session (requests.Session): Optional shared session
+        
+    Returns:
+        dict or None: Decoded response (None if there is neither a response nor a usable cached one)
+    """
+    data, expired = cached_response(topic, params)
+    if data is None:
+        data = request_newsapi(topic, params, session if session is not None else requests)
+        if data is None:
+            data = fall_back(topic, expired)
+    return data
 
 
-def fetch_news_articles(topic, api_key, max_articles=1):
+def fetch_news_articles(topic, api_key, max_articles=1, session=None, since=None):
     """
     Fetch news articles for a specific topic from NewsAPI
     
+    With the response cache enabled, a fresh cached response is used
+    without a request, and a stale one is used at once while a background
+    request refreshes it. An expired response is only used if the request
+    is refused by the quota counter or fails.
+    
     Args:
         topic (str): The topic/keyword to search for
         api_key (str): Your NewsAPI key
         max_articles (int): Maximum number of articles to fetch
+        session (requests.Session): Optional shared session (reuses connections)
+        since (str): Only return articles published at or after this ISO 8601 time
         
     Returns:
         list: List of article dictionaries with title, description, url, and content
     """
     
-    # NewsAPI endpoint for searching everything
-    url = "https://newsapi.org/v2/everything"
+    params = build_query_params(topic, api_key, max_articles, since)
+    data = load_response(topic, params, session)
     
-    # Parameters for the API request
-    params = {
-        "q": topic,                    # Search query
-        "apiKey": api_key,             # Your API key
-        "language": "en",              # English articles only
-        "sortBy": "publishedAt",       # Get the most recent articles
-        "pageSize": max_articles        # Limit results
+    if data is None:
+        return []
+    
+    # Extract and format articles from response
+    return format_articles(data.get("articles", []), topic)
+
+
+def response_cache_summary():
+    """
+    Describe what the response cache saved in this process
+    
+    Returns:
+        str or None: One-line summary (None if the cache is disabled)
+    """
+    if RESPONSE_CACHE is None:
+        return None
+    cache = RESPONSE_CACHE
+    quota = f"{cache.quota_used()} of {NEWSAPI_DAILY_QUOTA}" if NEWSAPI_DAILY_QUOTA else "unlimited"
+    return (f"NewsAPI requests saved by the response cache: {cache.requests_saved} "
+            f"({cache.stale_hits} stale responses served while refreshing, {cache.fallbacks} older "
+            f"responses reused, {cache.refused} requests refused by the quota); requests today: {quota}")
+
+
+def apply_watermarks(topic, articles, watermarks):
+    """
+    Drop articles already seen for a topic and advance its watermark
+    
+    Args:
+        topic (str): Topic the articles were fetched for
+        articles (list): Fetched articles
+        watermarks (WatermarkStore): Per-topic watermarks (None to keep everything)
+        
+    Returns:
+        list: Articles not seen on a previous run
+    """
+    if watermarks is None:
+        return articles
+    new_articles = [a for a in articles if not watermarks.is_seen(topic, a['url'])]
+    watermarks.record(topic, articles)
+    return new_articles
+
+
+def fetch_topic(topic, api_key, max_articles=1, session=None, watermarks=None):
+    """
+    Fetch one topic, applying its watermark, and time the request
+    
+    Args:
+        topic (str): The topic/keyword to search for
+        api_key (str): Your NewsAPI key
+        max_articles (int): Maximum number of articles to fetch
+        session (requests.Session): Optional shared session
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        
+    Returns:
+        tuple: (list of new articles for the topic, fetch latency in seconds)
+    """
+    since = watermarks.since(topic) if watermarks is not None else None
+    started = time.perf_counter()
+    articles = fetch_news_articles(topic, api_key, max_articles, session=session, since=since)
+    latency = time.perf_counter() - started
+    return apply_watermarks(topic, articles, watermarks), latency
+
+
+def plan_topic_queries(topics, watermarks=None):
+    """
+    Plan the NewsAPI queries for a list of topics
+    
+    Args:
+        topics (list): Topics to fetch
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        
+    Returns:
+        list: TopicQuery objects (one per topic if NEWSAPI_COALESCE_TOPICS is off)
+    """
+    since = watermarks.since if watermarks is not None else None
+    return plan_queries(topics, since, NEWSAPI_TOPICS_PER_QUERY if NEWSAPI_COALESCE_TOPICS else 1)
+
+
+def paged_query(query, max_articles):
+    """
+    Returns:
+        PagedQuery: Collector for a planned query's pages, using the configured limits and router
+    """
+    scorer = None
+    if EMBEDDING_BACKEND and len(query.topics) > 1:
+        from embeddings import EmbeddingScorer, open_article_embedder
+        
+        embedder = open_article_embedder(EMBEDDING_BACKEND, SETTINGS.embedding_model, SETTINGS.openai_api_key,
+                                         SETTINGS.embedding_cache_path)
+        scorer = EmbeddingScorer(query.topics, embedder, EMBEDDING_MIN_SIMILARITY)
+    return PagedQuery(query, max_articles, NEWSAPI_PAGE_SIZE, NEWSAPI_MAX_PAGES, RELEVANCE_WEIGHTING, scorer)
+
+
+def split_query_results(pages, max_articles, watermarks=None):
+    """
+    Turn a finished PagedQuery into per-topic article lists
+    
+    Args:
+        pages (PagedQuery): Query whose pages have all been added
+        max_articles (int): Maximum number of articles per topic
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        
+    Returns:
+        dict: topic -> new articles ranked by relevance
+    """
+    return {
+        topic: apply_watermarks(topic, format_articles(articles, topic), watermarks)
+        for topic, articles in pages.results().items()
     }
+
+
+def fetch_query(query, api_key, max_articles=1, session=None, watermarks=None):
+    """
+    Fetch every topic of one planned query
+    
+    A single-topic query is fetched exactly as before the planner. A
+    combined query is paged until each topic has max_articles articles (or
+    NEWSAPI_MAX_PAGES is reached); topics that are still short while
+    NewsAPI had more results are then fetched on their own.
+    
+    Args:
+        query (TopicQuery): Planned query
+        api_key (str): Your NewsAPI key
+        max_articles (int): Maximum number of articles per topic
+        session (requests.Session): Optional shared session
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        
+    Returns:
+        dict: topic -> (list of new articles, fetch latency in seconds)
+    """
+    if len(query.topics) == 1:
+        topic = query.topics[0]
+        return {topic: fetch_topic(topic, api_key, max_articles, session, watermarks)}
+    
+    label = f"{len(query.topics)} topics ({query.topics[0]}, ...)"
+    started = time.perf_counter()
+    pages = paged_query(query, max_articles)
+    while True:
+        params = build_query_params(query.q, api_key, pages.page_size, query.earliest, pages.page)
+        if not pages.add_page(load_response(label, params, session)):
+            break
+    starved = pages.starved_topics()
+    latency = time.perf_counter() - started
+    
+    results = {topic: (articles, latency) for topic, articles in
+               split_query_results(pages, max_articles, watermarks).items() if topic not in starved}
+    for topic in starved:
+        results[topic] = fetch_topic(topic, api_key, max_articles, session, watermarks)
+    return results
+
+
+def fetch_topics(topics, api_key, max_articles=1, max_workers=5, session=None, watermarks=None):
+    """
+    Fetch several topics concurrently with as few NewsAPI requests as the query planner allows
+    
+    Args:
+        topics (list): Topics to fetch
+        api_key (str): Your NewsAPI key
+        max_articles (int): Maximum number of articles per topic
+        max_workers (int): Maximum number of requests in flight at once
+        session (requests.Session): Shared session
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        
+    Returns:
+        dict: topic -> (list of new articles, fetch latency in seconds)
+    """
+    queries = plan_topic_queries(topics, watermarks)
+    if len(queries) < len(topics):
+        print(f"Query plan: {len(topics)} topics in {len(queries)} NewsAPI queries")
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for fetched in executor.map(lambda query: fetch_query(query, api_key, max_articles, session, watermarks),
+                                    queries):
+            results.update(fetched)
+    return results
+
+
+def select_unique_article(articles, seen_urls, near_duplicates=None):
+    """
+    Pick the first article that is neither a repeated URL nor a near-duplicate story
+    
+    Args:
+        articles (list): Candidate articles for one topic, best first
+        seen_urls (set): URLs already chosen (updated in place)
+        near_duplicates (NearDuplicateIndex): Optional index of chosen stories (updated in place)
+        
+    Returns:
+        dict or None: The chosen article, or None if every candidate was a duplicate
+    """
+    for article in articles:
+        if article['url'] in seen_urls:
+            continue
+        if near_duplicates is not None and not near_duplicates.add(article):
+            continue  # Same story under a different URL
+        seen_urls.add(article['url'])
+        return article
+    return None
+
+
+def fetch_all_topics(topics, api_key, max_articles=1, max_workers=5, session=None, watermarks=None,
+                     near_duplicates=None):
+    """
+    Fetch articles for several topics concurrently and keep one unique article per topic
+    
+    Requests run on a bounded thread pool sharing one keep-alive session.
+    Topics are combined into OR-queries by the query planner (see
+    fetch_topics), so there are usually fewer requests than topics.
+    Duplicate filtering happens after all requests finish and walks the
+    topics in their original order, so the result does not depend on
+    which request returned first.
+    
+    With a watermark store, each topic is only queried from its last
+    watermark onwards and articles already seen for that topic are
+    dropped. The store is updated in memory; call watermarks.save() once
+    the run has succeeded.
+    
+    Args:
+        topics (list): Topics to fetch, in priority order
+        api_key (str): Your NewsAPI key
+        max_articles (int): Maximum number of articles to fetch per topic
+        max_workers (int): Maximum number of requests in flight at once
+        session (requests.Session): Optional session (one is created if omitted)
+        watermarks (WatermarkStore): Optional per-topic watermarks for incremental fetching
+        near_duplicates (NearDuplicateIndex): Optional index that also rejects the same
+                                              story syndicated under another URL
+        
+    Returns:
+        tuple: (list of unique articles, dict of topic -> fetch latency in seconds)
+    """
+    
+    owns_session = session is None
+    if owns_session:
+        session = create_session(pool_size=max_workers)
     
     try:
-        # Make the request to NewsAPI
-        response = requests.get(url, params=params, timeout=10)
-        
-        # Check if request was successful
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Extract articles from response
-            articles = data.get("articles", [])
-            
-            # Format the articles and calculate relevance
-            formatted_articles = []
-            for article in articles:
-                formatted_article = {
-                    "topic": topic,
-                    "title": article.get("title", "No title"),
-                    "description": article.get("description", "No description"),
-                    "url": article.get("url", ""),
-                    "content": article.get("content", ""),
-                    "published_at": article.get("publishedAt", ""),
-                    "source": article.get("source", {}).get("name", "Unknown")
-                }
-                # Calculate and add relevance score
-                formatted_article["relevance_score"] = calculate_relevance_score(formatted_article, topic)
-                formatted_articles.append(formatted_article)
-            
-            # Sort by relevance score (highest first)
-            formatted_articles.sort(key=lambda x: x["relevance_score"], reverse=True)
-            
-            return formatted_articles
-        else:
-            print(f"Error fetching news for '{topic}': Status code {response.status_code}")
-            print(f"Response: {response.text}")
-            return []
-            
-    except requests.exceptions.RequestException as e:
-        print(f"Network error while fetching news for '{topic}': {e}")
-        return []
+        results = fetch_topics(topics, api_key, max_articles, max_workers, session, watermarks)
+    finally:
+        if owns_session:
+            session.close()
+    
+    unique_articles = []
+    latencies = {}
+    seen_urls = set()
+    
+    for topic in topics:
+        articles, latency = results[topic]
+        latencies[topic] = latency
+        article = select_unique_article(articles, seen_urls, near_duplicates)
+        if article is not None:
+            unique_articles.append(article)  # Got one unique article for this topic
+    
+    return unique_articles, latencies
 
 
 def main():
@@ -130,29 +602,34 @@ def main():
         print("Get your free key at: https://newsapi.org/")
         return
     
-    # Collect all articles
-    all_articles = []
-    seen_urls = set()  # Track URLs we've already added
+    # Fetch articles for every topic concurrently
+    print(f"Fetching news for {len(TOPICS)} topics ({MAX_CONCURRENT_FETCHES} at a time)...")
+    start_time = time.perf_counter()
+    near_duplicates = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD) if NEAR_DUPLICATE_THRESHOLD else None
+    all_articles, latencies = fetch_all_topics(
+        TOPICS,
+        NEWS_API_KEY,
+        ARTICLES_PER_TOPIC,
+        max_workers=MAX_CONCURRENT_FETCHES,
+        near_duplicates=near_duplicates
+    )
+    elapsed_time = time.perf_counter() - start_time
     
-    # Fetch articles for each topic
+    found_topics = {article['topic'] for article in all_articles}
     for topic in TOPICS:
-        print(f"Fetching news for: {topic}...")
-        articles = fetch_news_articles(topic, NEWS_API_KEY, ARTICLES_PER_TOPIC)
-        
-        # Filter out duplicates and try to get at least one unique article per topic
-        added_for_topic = False
-        for article in articles:
-            if article['url'] not in seen_urls:
-                all_articles.append(article)
-                seen_urls.add(article['url'])
-                added_for_topic = True
-                break  # Got one unique article for this topic, move to next topic
-        
-        if added_for_topic:
-            print(f"  ✓ Found unique article")
+        if topic in found_topics:
+            print(f"  ✓ {topic}: found unique article ({latencies[topic]:.2f}s)")
         else:
-            print(f"  ⚠ All articles were duplicates")
-        print()
+            print(f"  ⚠ {topic}: all articles were duplicates ({latencies[topic]:.2f}s)")
+    if near_duplicates is not None:
+        for duplicate, original, similarity in near_duplicates.collapsed:
+            print(f"  ≈ Skipped near-duplicate ({similarity:.0%}): {duplicate['title'][:60]}")
+            print(f"      same story as: {original['title'][:60]}")
+    print(f"Fetch stage took {elapsed_time:.2f} seconds")
+    if RESPONSE_CACHE is not None:
+        RESPONSE_CACHE.wait()
+        print(response_cache_summary())
+    print()
     
     # Display results
     print("=" * 60)
@@ -172,11 +649,13 @@ def main():
             print("-" * 60)
             print()
         
-        # Save to a JSON file for later use
-        output_file = "fetched_articles.json"
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(all_articles, f, indent=2, ensure_ascii=False)
-        print(f">> Articles saved to '{output_file}'")
+        # Save to the article store for summarize_articles.py
+        store = ArticleStore()
+        try:
+            store.add(all_articles, datetime.now().strftime("%Y%m%d-%H%M%S"))
+        finally:
+            store.close()
+        print(f">> Articles saved to '{store.path}'")
         
     else:
         print("WARNING: No articles found. Check your API key and internet connection.")
@@ -3,7 +3,8 @@ Main Script: AI-Powered News Newsletter Generator
 This script combines all parts to create and send a daily newsletter
 """
 
-import json
+import argparse
+import os
 import time
 import logging
 import sys
@@ -13,29 +14,58 @@ from datetime import datetime
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
-# Import all the functions from previous parts
-from fetch_news import fetch_news_articles
-from summarize_articles import summarize_all_articles
-from send_email import create_email_html, send_email
+# Only lightweight modules are imported here. The stage modules (and with
+# them requests, openai, smtplib) are imported by the functions that run
+# each stage, so validating the config or fetching alone starts quickly.
+from watermarks import WatermarkStore
+from dedup import NearDuplicateIndex
+from checkpoint import RunCheckpoint, latest_incomplete_run, new_run_id
+from article_store import ArticleStore
+from metrics import METRICS
 
 # Import configuration
 try:
-    from config import (
-        NEWS_API_KEY,
-        OPENAI_API_KEY,
-        SENDER_EMAIL,
-        SENDER_PASSWORD,
-        RECIPIENT_EMAIL,
-        TOPICS,
-        ARTICLES_PER_TOPIC,
-        OPENAI_MODEL,
-        MAX_SUMMARY_TOKENS
-    )
+    from settings import load_settings
+    SETTINGS = load_settings(required=(
+        "NEWS_API_KEY",
+        "OPENAI_API_KEY",
+        "SENDER_EMAIL",
+        "SENDER_PASSWORD",
+        "RECIPIENT_EMAIL",
+        "TOPICS",
+        "ARTICLES_PER_TOPIC",
+        "OPENAI_MODEL",
+        "MAX_SUMMARY_TOKENS"
+    ))
 except ImportError:
     print("ERROR: config.py not found!")
     print("Please make sure config.py exists with all required settings.")
     exit(1)
 
+NEWS_API_KEY = SETTINGS.news_api_key
+OPENAI_API_KEY = SETTINGS.openai_api_key
+SENDER_EMAIL = SETTINGS.sender_email
+SENDER_PASSWORD = SETTINGS.sender_password
+RECIPIENT_EMAIL = SETTINGS.recipient_email
+TOPICS = SETTINGS.topics
+ARTICLES_PER_TOPIC = SETTINGS.articles_per_topic
+OPENAI_MODEL = SETTINGS.openai_model
+MAX_SUMMARY_TOKENS = SETTINGS.max_summary_tokens
+MAX_CONCURRENT_FETCHES = SETTINGS.max_concurrent_fetches
+SUMMARY_BACKEND = SETTINGS.summary_backend
+BATCH_POLL_SECONDS = SETTINGS.batch_poll_seconds
+WATERMARKS_PATH = SETTINGS.watermarks_path
+PIPELINE_MODE = SETTINGS.pipeline_mode
+SUMMARY_WORKERS = SETTINGS.summary_workers
+NEAR_DUPLICATE_THRESHOLD = SETTINGS.near_duplicate_threshold
+SMTP_POOL_SIZE = SETTINGS.smtp_pool_size
+SMTP_MESSAGES_PER_MINUTE = SETTINGS.smtp_messages_per_minute
+ENGINE = SETTINGS.engine
+METRICS_REPORT_PATH = SETTINGS.metrics_report_path
+METRICS_PROMETHEUS_PATH = SETTINGS.metrics_prometheus_path
+CHECKPOINT_DIR = SETTINGS.checkpoint_dir
+ARTICLE_STORE_PATH = SETTINGS.article_store_path
+
 
 # Set up logging with UTF-8 encoding
 logging.basicConfig(
@@ -74,6 +104,12 @@ def validate_config():
     if not RECIPIENT_EMAIL or RECIPIENT_EMAIL == "recipient@gmail.com":
         errors.append("Recipient email not set")
     
+    if SETTINGS.digest_ready_by:
+        try:
+            datetime.strptime(SETTINGS.digest_ready_by, "%H:%M")
+        except ValueError:
+            errors.append(f"DIGEST_READY_BY should be \"HH:MM\", not {SETTINGS.digest_ready_by!r}")
+    
     if errors:
         logger.error("Configuration errors found:")
         for error in errors:
@@ -83,10 +119,335 @@ def validate_config():
     return True
 
 
-def run_newsletter():
+def log_near_duplicates(near_duplicates):
+    """
+    Log which syndicated copies were collapsed into an earlier article
+    
+    Args:
+        near_duplicates (NearDuplicateIndex): Index used during dedup (or None)
+    """
+    if near_duplicates is None or not near_duplicates.collapsed:
+        return
+    logger.info(f"Collapsed {len(near_duplicates.collapsed)} near-duplicate articles:")
+    for duplicate, original, similarity in near_duplicates.collapsed:
+        logger.info(f"  ≈ {duplicate['title'][:60]} ({duplicate['source']}, {similarity:.0%} similar)")
+        logger.info(f"      kept: {original['title'][:60]} ({original['source']})")
+
+
+def restore_fetched(checkpoint, watermarks):
+    """
+    Reuse the articles fetched by an interrupted run
+    
+    Args:
+        checkpoint (RunCheckpoint): Checkpoint of the run being resumed (or None)
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        
+    Returns:
+        list or None: Fetched articles, or None if the fetch stage has to run
+    """
+    if checkpoint is None:
+        return None
+    articles = checkpoint.load_fetched()
+    if articles is None:
+        return None
+    
+    # The watermarks were not saved by the failed run, so advance them past
+    # the restored articles again
+    if watermarks is not None:
+        for topic in TOPICS:
+            watermarks.record(topic, [article for article in articles if article.get("topic") == topic])
+    logger.info(f"  Resuming run {checkpoint.run_id}: reusing {len(articles)} fetched articles")
+    return articles
+
+
+def fetch_and_summarize(watermarks, summary_cache, checkpoint=None, deadline=None):
+    """
+    Steps 1 and 2 as separate stages: fetch every topic, then summarize
+    
+    Args:
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        summary_cache (SummaryCache): Optional summary cache
+        checkpoint (RunCheckpoint): Optional run checkpoint
+        deadline (float): Optional time.monotonic() deadline for the summaries
+        
+    Returns:
+        list: Summarized articles (empty if nothing was fetched)
+    """
+    
+    # ========== STEP 1: FETCH ARTICLES ==========
+    logger.info("\n📰 STEP 1: Fetching news articles...")
+    logger.info(f"Topics: {', '.join(TOPICS)}")
+    
+    all_articles = restore_fetched(checkpoint, watermarks)
+    if all_articles is None:
+        from fetch_news import fetch_all_topics
+        
+        near_duplicates = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD) if NEAR_DUPLICATE_THRESHOLD else None
+        
+        fetch_start = time.perf_counter()
+        all_articles, latencies = fetch_all_topics(
+            TOPICS,
+            NEWS_API_KEY,
+            ARTICLES_PER_TOPIC,
+            max_workers=MAX_CONCURRENT_FETCHES,
+            watermarks=watermarks,
+            near_duplicates=near_duplicates
+        )
+        fetch_elapsed = time.perf_counter() - fetch_start
+        METRICS.observe("stage_seconds", fetch_elapsed, stage="fetch")
+        
+        for topic in TOPICS:
+            logger.info(f"  Fetched: {topic} ({latencies[topic]:.2f}s)")
+        logger.info(f"Fetch stage took {fetch_elapsed:.2f} seconds "
+                    f"(max {MAX_CONCURRENT_FETCHES} requests in flight)")
+        log_near_duplicates(near_duplicates)
+        
+        if checkpoint is not None:
+            checkpoint.save_fetched(all_articles)
+    
+    logger.info(f"✓ Fetched {len(all_articles)} unique articles")
+    
+    if not all_articles:
+        return []
+    
+    # ========== STEP 2: SUMMARIZE ARTICLES ==========
+    logger.info("\n🤖 STEP 2: Generating AI summaries...")
+    logger.info(f"Model: {OPENAI_MODEL}")
+    
+    with METRICS.timer("stage_seconds", stage="summarize"):
+        if SUMMARY_BACKEND == "batch_api":
+            # Overnight mode: one asynchronous Batch API job instead of live calls
+            from openai import OpenAI
+            from batch_api import OpenAIBatchBackend, summarize_all_articles_batch_api
+            
+            logger.info("Backend: OpenAI Batch API (resumable, see batch_state.json)")
+            return summarize_all_articles_batch_api(
+                all_articles,
+                OpenAIBatchBackend(OpenAI(api_key=OPENAI_API_KEY)),
+                OPENAI_MODEL,
+                MAX_SUMMARY_TOKENS,
+                cache=summary_cache,
+                poll_interval=BATCH_POLL_SECONDS
+            )
+        
+        from summarize_articles import summarize_all_articles
+        
+        return summarize_all_articles(
+            all_articles,
+            OPENAI_API_KEY,
+            OPENAI_MODEL,
+            MAX_SUMMARY_TOKENS,
+            cache=summary_cache,
+            checkpoint=checkpoint,
+            deadline=deadline
+        )
+
+
+def stream_articles(watermarks, summary_cache, checkpoint=None, deadline=None):
+    """
+    Steps 1 and 2 as a streaming pipeline: summaries start as soon as the first topic arrives
+    
+    Args:
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        summary_cache (SummaryCache): Optional summary cache
+        checkpoint (RunCheckpoint): Optional run checkpoint
+        deadline (float): Optional time.monotonic() deadline for the summaries
+        
+    Returns:
+        tuple: (summarized articles, compiled NewsletterTemplate or None)
+    """
+    
+    logger.info("\n📰🤖 STEPS 1-2: Fetching and summarizing (streaming pipeline)...")
+    logger.info(f"Topics: {', '.join(TOPICS)}")
+    logger.info(f"Model: {OPENAI_MODEL}")
+    
+    from pipeline import run_streaming_pipeline
+    
+    near_duplicates = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD) if NEAR_DUPLICATE_THRESHOLD else None
+    
+    result = run_streaming_pipeline(
+        TOPICS,
+        NEWS_API_KEY,
+        OPENAI_API_KEY,
+        OPENAI_MODEL,
+        MAX_SUMMARY_TOKENS,
+        articles_per_topic=ARTICLES_PER_TOPIC,
+        fetch_workers=MAX_CONCURRENT_FETCHES,
+        summary_workers=SUMMARY_WORKERS,
+        cache=summary_cache,
+        watermarks=watermarks,
+        near_duplicates=near_duplicates,
+        checkpoint=checkpoint,
+        deadline=deadline
+    )
+    
+    for topic, latency in result["latencies"].items():
+        logger.info(f"  Fetched: {topic} ({latency:.2f}s)")
+    for stage, timing in result["stages"].items():
+        # Stages overlap, so each is recorded as time until it drained
+        METRICS.observe("stage_seconds", timing.get("done", timing["last"]), stage=stage)
+        if timing.get("first") is None:
+            logger.info(f"  Stage {stage}: no items (done at {timing['done']:.2f}s)")
+        else:
+            logger.info(f"  Stage {stage}: {timing['items']} items, first at {timing['first']:.2f}s, "
+                        f"last at {timing['last']:.2f}s, done at {timing.get('done', timing['last']):.2f}s")
+    
+    log_near_duplicates(near_duplicates)
+    logger.info(f"✓ Fetched {len(result['fetched'])} unique articles")
+    
+    return result["articles"], result["template"]
+
+
+def run_newsletter_with_asyncio(subject, watermarks, summary_cache, deadline=None):
+    """
+    Run the whole newsletter on the asyncio engine (async HTTP, AsyncOpenAI, async SMTP)
+    
+    Args:
+        subject (str): Email subject line
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        summary_cache (SummaryCache): Optional summary cache
+        deadline (float): Optional time.monotonic() deadline for the summaries
+        
+    Returns:
+        tuple: (summarized articles (empty if nothing was fetched),
+                delivery report recipient -> result (empty if nothing was sent))
+    """
+    import asyncio
+    from async_pipeline import StageLimits, run_newsletters_async
+    
+    logger.info("\n⚡ Running fetch, summarize and send on the asyncio engine...")
+    logger.info(f"Topics: {', '.join(TOPICS)}")
+    
+    recipients = RECIPIENT_EMAIL if isinstance(RECIPIENT_EMAIL, (list, tuple)) else [RECIPIENT_EMAIL]
+    job = {
+        "topics": TOPICS,
+        "news_api_key": NEWS_API_KEY,
+        "model": OPENAI_MODEL,
+        "max_tokens": MAX_SUMMARY_TOKENS,
+        "articles_per_topic": ARTICLES_PER_TOPIC,
+        "subject": subject,
+        "sender_email": SENDER_EMAIL,
+        "sender_password": SENDER_PASSWORD,
+        "recipients": list(recipients),
+        "deadline": deadline
+    }
+    limits = StageLimits(fetch=MAX_CONCURRENT_FETCHES, summarize=SUMMARY_WORKERS, send=SMTP_POOL_SIZE)
+    
+    [result] = asyncio.run(run_newsletters_async(
+        [job], OPENAI_API_KEY, limits, summary_cache, watermarks, NEAR_DUPLICATE_THRESHOLD
+    ))
+    if isinstance(result, Exception):
+        raise result
+    
+    for topic, latency in result["latencies"].items():
+        logger.info(f"  Fetched: {topic} ({latency:.2f}s)")
+    for stage, elapsed in result["stages"].items():
+        METRICS.observe("stage_seconds", elapsed, stage=stage)
+        logger.info(f"  Stage {stage} took {elapsed:.2f} seconds")
+    for duplicate, original, similarity in result["near_duplicates"]:
+        logger.info(f"  ≈ Collapsed {duplicate['title'][:60]} ({similarity:.0%} similar to {original['title'][:40]})")
+    
+    report = result["report"] or {}
+    for recipient, r in report.items():
+        if not r["ok"]:
+            logger.error(f"  ❌ {recipient}: {r['error']} (after {r['attempts']} attempts)")
+    return result["articles"], report
+
+
+def archive_articles(articles, batch):
+    """
+    Save the run's articles and summaries to the article store
+    
+    Local fallbacks for failed summaries are not archived as summaries,
+    so the article still counts as unsummarized there.
+    
+    Args:
+        articles (list): Summarized articles
+        batch (str): Run ID the articles are stored under
+    """
+    store = ArticleStore(ARTICLE_STORE_PATH)
+    try:
+        store.add([
+            {key: value for key, value in article.items() if key != "summary"}
+            if "summary_fallback" in article else article
+            for article in articles
+        ], batch)
+    finally:
+        store.close()
+    logger.info(f"Articles saved to '{ARTICLE_STORE_PATH}' (batch {batch})")
+
+
+def send_newsletter(subject, template, checkpoint=None):
+    """
+    Step 3: send the rendered newsletter, skipping recipients an earlier attempt already reached
+    
+    Args:
+        subject (str): Email subject line
+        template (NewsletterTemplate): Compiled newsletter
+        checkpoint (RunCheckpoint): Optional run checkpoint; each delivery is recorded as it happens
+        
+    Returns:
+        tuple: (success, description of who it was sent to, complete), where success means
+               at least one recipient still waiting for the newsletter got it and complete
+               means all of them did
+    """
+    from send_email import send_email
+    from bulk_email import send_bulk_email
+    
+    recipients = list(RECIPIENT_EMAIL) if isinstance(RECIPIENT_EMAIL, (list, tuple)) else [RECIPIENT_EMAIL]
+    delivered = checkpoint.delivered() if checkpoint is not None else set()
+    remaining = [recipient for recipient in recipients if recipient not in delivered]
+    if delivered:
+        logger.info(f"  Resuming run {checkpoint.run_id}: {len(recipients) - len(remaining)} recipients "
+                    f"already have this newsletter")
+    if not remaining:
+        return True, f"{len(recipients)} recipients (all in an earlier attempt)", True
+    
+    def record_delivery(recipient, result):
+        if result["ok"] and checkpoint is not None:
+            checkpoint.record_delivery(recipient)
+    
+    if isinstance(RECIPIENT_EMAIL, (list, tuple)):
+        # Mailing list: one pooled SMTP session per worker instead of one login per recipient
+        report = send_bulk_email(
+            subject,
+            template.render,  # Articles are rendered once; only the recipient line changes
+            SENDER_EMAIL,
+            SENDER_PASSWORD,
+            remaining,
+            pool_size=SMTP_POOL_SIZE,
+            messages_per_minute=SMTP_MESSAGES_PER_MINUTE,
+            on_result=record_delivery
+        )
+        failed = {recipient: result for recipient, result in report.items() if not result["ok"]}
+        for recipient, result in failed.items():
+            logger.error(f"  ❌ {recipient}: {result['error']} (after {result['attempts']} attempts)")
+        # Recipients reached by an earlier attempt do not make this attempt a success
+        success = len(failed) < len(remaining)
+        return success, f"{len(recipients) - len(failed)} of {len(recipients)} recipients", not failed
+    
+    success = send_email(
+        subject,
+        template.render(RECIPIENT_EMAIL),
+        SENDER_EMAIL,
+        SENDER_PASSWORD,
+        RECIPIENT_EMAIL
+    )
+    record_delivery(RECIPIENT_EMAIL, {"ok": success})
+    return success, RECIPIENT_EMAIL, success
+
+
+def run_newsletter(run_id=None):
     """
     Main function that orchestrates the entire newsletter process
     
+    Every stage is checkpointed under CHECKPOINT_DIR/<run ID>. Passing the
+    ID of a run that failed resumes it: fetched articles, finished summaries
+    and completed deliveries are reused instead of being redone.
+    
+    Args:
+        run_id (str): ID of an interrupted run to resume (a new run if omitted)
+    
     Returns:
         bool: True if successful, False otherwise
     """
@@ -99,77 +460,117 @@ def run_newsletter():
     logger.info(f"Date: {today}")
     logger.info("=" * 60)
     
+    run_id = run_id or new_run_id()
+    checkpoint = None
+    if CHECKPOINT_DIR and ENGINE != "async":
+        checkpoint = RunCheckpoint(run_id, CHECKPOINT_DIR, TOPICS, OPENAI_MODEL)
+        logger.info(f"Run ID: {checkpoint.run_id}" + (f" (resuming from stage '{checkpoint.stage}')"
+                                                       if checkpoint.resumed else ""))
+        # Keep the original date so a resumed run sends the same subject line
+        today = datetime.fromisoformat(checkpoint.manifest["created_at"]).strftime("%B %d, %Y")
+    
     try:
-        # ========== STEP 1: FETCH ARTICLES ==========
-        logger.info("\n📰 STEP 1: Fetching news articles...")
-        logger.info(f"Topics: {', '.join(TOPICS)}")
+        from summarize_articles import open_summary_cache, summary_deadline
         
-        all_articles = []
-        seen_urls = set()
+        # Started with the run, so time spent fetching counts against it too
+        deadline = summary_deadline()
+        watermarks = WatermarkStore(WATERMARKS_PATH) if WATERMARKS_PATH else None
+        summary_cache = open_summary_cache()
+        template = None
         
-        for topic in TOPICS:
-            logger.info(f"  Fetching: {topic}")
-            articles = fetch_news_articles(topic, NEWS_API_KEY, ARTICLES_PER_TOPIC)
-            
-            # Filter duplicates
-            for article in articles:
-                if article['url'] not in seen_urls:
-                    all_articles.append(article)
-                    seen_urls.add(article['url'])
-                    break  # Got one unique article for this topic
+        subject = f"📰 Your Daily News Digest - {today}"
         
-        logger.info(f"✓ Fetched {len(all_articles)} unique articles")
+        report = None
+        try:
+            if ENGINE == "async":
+                # Fetch, summarize and send in one go; the report says who got the newsletter
+                summarized_articles, report = run_newsletter_with_asyncio(subject, watermarks, summary_cache,
+                                                                          deadline)
+            elif PIPELINE_MODE == "streaming" and not (checkpoint is not None and checkpoint.reached("fetched")):
+                summarized_articles, template = stream_articles(watermarks, summary_cache, checkpoint, deadline)
+            else:
+                # A resumed run already knows its articles, so only the missing summaries are made
+                summarized_articles = fetch_and_summarize(watermarks, summary_cache, checkpoint, deadline)
+        finally:
+            if summary_cache is not None:
+                summary_cache.close()
         
-        if not all_articles:
+        if not summarized_articles:
+            if watermarks is not None:
+                logger.info("No new articles since the last run. Nothing to send.")
+                if checkpoint is not None:
+                    checkpoint.remove()
+                return True
             logger.error("❌ No articles found. Aborting.")
             return False
         
-        # Save fetched articles
-        with open("fetched_articles.json", "w", encoding="utf-8") as f:
-            json.dump(all_articles, f, indent=2, ensure_ascii=False)
-        
-        # ========== STEP 2: SUMMARIZE ARTICLES ==========
-        logger.info("\n🤖 STEP 2: Generating AI summaries...")
-        logger.info(f"Model: {OPENAI_MODEL}")
-        
-        summarized_articles = summarize_all_articles(
-            all_articles,
-            OPENAI_API_KEY,
-            OPENAI_MODEL,
-            MAX_SUMMARY_TOKENS
-        )
-        
         logger.info(f"✓ Generated {len(summarized_articles)} summaries")
+        fallbacks = sum(1 for article in summarized_articles if "summary_fallback" in article)
+        if fallbacks:
+            logger.warning(f"⚠️  {fallbacks} summaries failed; those articles use a local extractive summary")
+        if checkpoint is not None:
+            checkpoint.mark("summarized")
         
-        # Save summarized articles
-        with open("summarized_articles.json", "w", encoding="utf-8") as f:
-            json.dump(summarized_articles, f, indent=2, ensure_ascii=False)
-        
-        # ========== STEP 3: SEND EMAIL ==========
-        logger.info("\n📧 STEP 3: Sending email newsletter...")
+        archive_articles(summarized_articles, run_id)
         
-        subject = f"📰 Your Daily News Digest - {today}"
-        html_content = create_email_html(summarized_articles)
-        
-        success = send_email(
-            subject,
-            html_content,
-            SENDER_EMAIL,
-            SENDER_PASSWORD,
-            RECIPIENT_EMAIL
-        )
+        if report is not None:
+            # The asyncio engine has already sent the newsletter
+            failed = sum(1 for result in report.values() if not result["ok"])
+            success = failed < len(report)
+            sent_to = f"{len(report) - failed} of {len(report)} recipients"
+            complete = not failed
+        else:
+            # ========== STEP 3: SEND EMAIL ==========
+            logger.info("\n📧 STEP 3: Sending email newsletter...")
+            
+            if template is None:
+                from send_email import NewsletterTemplate
+                template = NewsletterTemplate(summarized_articles)
+            
+            send_start = time.perf_counter()
+            success, sent_to, complete = send_newsletter(subject, template, checkpoint)
+            send_elapsed = time.perf_counter() - send_start
+            METRICS.observe("stage_seconds", send_elapsed, stage="send")
+            logger.info(f"Send stage took {send_elapsed:.2f} seconds")
         
         if not success:
             logger.error("❌ Failed to send email")
             return False
         
-        logger.info(f"✓ Newsletter sent to {RECIPIENT_EMAIL}")
+        logger.info(f"✓ Newsletter sent to {sent_to}")
+        
+        # Only move the watermarks forward once the articles were delivered to everyone;
+        # the checkpoint stays so the failed recipients can be retried with --resume
+        if not complete:
+            logger.warning("⚠️  Some recipients did not get the newsletter"
+                           + (f"; retry them with: python main.py --resume {checkpoint.run_id}"
+                              if checkpoint is not None else ""))
+        else:
+            if watermarks is not None:
+                watermarks.save()
+            if checkpoint is not None:
+                checkpoint.mark("sent")
+                checkpoint.remove()
         
         # ========== SUMMARY ==========
         elapsed_time = time.time() - start_time
         logger.info("\n" + "=" * 60)
         logger.info("✅ NEWSLETTER GENERATION COMPLETE!")
         logger.info(f"Articles: {len(summarized_articles)}")
+        if summary_cache is not None:
+            logger.info(f"Summary cache hit rate: {summary_cache.hit_rate:.0%} "
+                        f"({summary_cache.hits} hits, {summary_cache.misses} misses)")
+        from fetch_news import RESPONSE_CACHE, response_cache_summary
+        from summarize_articles import ROUTER
+        avoided = ROUTER.snapshot()
+        if avoided:
+            logger.info(f"OpenAI calls avoided by local summaries: {sum(avoided.values())} "
+                        f"({', '.join(f'{count} {reason}' for reason, count in sorted(avoided.items()))})")
+        if RESPONSE_CACHE is not None:
+            logger.info(response_cache_summary())
+        tokens_saved = METRICS.counter("prompt_tokens_saved_total")
+        if tokens_saved:
+            logger.info(f"Prompt tokens saved by the content budget: {tokens_saved}")
         logger.info(f"Time taken: {elapsed_time:.2f} seconds")
         logger.info("=" * 60)
         
@@ -177,21 +578,98 @@ def run_newsletter():
         
     except Exception as e:
         logger.error(f"\n❌ ERROR: {str(e)}", exc_info=True)
+        if checkpoint is not None:
+            logger.error(f"Resume this run with: python main.py --resume {checkpoint.run_id}")
         return False
 
 
+def write_run_report(success, elapsed):
+    """
+    Write the metrics collected during the run to the configured report files
+    
+    Args:
+        success (bool): Whether the run succeeded
+        elapsed (float): Total run time in seconds
+    """
+    METRICS.observe("stage_seconds", elapsed, stage="total")
+    try:
+        if METRICS_REPORT_PATH:
+            METRICS.write_json(METRICS_REPORT_PATH, success=success, engine=ENGINE, pipeline_mode=PIPELINE_MODE)
+            logger.info(f"Run report written to '{METRICS_REPORT_PATH}'")
+        if METRICS_PROMETHEUS_PATH:
+            METRICS.write_prometheus(METRICS_PROMETHEUS_PATH)
+    except OSError as e:
+        logger.error(f"Could not write run report: {e}")
+
+
+def run_profiled(path, run_id=None):
+    """
+    Run the newsletter under cProfile
+    
+    Args:
+        path (str): Where to save the profile (open with pstats or snakeviz)
+        run_id (str): ID of an interrupted run to resume
+        
+    Returns:
+        bool: Result of run_newsletter()
+    """
+    import cProfile
+    import io
+    import pstats
+    
+    profiler = cProfile.Profile()
+    success = profiler.runcall(run_newsletter, run_id)
+    profiler.dump_stats(path)
+    
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(25)
+    logger.info(f"Profile saved to '{path}'. Top functions by cumulative time:\n{summary.getvalue()}")
+    return success
+
+
 def main():
     """
     Entry point for the newsletter generator
     """
     
+    parser = argparse.ArgumentParser(description="AI-powered news newsletter generator")
+    parser.add_argument("--profile", nargs="?", const="newsletter.prof", metavar="PATH",
+                        help="profile the run with cProfile and save the stats (default: newsletter.prof)")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                        help="resume a failed run from its checkpoint (default: the most recent one)")
+    parser.add_argument("--check", action="store_true",
+                        help="only validate config.py (nothing is fetched or sent)")
+    args = parser.parse_args()
+    
     # Validate configuration
     if not validate_config():
         logger.error("\n⚠️  Please fix configuration errors in config.py")
+        if args.check:
+            sys.exit(1)
         return
+    if args.check:
+        logger.info("✓ config.py is valid")
+        return
+    
+    run_id = None
+    if args.resume:
+        if not CHECKPOINT_DIR or ENGINE == "async":
+            logger.error("❌ --resume needs CHECKPOINT_DIR set and the threads engine")
+            return
+        run_id = latest_incomplete_run(CHECKPOINT_DIR) if args.resume == "latest" else args.resume
+        if run_id is None or not os.path.isdir(os.path.join(CHECKPOINT_DIR, run_id)):
+            logger.error(f"❌ No checkpoint to resume in '{CHECKPOINT_DIR}'"
+                         + (f" for run {args.resume}" if args.resume != "latest" else ""))
+            return
     
     # Run the newsletter generation
-    success = run_newsletter()
+    start_time = time.perf_counter()
+    success = run_profiled(args.profile, run_id) if args.profile else run_newsletter(run_id)
+    # Let background refreshes of stale NewsAPI responses finish (if the run got as far as fetching)
+    fetch_news = sys.modules.get("fetch_news")
+    if fetch_news is not None and fetch_news.RESPONSE_CACHE is not None:
+        fetch_news.RESPONSE_CACHE.wait()
+    write_run_report(success, time.perf_counter() - start_time)
     
     if success:
         logger.info("\n✅ Newsletter successfully generated and sent!")
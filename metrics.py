@@ -0,0 +1,198 @@
+"""
+Run Metrics
+Latency histograms and counters for one newsletter run, exported as JSON or Prometheus text
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds (Prometheus client defaults plus a few slow ones)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prefix for every metric name in the Prometheus export
+PROMETHEUS_PREFIX = "newsletter_"
+
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _label_text(labels):
+    """Format a label tuple as {key="value",...} for Prometheus"""
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+class Metrics:
+    """
+    Thread-safe registry of histograms and counters
+
+    A series is a metric name plus a set of labels, e.g.
+    ("request_seconds", service="openai"). Histograms keep bucket counts
+    for Prometheus and a bounded sample of raw values for percentiles.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, max_samples=10000):
+        """
+        Args:
+            buckets (tuple): Histogram bucket upper bounds
+            max_samples (int): Raw values kept per histogram for percentiles
+        """
+        self.buckets = tuple(buckets)
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+    def observe(self, name, value, **labels):
+        """
+        Record one histogram observation
+
+        Args:
+            name (str): Metric name, e.g. "request_seconds"
+            value (float): Observed value
+            **labels: Series labels, e.g. service="newsapi"
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = {
+                    "count": 0, "sum": 0.0, "max": 0.0,
+                    "buckets": [0] * len(self.buckets), "samples": []
+                }
+            series["count"] += 1
+            series["sum"] += value
+            series["max"] = max(series["max"], value)
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series["buckets"][index] += 1
+            if len(series["samples"]) < self.max_samples:
+                series["samples"].append(value)
+
+    def increment(self, name, amount=1, **labels):
+        """
+        Add to a counter
+
+        Args:
+            name (str): Metric name, e.g. "retries_total"
+            amount (float): Amount to add
+            **labels: Series labels
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time the body of a with-block into a histogram"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter(self, name, **labels):
+        """Current value of a counter (0 if never incremented)"""
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def report(self):
+        """
+        Summarize every series
+
+        Returns:
+            dict: {"histograms": [...], "counters": [...]} with count, sum, mean,
+                  p50, p95 and max for each histogram
+        """
+        with self._lock:
+            histograms = []
+            for (name, labels), series in sorted(self._histograms.items()):
+                samples = sorted(series["samples"])
+                histograms.append({
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": series["count"],
+                    "sum": round(series["sum"], 6),
+                    "mean": round(series["sum"] / series["count"], 6),
+                    "p50": _percentile(samples, 0.50),
+                    "p95": _percentile(samples, 0.95),
+                    "max": series["max"]
+                })
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {"histograms": histograms, "counters": counters}
+
+    def to_prometheus(self):
+        """
+        Render every series in the Prometheus text exposition format
+
+        Returns:
+            str: Exposition text (suitable for node_exporter's textfile collector)
+        """
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), series in sorted(self._histograms.items()):
+                metric = PROMETHEUS_PREFIX + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} histogram")
+                    typed.add(metric)
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_label_text(labels + (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{metric}_bucket{_label_text(labels + (('le', '+Inf'),))} {series['count']}")
+                lines.append(f"{metric}_sum{_label_text(labels)} {series['sum']}")
+                lines.append(f"{metric}_count{_label_text(labels)} {series['count']}")
+
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = PROMETHEUS_PREFIX + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                lines.append(f"{metric}{_label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path, **extra):
+        """
+        Write the run report as JSON (atomically)
+
+        Args:
+            path (str): Output file
+            **extra: Additional top-level fields, e.g. success=True
+        """
+        report = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), **extra, **self.report()}
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(temp_path, path)
+
+    def write_prometheus(self, path):
+        """Write the Prometheus exposition text to `path` (atomically)"""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+
+
+# Process-wide registry used by the fetch, summarize and send code
+METRICS = Metrics()
@@ -0,0 +1,370 @@
+"""
+Multi-Tenant Newsletters
+Builds personalised digests for many subscribers while fetching and summarizing shared work once
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bulk_email import SMTPConnectionPool, send_bulk_email
+from dedup import NearDuplicateIndex
+from fetch_news import create_session, fetch_topics, select_unique_article
+from send_email import NewsletterTemplate, render_article_html
+from summarize_articles import open_summary_cache, summarize_all_articles, summary_deadline
+
+# Import configuration from config.py
+try:
+    from settings import load_settings
+    SETTINGS = load_settings(required=("NEWS_API_KEY", "OPENAI_API_KEY", "SENDER_EMAIL", "SENDER_PASSWORD",
+                                       "ARTICLES_PER_TOPIC", "OPENAI_MODEL", "MAX_SUMMARY_TOKENS"))
+except ImportError:
+    print("ERROR: config.py not found!")
+    print("Please make sure config.py exists with all required settings.")
+    exit(1)
+
+NEWS_API_KEY = SETTINGS.news_api_key
+OPENAI_API_KEY = SETTINGS.openai_api_key
+SENDER_EMAIL = SETTINGS.sender_email
+SENDER_PASSWORD = SETTINGS.sender_password
+ARTICLES_PER_TOPIC = SETTINGS.articles_per_topic
+OPENAI_MODEL = SETTINGS.openai_model
+MAX_SUMMARY_TOKENS = SETTINGS.max_summary_tokens
+SUBSCRIBERS_PATH = SETTINGS.subscribers_path
+SUBSCRIBER_STATE_PATH = SETTINGS.subscriber_state_path
+MAX_CONCURRENT_FETCHES = SETTINGS.max_concurrent_fetches
+NEAR_DUPLICATE_THRESHOLD = SETTINGS.near_duplicate_threshold
+SMTP_POOL_SIZE = SETTINGS.smtp_pool_size
+SMTP_MESSAGES_PER_MINUTE = SETTINGS.smtp_messages_per_minute
+
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def normalize_topic(topic):
+    """
+    Canonical form of a topic so "AI " and "ai" share one fetch
+
+    Args:
+        topic (str): Topic as written by a subscriber
+
+    Returns:
+        str: Lowercase topic with collapsed whitespace
+    """
+    return " ".join(topic.lower().split())
+
+
+def load_subscribers(path=SUBSCRIBERS_PATH):
+    """
+    Load the subscriber table
+
+    The file is a JSON list of objects:
+        {"name": "alice", "topics": [...], "recipients": [...], "schedule": "daily 07:00"}
+
+    Args:
+        path (str): JSON file with the subscriber table
+
+    Returns:
+        list: Subscriber dictionaries
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        subscribers = json.load(f)
+
+    names = set()
+    for subscriber in subscribers:
+        for field in ("name", "topics", "recipients"):
+            if not subscriber.get(field):
+                raise ValueError(f"Subscriber entry is missing '{field}': {subscriber}")
+        if subscriber["name"] in names:
+            raise ValueError(f"Duplicate subscriber name '{subscriber['name']}'")
+        names.add(subscriber["name"])
+        if isinstance(subscriber["recipients"], str):
+            subscriber["recipients"] = [subscriber["recipients"]]
+        subscriber.setdefault("schedule", "daily 00:00")
+        parse_schedule(subscriber["schedule"])  # Fail early on typos
+    return subscribers
+
+
+def parse_schedule(schedule):
+    """
+    Parse a schedule string
+
+    Supported forms: "hourly", "daily HH:MM" and "mon,wed,fri HH:MM".
+
+    Args:
+        schedule (str): Schedule as written in the subscriber table
+
+    Returns:
+        tuple: (set of weekday numbers or None for hourly, hour, minute)
+    """
+    parts = schedule.lower().split()
+    if parts == ["hourly"]:
+        return None, 0, 0
+    if len(parts) != 2:
+        raise ValueError(f"Invalid schedule '{schedule}'")
+
+    days, clock = parts
+    if days == "daily":
+        weekdays = set(range(7))
+    else:
+        try:
+            weekdays = {_WEEKDAYS.index(day) for day in days.split(",")}
+        except ValueError:
+            raise ValueError(f"Invalid weekday in schedule '{schedule}'") from None
+    try:
+        hour, minute = (int(value) for value in clock.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid time in schedule '{schedule}'") from None
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time in schedule '{schedule}'")
+    return weekdays, hour, minute
+
+
+def last_slot(schedule, now):
+    """
+    Most recent scheduled time at or before `now`
+
+    Args:
+        schedule (str): Schedule string (see parse_schedule)
+        now (datetime): Current local time
+
+    Returns:
+        datetime: Start of the latest slot
+    """
+    weekdays, hour, minute = parse_schedule(schedule)
+    if weekdays is None:
+        return now.replace(minute=0, second=0, microsecond=0)
+    for days_back in range(8):
+        slot = (now - timedelta(days=days_back)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if slot <= now and slot.weekday() in weekdays:
+            return slot
+    raise ValueError(f"Schedule '{schedule}' never fires")
+
+
+class SubscriberState:
+    """
+    JSON-backed record of when each subscriber last received a digest
+
+    A subscriber is due when a scheduled slot has passed since their last
+    delivery, so running this module every few minutes (or hourly from
+    Task Scheduler) sends each digest once per slot.
+    """
+
+    def __init__(self, path=SUBSCRIBER_STATE_PATH):
+        """
+        Args:
+            path (str): JSON file holding subscriber name -> last delivery (ISO 8601)
+        """
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._last_run = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._last_run = {}
+
+    def is_due(self, subscriber, now):
+        """Return True if the subscriber's latest slot has not been delivered yet"""
+        last_run = self._last_run.get(subscriber["name"])
+        if last_run is None:
+            return True
+        return datetime.fromisoformat(last_run) < last_slot(subscriber["schedule"], now)
+
+    def record(self, name, when):
+        """Remember that `name` received a digest at `when`"""
+        self._last_run[name] = when.isoformat(timespec="seconds")
+
+    def save(self):
+        """Write the state to disk atomically"""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._last_run, f, indent=2)
+        os.replace(temp_path, self.path)
+
+
+def build_fetch_plan(subscribers):
+    """
+    Merge every subscriber's topics into one list of unique queries
+
+    Args:
+        subscribers (list): Subscriber dictionaries
+
+    Returns:
+        dict: normalized topic -> topic string to query (first spelling seen)
+    """
+    plan = {}
+    for subscriber in subscribers:
+        for topic in subscriber["topics"]:
+            plan.setdefault(normalize_topic(topic), topic)
+    return plan
+
+
+def fetch_candidates(plan, api_key, max_articles=ARTICLES_PER_TOPIC, max_workers=MAX_CONCURRENT_FETCHES):
+    """
+    Fetch every planned topic once (combined into OR-queries), keeping all candidates per topic
+
+    Args:
+        plan (dict): Value returned by build_fetch_plan
+        api_key (str): Your NewsAPI key
+        max_articles (int): Articles fetched per topic
+        max_workers (int): Maximum number of requests in flight at once
+
+    Returns:
+        tuple: (dict of normalized topic -> candidate articles best first,
+                dict of topic -> fetch latency in seconds)
+    """
+    session = create_session(pool_size=max_workers)
+    try:
+        results = fetch_topics(list(plan.values()), api_key, max_articles, max_workers, session)
+    finally:
+        session.close()
+
+    candidates = {key: results[topic][0] for key, topic in plan.items()}
+    latencies = {topic: results[topic][1] for topic in plan.values()}
+    return candidates, latencies
+
+
+def select_digest(subscriber, candidates, near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    Pick one unique article per topic for a subscriber, in their topic order
+
+    Args:
+        subscriber (dict): Subscriber dictionary
+        candidates (dict): Value returned by fetch_candidates
+        near_duplicate_threshold (float): Similarity for near-duplicate filtering (0 = off)
+
+    Returns:
+        list: Chosen (unsummarized) articles
+    """
+    seen_urls = set()
+    near_duplicates = NearDuplicateIndex(near_duplicate_threshold) if near_duplicate_threshold else None
+    digest = []
+    for topic in subscriber["topics"]:
+        article = select_unique_article(candidates.get(normalize_topic(topic), []), seen_urls, near_duplicates)
+        if article is not None:
+            digest.append(article)
+    return digest
+
+
+def run_multi_tenant(subscribers, state=None, now=None, cache=None, subject=None):
+    """
+    Build and send the digests of every subscriber that is due
+
+    Topics are fetched once across all subscribers, every distinct article
+    is summarized once (and rendered to HTML once), and only the final
+    selection and delivery happen per subscriber. Cost therefore grows with
+    the number of unique topics and articles, not with subscribers.
+
+    Args:
+        subscribers (list): Subscriber dictionaries (see load_subscribers)
+        state (SubscriberState): Optional delivery state; every subscriber is due without one
+        now (datetime): Current time (defaults to datetime.now())
+        cache (SummaryCache): Optional summary cache
+        subject (str): Email subject line (defaults to the dated digest subject)
+
+    Returns:
+        dict: Run summary with keys due, topics, unique_articles, summarized,
+              latencies and deliveries (subscriber name -> delivery report)
+    """
+    deadline = summary_deadline()
+    now = now or datetime.now()
+    subject = subject or f"📰 Your Daily News Digest - {now.strftime('%B %d, %Y')}"
+    due = [s for s in subscribers if state is None or state.is_due(s, now)]
+    result = {"due": [s["name"] for s in due], "topics": 0, "unique_articles": 0,
+              "summarized": 0, "latencies": {}, "deliveries": {}}
+    if not due:
+        return result
+
+    # Shared work: one fetch per unique topic
+    plan = build_fetch_plan(due)
+    candidates, result["latencies"] = fetch_candidates(plan, NEWS_API_KEY)
+    result["topics"] = len(plan)
+
+    # Per-subscriber selection, then summarize the union once
+    digests = {s["name"]: select_digest(s, candidates) for s in due}
+    unique = {}
+    for digest in digests.values():
+        for article in digest:
+            unique.setdefault(article["url"], article)
+    result["unique_articles"] = len(unique)
+
+    summarized = summarize_all_articles(
+        list(unique.values()), OPENAI_API_KEY, OPENAI_MODEL, MAX_SUMMARY_TOKENS, cache=cache, deadline=deadline
+    ) if unique else []
+    result["summarized"] = sum(1 for a in summarized if "summary_fallback" not in a)
+    by_url = {article["url"]: article for article in summarized}
+    rendered = {url: render_article_html(article) for url, article in by_url.items()}
+
+    # Fan out: each digest reuses the shared summaries and HTML blocks
+    pool = SMTPConnectionPool(SENDER_EMAIL, SENDER_PASSWORD, size=SMTP_POOL_SIZE)
+    try:
+        for subscriber in due:
+            articles = [by_url[article["url"]] for article in digests[subscriber["name"]]]
+            if not articles:
+                print(f"  ⚠ {subscriber['name']}: no articles for their topics, skipping")
+                continue
+            template = NewsletterTemplate(articles, [rendered[article["url"]] for article in articles])
+            report = send_bulk_email(
+                subject,
+                template.render,
+                SENDER_EMAIL,
+                SENDER_PASSWORD,
+                subscriber["recipients"],
+                pool_size=SMTP_POOL_SIZE,
+                messages_per_minute=SMTP_MESSAGES_PER_MINUTE,
+                pool=pool
+            )
+            result["deliveries"][subscriber["name"]] = report
+            if state is not None and any(r["ok"] for r in report.values()):
+                state.record(subscriber["name"], now)
+    finally:
+        pool.close()
+        if state is not None:
+            state.save()
+
+    return result
+
+
+def main():
+    """
+    Send every due subscriber digest from the subscriber table
+    """
+
+    print("=" * 60)
+    print("MULTI-TENANT NEWSLETTER")
+    print("=" * 60)
+    print()
+
+    path = sys.argv[1] if len(sys.argv) > 1 else SUBSCRIBERS_PATH
+    try:
+        subscribers = load_subscribers(path)
+    except FileNotFoundError:
+        print(f"⚠️  ERROR: '{path}' not found!")
+        print("Copy 'subscribers.example.json' to 'subscribers.json' and edit it.")
+        return
+    except (ValueError, json.JSONDecodeError) as e:
+        print(f"⚠️  ERROR: invalid subscriber table: {e}")
+        return
+
+    start_time = time.perf_counter()
+    cache = open_summary_cache()
+    try:
+        result = run_multi_tenant(subscribers, SubscriberState(), cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    print(f"Subscribers due: {len(result['due'])} of {len(subscribers)}")
+    print(f"Unique topics fetched: {result['topics']}")
+    print(f"Unique articles summarized: {result['summarized']} of {result['unique_articles']}")
+    for name, report in result["deliveries"].items():
+        delivered = sum(1 for r in report.values() if r["ok"])
+        print(f"  {name}: delivered {delivered} of {len(report)}")
+        for recipient, r in report.items():
+            if not r["ok"]:
+                print(f"    ❌ {recipient}: {r['error']}")
+    print(f"Done in {time.perf_counter() - start_time:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Streaming Newsletter Pipeline
+Runs fetch -> dedup -> summarize -> render as concurrent stages joined by bounded queues
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from fetch_news import create_session, fetch_query, plan_topic_queries, select_unique_article
+from rate_limiter import RateLimiter
+from send_email import NewsletterTemplate, render_article_html
+from summarize_articles import (
+    PROMPT_VERSION,
+    OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_TOKENS_PER_MINUTE,
+    OPENAI_TIMEOUT_SECONDS,
+    ROUTER,
+    reusable_summary,
+    summarize_article,
+    with_summary
+)
+from summary_cache import cache_key
+
+# Marks the end of a stage's output on a queue
+_DONE = object()
+
+
+class StageClock:
+    """
+    Records when each stage handled its first and last item
+
+    All times are seconds since the pipeline started, so the log shows how
+    much the stages overlap.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def tick(self, stage):
+        """Record that `stage` produced one more item"""
+        now = time.perf_counter() - self.started
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"first": now, "last": now, "items": 0})
+            entry["last"] = now
+            entry["items"] += 1
+
+    def finish(self, stage):
+        """Record that `stage` has shut down"""
+        now = time.perf_counter() - self.started
+        with self._lock:
+            self.stages.setdefault(stage, {"first": None, "last": None, "items": 0})["done"] = now
+
+
+def run_streaming_pipeline(topics, news_api_key, openai_api_key, model="gpt-4o-mini",
+                           max_tokens=150, articles_per_topic=1, fetch_workers=5,
+                           summary_workers=4, queue_size=16, cache=None, watermarks=None,
+                           near_duplicates=None, checkpoint=None, deadline=None):
+    """
+    Fetch, summarize and render articles with every stage running at once
+
+    Topic fetches run concurrently. Each finished topic is deduplicated and
+    its article is handed straight to the summarizer workers, and each
+    summary is rendered to HTML as soon as it arrives. Topics are released
+    to dedup in their configured order (a topic waits only for the topics
+    listed before it), so the chosen articles are the same as the staged
+    pipeline would pick.
+
+    Args:
+        topics (list): Topics to fetch, in priority order
+        news_api_key (str): Your NewsAPI key
+        openai_api_key (str): OpenAI API key
+        model (str): OpenAI model to use
+        max_tokens (int): Maximum tokens per summary
+        articles_per_topic (int): Articles to request per topic
+        fetch_workers (int): Maximum NewsAPI requests in flight
+        summary_workers (int): Number of summaries generated in parallel
+        queue_size (int): Capacity of the queues between stages
+        cache (SummaryCache): Optional summary cache
+        watermarks (WatermarkStore): Optional per-topic watermarks
+        near_duplicates (NearDuplicateIndex): Optional near-duplicate story filter
+        checkpoint (RunCheckpoint): Optional run checkpoint; summaries are saved as they
+                                    arrive and reused when the run is resumed
+        deadline (float): Optional time.monotonic() deadline for the summaries
+                          (see summarize_articles.summary_deadline)
+
+    Returns:
+        dict: {
+            "fetched": articles chosen by dedup (in topic order),
+            "articles": the same articles with summaries,
+            "template": compiled NewsletterTemplate (None if no articles),
+            "stages": StageClock.stages timing data,
+            "latencies": topic -> fetch latency in seconds
+        }
+    """
+
+    summary_workers = max(1, summary_workers)
+    clock = StageClock()
+    summary_queue = queue.Queue(maxsize=queue_size)
+    render_queue = queue.Queue(maxsize=queue_size)
+    fetched = []
+    latencies = {}
+    errors = []
+
+    from openai import OpenAI
+    
+    client = OpenAI(api_key=openai_api_key, max_retries=0, timeout=OPENAI_TIMEOUT_SECONDS)
+    limiter = RateLimiter(OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE)
+
+    def fetch_and_dedup():
+        # Stage 1 + 2: concurrent fetches, released to dedup in topic order
+        session = create_session(pool_size=fetch_workers)
+        seen_urls = set()
+        ready = {}
+        next_topic = 0
+        try:
+            positions = {}
+            for position, topic in enumerate(topics):
+                positions.setdefault(topic, []).append(position)
+            with ThreadPoolExecutor(max_workers=max(1, fetch_workers)) as executor:
+                futures = [
+                    executor.submit(fetch_query, query, news_api_key, articles_per_topic, session, watermarks)
+                    for query in plan_topic_queries(topics, watermarks)
+                ]
+                for future in as_completed(futures):
+                    for topic, result in future.result().items():
+                        for position in positions[topic]:
+                            ready[position] = result
+                        clock.tick("fetch")
+
+                    while next_topic in ready:
+                        articles, latency = ready.pop(next_topic)
+                        latencies[topics[next_topic]] = latency
+                        next_topic += 1
+                        article = select_unique_article(articles, seen_urls, near_duplicates)
+                        if article is not None:
+                            summary_queue.put((len(fetched), article))
+                            fetched.append(article)
+                            clock.tick("dedup")
+            if checkpoint is not None:
+                checkpoint.save_fetched(fetched)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+            clock.finish("fetch")
+            clock.finish("dedup")
+            for _ in range(summary_workers):
+                summary_queue.put(_DONE)
+
+    def summarize_worker():
+        # Stage 3: summaries, reusing the checkpoint and cache when possible. Errors are
+        # recorded but the worker keeps draining so upstream never blocks.
+        while True:
+            item = summary_queue.get()
+            if item is _DONE:
+                break
+            try:
+                position, article = item
+                summary = checkpoint.load_summary(article) if checkpoint is not None else None
+                if summary is None:
+                    summary = ROUTER.local_summary(article)
+                key = None
+                if summary is None and cache is not None:
+                    key = cache_key(article, model, max_tokens, PROMPT_VERSION)
+                    summary = cache.get(key)
+                if summary is None:
+                    summary = summarize_article(client, article, model, max_tokens, limiter, deadline)
+                    if reusable_summary(summary):
+                        if cache is not None:
+                            cache.put(key, summary)
+                        if checkpoint is not None:
+                            checkpoint.save_summary(article, summary)
+
+                render_queue.put((position, with_summary(article, summary)))
+                clock.tick("summarize")
+            except Exception as e:
+                errors.append(e)
+        render_queue.put(_DONE)
+
+    threads = [threading.Thread(target=fetch_and_dedup, name="pipeline-fetch")]
+    threads += [threading.Thread(target=summarize_worker, name=f"pipeline-summarize-{i}")
+                for i in range(summary_workers)]
+    for thread in threads:
+        thread.start()
+
+    # Stage 4: render each article as soon as its summary arrives
+    summarized = {}
+    fragments = {}
+    finished_workers = 0
+    while finished_workers < summary_workers:
+        item = render_queue.get()
+        if item is _DONE:
+            finished_workers += 1
+            continue
+        position, article = item
+        summarized[position] = article
+        fragments[position] = render_article_html(article)
+        clock.tick("render")
+
+    for thread in threads:
+        thread.join()
+    clock.finish("summarize")
+
+    if errors:
+        raise errors[0]
+
+    order = sorted(summarized)
+    articles = [summarized[position] for position in order]
+    template = NewsletterTemplate(articles, [fragments[position] for position in order]) if articles else None
+    clock.finish("render")
+
+    return {
+        "fetched": fetched,
+        "articles": articles,
+        "template": template,
+        "stages": clock.stages,
+        "latencies": latencies
+    }
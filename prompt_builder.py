@@ -0,0 +1,235 @@
+"""
+Prompt Builder
+Counts prompt tokens and trims article text to a fixed input budget before it is sent to OpenAI
+"""
+
+import re
+import threading
+from functools import lru_cache
+
+from metrics import METRICS
+from relevance import tokenize
+
+# NewsAPI truncates `content` and appends a marker such as "[+2140 chars]"
+_TRUNCATION_MARKER = re.compile(r"\s*\[\+\d+ chars\]\s*$")
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+(?=[\"'(\[]?[A-Z0-9])")
+
+STRATEGIES = ("lead", "extractive")
+
+
+@lru_cache(maxsize=None)
+def _encoding_for(model):
+    """tiktoken encoding for a model, or None if tiktoken is not installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text, model="gpt-4o-mini"):
+    """
+    Count the tokens `text` uses for `model`
+
+    Uses tiktoken when it is installed; otherwise falls back to the usual
+    estimate of about four characters per token.
+
+    Args:
+        text (str): Text to count
+        model (str): OpenAI model the text is for
+
+    Returns:
+        int: Number of tokens
+    """
+    if not text:
+        return 0
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_sentences(text):
+    """
+    Split text into sentences
+
+    Args:
+        text (str): Article text
+
+    Returns:
+        list: Sentences (stripped, in original order)
+    """
+    text = _TRUNCATION_MARKER.sub("", text or "").strip()
+    if not text:
+        return []
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+def _clip(sentence, budget, model):
+    """Cut one sentence down to roughly `budget` tokens on a word boundary"""
+    words = sentence.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:middle]) + " …", model) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low]) + " …" if low else ""
+
+
+def select_lead(sentences, budget, model="gpt-4o-mini"):
+    """
+    Keep sentences from the start of the article until the budget is used
+
+    Returns:
+        list: Selected sentences in original order
+    """
+    selected = []
+    used = 0
+    for sentence in sentences:
+        tokens = count_tokens(sentence, model) + 1
+        if used + tokens > budget:
+            if not selected:
+                clipped = _clip(sentence, budget, model)
+                if clipped:
+                    selected.append(clipped)
+            break
+        selected.append(sentence)
+        used += tokens
+    return selected
+
+
+def select_extractive(sentences, budget, query_text="", model="gpt-4o-mini"):
+    """
+    Keep the most informative sentences that fit in the budget
+
+    Sentences are scored by how central their words are to the article
+    (the share of sentences each word appears in) plus how many words of
+    `query_text` (usually the title and description) they cover, with a
+    bonus for appearing early. The best ones are chosen greedily and
+    returned in their original order so the text still reads naturally.
+
+    Args:
+        sentences (list): Sentences of the article
+        budget (int): Token budget for the selected text
+        query_text (str): Text whose words make a sentence more important
+        model (str): OpenAI model used for token counting
+
+    Returns:
+        list: Selected sentences in original order
+    """
+    # Words of three letters or fewer are mostly stop words
+    tokenized = [{token for token in tokenize(sentence) if len(token) > 3} for sentence in sentences]
+    frequency = {}
+    for tokens in tokenized:
+        for token in tokens:
+            frequency[token] = frequency.get(token, 0) + 1
+    query = {token for token in tokenize(query_text) if len(token) > 3}
+
+    scores = []
+    for position, tokens in enumerate(tokenized):
+        centrality = sum(frequency[token] for token in tokens) / (len(tokens) * len(sentences)) if tokens else 0.0
+        coverage = len(tokens & query) / len(query) if query else 0.0
+        score = (centrality + 2.0 * coverage) * (1.0 + 0.5 / (position + 1))  # News puts key facts first
+        scores.append(score)
+
+    chosen = []
+    used = 0
+    for index in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        tokens = count_tokens(sentences[index], model) + 1
+        if used + tokens <= budget:
+            chosen.append(index)
+            used += tokens
+    if not chosen:
+        return select_lead(sentences, budget, model)
+    return [sentences[index] for index in sorted(chosen)]
+
+
+class PromptBuilder:
+    """
+    Trims article content so summarization prompts stay within an input token budget
+
+    Only the article `content` is trimmed; the title and description are
+    always kept. The builder keeps running totals of tokens before and
+    after trimming so a run can report how many prompt tokens it saved.
+    """
+
+    def __init__(self, model="gpt-4o-mini", content_budget=0, strategy="lead"):
+        """
+        Args:
+            model (str): OpenAI model (selects the tokenizer)
+            content_budget (int): Maximum tokens of article content per prompt (0 = no limit)
+            strategy (str): "lead" (keep the opening sentences) or "extractive"
+                            (keep the highest scoring sentences)
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown truncation strategy '{strategy}' (expected one of {', '.join(STRATEGIES)})")
+        self.model = model
+        self.content_budget = content_budget
+        self.strategy = strategy
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.trimmed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def tokens_saved(self):
+        return self.tokens_before - self.tokens_after
+
+    @property
+    def version(self):
+        """Short description of the trimming settings (part of the summary cache key)"""
+        if not self.content_budget:
+            return "full"
+        return f"{self.strategy}-{self.content_budget}"
+
+    def trim_content(self, article, record=True):
+        """
+        Return the article content cut down to the content budget
+
+        Args:
+            article (dict): Article dictionary with title, description and content
+            record (bool): Add the token counts to the running totals
+
+        Returns:
+            str: Content that fits in the budget (unchanged if it already does)
+        """
+        content = article.get("content") or ""
+        if not self.content_budget:
+            return content
+
+        before = count_tokens(content, self.model)
+        if before <= self.content_budget:
+            trimmed = content
+        else:
+            sentences = split_sentences(content)
+            if self.strategy == "extractive":
+                query = f"{article.get('title') or ''} {article.get('description') or ''}"
+                selected = select_extractive(sentences, self.content_budget, query, self.model)
+            else:
+                selected = select_lead(sentences, self.content_budget, self.model)
+            trimmed = " ".join(selected)
+
+        after = count_tokens(trimmed, self.model) if trimmed is not content else before
+        if not record:
+            return trimmed
+        with self._lock:
+            self.tokens_before += before
+            self.tokens_after += after
+            if after < before:
+                self.trimmed += 1
+        if after < before:
+            METRICS.increment("prompt_tokens_saved_total", before - after)
+        return trimmed
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: (tokens before trimming, tokens after trimming, articles trimmed) so far
+        """
+        with self._lock:
+            return self.tokens_before, self.tokens_after, self.trimmed
@@ -0,0 +1,207 @@
+"""
+NewsAPI Query Planner
+Packs topics into OR-queries so one NewsAPI request serves several topics,
+and routes the combined results back to the topics they belong to
+"""
+
+from dataclasses import dataclass, field
+from urllib.parse import quote_plus
+
+from relevance import FIELD_WEIGHTS, RelevanceScorer, tokenize
+
+# NewsAPI rejects a `q` longer than this (measured URL-encoded)
+MAX_QUERY_LENGTH = 500
+
+# Largest pageSize NewsAPI accepts
+MAX_PAGE_SIZE = 100
+
+
+def topic_clause(topic):
+    """
+    Turn a topic into a clause of an OR-query
+
+    Multi-word topics are wrapped in parentheses so "artificial
+    intelligence OR space" keeps meaning the same as the two topics
+    queried on their own.
+
+    Args:
+        topic (str): Topic/keyword as written in config.py
+
+    Returns:
+        str: Query clause
+    """
+    topic = " ".join(topic.split())
+    return topic if " " not in topic else f"({topic})"
+
+
+@dataclass(slots=True)
+class TopicQuery:
+    """One NewsAPI query and the topics it serves"""
+    topics: list
+    since: dict = field(default_factory=dict)  # topic -> watermark (ISO 8601) or None
+
+    @property
+    def q(self):
+        """The `q` parameter (a single topic is sent exactly as written)"""
+        if len(self.topics) == 1:
+            return self.topics[0]
+        return " OR ".join(topic_clause(topic) for topic in self.topics)
+
+    @property
+    def earliest(self):
+        """The `from` parameter: the oldest watermark, or None if any topic has none"""
+        watermarks = [self.since.get(topic) for topic in self.topics]
+        return None if not watermarks or None in watermarks else min(watermarks)
+
+
+def plan_queries(topics, since=None, max_topics=10, max_query_length=MAX_QUERY_LENGTH):
+    """
+    Pack topics into as few OR-queries as the limits allow
+
+    Topics are packed greedily in their given order, so a topic list in
+    priority order keeps its high-priority topics together. A repeated
+    topic is only queried once.
+
+    Args:
+        topics (list): Topics to fetch
+        since (callable): Optional function topic -> watermark (e.g. WatermarkStore.since)
+        max_topics (int): Most topics in one query (1 = one query per topic)
+        max_query_length (int): Longest URL-encoded `q` allowed
+
+    Returns:
+        list: TopicQuery objects covering every topic once
+    """
+    queries = []
+    current = None
+    for topic in dict.fromkeys(topics):
+        watermark = since(topic) if since is not None else None
+        if current is not None and len(current.topics) < max_topics:
+            candidate = TopicQuery(current.topics + [topic])
+            if len(quote_plus(candidate.q)) <= max_query_length:
+                current.topics.append(topic)
+                current.since[topic] = watermark
+                continue
+        current = TopicQuery([topic], {topic: watermark})
+        queries.append(current)
+    return queries
+
+
+class PagedQuery:
+    """
+    Collects the pages of one planned query and splits them by topic
+
+    Every article goes to each topic it scores above 0 for with the
+    relevance scorer, or with embedding similarity when an EmbeddingScorer
+    is given, so an article mentioning two topics is kept for both (a
+    query for either topic alone would return it); articles that match no
+    topic are dropped. With keyword scoring, a topic also needs all of its
+    words in the article, as its own query would, so "climate policy" does
+    not take every "climate" story; an article that has all the words of
+    no topic (they may be in the part of the content NewsAPI cuts off)
+    goes to every topic it scored for. The caller dedups across topics
+    afterwards, as it does for separate queries. Articles older than a topic's own watermark
+    are dropped too, because the query asks from the oldest watermark in
+    the group.
+
+    Each topic keeps its `max_articles` newest articles. Further pages are
+    requested while some topic is short of that, up to `max_pages`, and
+    topics still short after that are left to queries of their own (see
+    starved_topics).
+    """
+
+    def __init__(self, query, max_articles=1, page_size=MAX_PAGE_SIZE, max_pages=3, weighting="binary",
+                 scorer=None):
+        """
+        Args:
+            query (TopicQuery): Planned query
+            max_articles (int): Articles wanted per topic
+            page_size (int): Articles requested per page
+            max_pages (int): Most pages requested for the query
+            weighting (str): RelevanceScorer weighting used for routing
+            scorer: Optional scorer for query.topics with RelevanceScorer's score_matrix
+                    (e.g. embeddings.EmbeddingScorer); its scores are used as they are
+        """
+        self.query = query
+        self.max_articles = max_articles
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        self.max_pages = max(1, max_pages)
+        self.page = 1
+        self.complete = False  # True once every matching article has been received
+        self.failed = False
+        if scorer is not None:
+            self._scorer = scorer
+            self._words = None
+        else:
+            self._scorer = RelevanceScorer(query.topics, weighting)
+            self._words = [set(tokenize(topic)) for topic in query.topics]
+        self._routed = {topic: [] for topic in query.topics}
+        self._received = 0
+
+    def add_page(self, data):
+        """
+        Route one response page
+
+        Args:
+            data (dict or None): Decoded NewsAPI response (None if the request failed)
+
+        Returns:
+            bool: True if the next page (self.page) should be requested
+        """
+        if data is None:
+            self.failed = True
+            return False
+
+        articles = data.get("articles", [])
+        self._received += len(articles)
+        if not articles or self._received >= data.get("totalResults", 0):
+            self.complete = True
+
+        for article, row in zip(articles, self._scorer.score_matrix(articles)):
+            for topic in self._matching_topics(article, row):
+                watermark = self.query.since.get(topic)
+                if not (watermark and (article.get("publishedAt") or "") < watermark):
+                    self._routed[topic].append(article)
+
+        if self.complete or self.page >= self.max_pages or not self.short_topics():
+            return False
+        self.page += 1
+        return True
+
+    def _matching_topics(self, article, row):
+        """
+        Returns:
+            list: Topics a query of their own would return the article for
+        """
+        matched = [column for column, score in enumerate(row) if score > 0]
+        if self._words is not None and len(matched) > 1:
+            words = set(tokenize(" ".join(str(article.get(field) or "") for field in FIELD_WEIGHTS)))
+            matched = [column for column in matched if self._words[column] <= words] or matched
+        return [self.query.topics[column] for column in matched]
+
+    def short_topics(self):
+        """
+        Returns:
+            list: Topics with fewer than max_articles articles so far
+        """
+        return [topic for topic in self.query.topics if len(self._routed[topic]) < self.max_articles]
+
+    def starved_topics(self):
+        """
+        Topics short of max_articles although NewsAPI may have more for them
+
+        These are worth a query of their own: either a request failed, or
+        busier topics filled every page the query was allowed.
+
+        Returns:
+            list: Topics to fetch individually
+        """
+        if self.complete and not self.failed:
+            return []
+        return self.short_topics()
+
+    def results(self):
+        """
+        Returns:
+            dict: topic -> its newest NewsAPI articles (raw response format), at most max_articles
+        """
+        return {topic: articles[:self.max_articles] for topic, articles in self._routed.items()}
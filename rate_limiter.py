@@ -0,0 +1,189 @@
+"""
+Rate Limiting Helpers
+Token-bucket pacing for API calls, driven by requests/min and tokens/min limits
+"""
+
+import random
+import re
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket that refills continuously at a fixed per-minute rate
+
+    Callers reserve capacity up front; the bucket may go negative, in which
+    case the caller is told how long to wait before its reservation is valid.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        """
+        Args:
+            per_minute (float): Refill rate in units per minute
+            capacity (float): Burst size (defaults to one minute of budget)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.level = min(self.capacity, self.level + elapsed * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """
+        Take `amount` units from the bucket
+
+        Returns:
+            float: Seconds to wait before the reserved units are available
+        """
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+        if self.level >= 0 or self.rate <= 0:
+            return 0.0
+        return -self.level / self.rate
+
+    def cap(self, remaining, now):
+        """Lower the bucket to what the server says is actually remaining"""
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter combining a request bucket and a token bucket
+
+    The limiter also adapts to the `x-ratelimit-*` headers returned by
+    OpenAI and can be paused for everyone after a 429.
+    """
+
+    def __init__(self, requests_per_minute=500, tokens_per_minute=200000):
+        """
+        Args:
+            requests_per_minute (int): Request budget per minute
+            tokens_per_minute (int): Token budget per minute (prompt + completion)
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=0):
+        """
+        Reserve one request using `tokens` tokens without blocking
+
+        Args:
+            tokens (int): Estimated tokens the request will consume
+
+        Returns:
+            float: Seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            return max(
+                0.0,
+                self.requests.reserve(1, now),
+                self.tokens.reserve(tokens, now),
+                self._paused_until - now
+            )
+
+    def acquire(self, tokens=0):
+        """
+        Block until one request using `tokens` tokens may be sent
+
+        Args:
+            tokens (int): Estimated tokens the request will consume
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold back every caller for `seconds` (used after a 429)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """
+        Adapt pacing to the rate-limit headers of a response
+
+        Args:
+            headers (Mapping): Response headers (case-insensitive mapping)
+        """
+        with self._lock:
+            now = time.monotonic()
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                if remaining is None:
+                    continue
+                try:
+                    remaining = float(remaining)
+                except ValueError:
+                    continue
+                bucket.cap(remaining, now)
+                if remaining <= 0:
+                    reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                    self._paused_until = max(self._paused_until, now + reset)
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value):
+    """
+    Parse an OpenAI reset duration such as "20ms", "1s" or "6m0s"
+
+    Returns:
+        float: Duration in seconds (0.0 if missing or unparseable)
+    """
+    if not value:
+        return 0.0
+    return sum(float(amount) * _DURATION_UNITS[unit]
+               for amount, unit in _DURATION_PART.findall(str(value)))
+
+
+def retry_after_seconds(headers):
+    """
+    Read the server's requested retry delay from response headers
+
+    Returns:
+        float or None: Seconds to wait, or None if the server did not say
+    """
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return None
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0, retry_after=None):
+    """
+    Exponential backoff with full jitter
+
+    Args:
+        attempt (int): Retry number, starting at 1
+        base (float): Delay for the first retry in seconds
+        cap (float): Upper bound for the delay
+        retry_after (float): Minimum delay requested by the server
+
+    Returns:
+        float: Seconds to sleep before retrying
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
@@ -0,0 +1,334 @@
+"""
+Resilience Helpers
+Retries with backoff, circuit breakers and hedged requests shared by the NewsAPI and OpenAI calls
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from metrics import METRICS
+from rate_limiter import backoff_delay, retry_after_seconds
+
+# Status codes worth retrying: the request may well succeed a little later
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised instead of sending a request whose deadline has already passed"""
+
+
+class HedgeCancelled(Exception):
+    """Raised by a hedged copy that stopped because another copy already answered"""
+
+
+def remaining_seconds(deadline):
+    """Seconds left until a time.monotonic() deadline (None if there is no deadline, never negative)"""
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def status_code(error):
+    """HTTP status of the response attached to an exception (None if there is none)"""
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_transient(error, network_errors=(), retry_statuses=RETRY_STATUSES):
+    """
+    Decide whether a failed call is worth retrying
+
+    Args:
+        error (Exception): Exception raised by the call
+        network_errors (tuple): Exception types of the HTTP client meaning
+                                "no answer" (connection errors and timeouts)
+        retry_statuses (Iterable): Status codes worth retrying
+
+    Returns:
+        bool: True for network errors and responses with a retryable status
+    """
+    if isinstance(error, network_errors):
+        return True
+    return status_code(error) in retry_statuses
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while an endpoint is down
+
+    After `failure_threshold` failures in a row the breaker opens and every
+    call is refused for `reset_seconds`. Then one trial call is let through
+    (half-open): if it succeeds the breaker closes, if it fails the breaker
+    opens again. A 429 says nothing about whether the endpoint is up, so it
+    neither counts as a failure nor as a success.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_seconds=30.0):
+        """
+        Args:
+            name (str): Endpoint name (metrics label), e.g. "openai"
+            failure_threshold (int): Consecutive failures that open the breaker (0 = never open)
+            reset_seconds (float): How long the breaker stays open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def _state(self, now):
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if now - self._opened_at >= self.reset_seconds else "open"
+
+    @property
+    def state(self):
+        """ "closed", "open" or "half_open" """
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def allow(self):
+        """
+        Returns:
+            bool: True if a call may be sent now (only one trial call at a time while half-open)
+        """
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed" or (state == "half_open" and not self._trial):
+                self._trial = state == "half_open"
+                return True
+        METRICS.increment("circuit_rejections_total", endpoint=self.name)
+        return False
+
+    def check(self):
+        """
+        Raises:
+            CircuitOpenError: If the breaker refuses the call
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is failing; not calling it for up to "
+                                   f"{self.reset_seconds:.0f}s (circuit breaker open)")
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                print(f"  ✓ {self.name} is answering again, circuit breaker closed")
+            self.failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._trial = False
+            self.failures += 1
+            if self.failure_threshold <= 0:
+                return
+            if self._opened_at is None and self.failures >= self.failure_threshold:
+                METRICS.increment("circuit_opened_total", endpoint=self.name)
+                print(f"  ⚡ {self.name} failed {self.failures} times in a row, circuit breaker open")
+            if self._opened_at is not None or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def record_neutral(self):
+        """End a call whose outcome says nothing about the endpoint's health (e.g. a 429)"""
+        with self._lock:
+            self._trial = False
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """How often and how long to retry one endpoint's transient failures"""
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def delay(self, attempt, error):
+        """
+        Seconds to wait before retry number `attempt` (from 1)
+
+        Exponential backoff with full jitter, but never shorter than the
+        server's Retry-After.
+
+        Returns:
+            float or None: Delay, or None if the call should not be retried
+                           (out of retries, or Retry-After is longer than max_delay)
+        """
+        if attempt > self.max_retries:
+            return None
+        retry_after = retry_after_seconds(getattr(getattr(error, "response", None), "headers", None))
+        if retry_after is not None and retry_after > self.max_delay:
+            return None
+        return backoff_delay(attempt, self.base_delay, self.max_delay, retry_after)
+
+
+def _log_retry(service, error, delay, attempt, policy):
+    status = status_code(error)
+    reason = f"status {status}" if status is not None else type(error).__name__
+    print(f"  ⏳ {service} request failed ({reason}), retrying in {delay:.1f}s "
+          f"(attempt {attempt}/{policy.max_retries})")
+
+
+def _record(breaker, error):
+    """Tell the breaker about a transient failure (a 429 does not count against the endpoint)"""
+    if breaker is None:
+        return
+    if status_code(error) == 429:
+        breaker.record_neutral()
+    else:
+        breaker.record_failure()
+
+
+def call_with_retries(call, service, network_errors=(), retry_statuses=RETRY_STATUSES,
+                      policy=RetryPolicy(), breaker=None, on_rate_limit=None, deadline=None):
+    """
+    Call `call()` until it succeeds, retrying transient failures
+
+    Args:
+        call (callable): Makes one attempt and returns its result
+        service (str): Metrics label, e.g. "newsapi"
+        network_errors (tuple): Client exception types meaning "no answer" (see is_transient)
+        retry_statuses (Iterable): Status codes worth retrying
+        policy (RetryPolicy): Retry count and backoff
+        breaker (CircuitBreaker): Optional breaker checked before every attempt
+        on_rate_limit (callable): Called with the delay after a 429 instead of sleeping,
+                                  e.g. RateLimiter.pause when the next attempt waits on the
+                                  limiter, so every caller sharing it backs off
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        CircuitOpenError: If the breaker refuses an attempt
+        Exception: The last error if it is not transient, the retries ran out or the deadline is too close
+    """
+    attempt = 0
+    while True:
+        if breaker is not None:
+            breaker.check()
+        try:
+            result = call()
+        except Exception as e:
+            if not is_transient(e, network_errors, retry_statuses):
+                if breaker is not None:
+                    breaker.record_neutral()
+                raise
+            _record(breaker, e)
+            attempt += 1
+            delay = policy.delay(attempt, e)
+            if delay is None or (deadline is not None and time.monotonic() + delay >= deadline):
+                raise
+            METRICS.increment("retries_total", service=service)
+            _log_retry(service, e, delay, attempt, policy)
+            if on_rate_limit is not None and status_code(e) == 429:
+                on_rate_limit(delay)
+            else:
+                time.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+
+async def call_with_retries_async(call, service, network_errors=(), retry_statuses=RETRY_STATUSES,
+                                  policy=RetryPolicy(), breaker=None, on_rate_limit=None, deadline=None):
+    """
+    call_with_retries for a coroutine function: `await call()` until it succeeds
+    """
+    attempt = 0
+    while True:
+        if breaker is not None:
+            breaker.check()
+        try:
+            result = await call()
+        except Exception as e:
+            if not is_transient(e, network_errors, retry_statuses):
+                if breaker is not None:
+                    breaker.record_neutral()
+                raise
+            _record(breaker, e)
+            attempt += 1
+            delay = policy.delay(attempt, e)
+            if delay is None or (deadline is not None and time.monotonic() + delay >= deadline):
+                raise
+            METRICS.increment("retries_total", service=service)
+            _log_retry(service, e, delay, attempt, policy)
+            if on_rate_limit is not None and status_code(e) == 429:
+                on_rate_limit(delay)
+            else:
+                await asyncio.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+
+_HEDGE_POOL = None
+_HEDGE_POOL_LOCK = threading.Lock()
+
+
+def _hedge_pool():
+    global _HEDGE_POOL
+    with _HEDGE_POOL_LOCK:
+        if _HEDGE_POOL is None:
+            _HEDGE_POOL = ThreadPoolExecutor(max_workers=64, thread_name_prefix="hedge")
+        return _HEDGE_POOL
+
+
+def hedged(call, delay, service, max_copies=2):
+    """
+    Call `call(cancelled)`, sending a backup copy if the first has not answered within `delay` seconds
+
+    The first copy to succeed wins, and `cancelled` (a threading.Event
+    shared by the copies) is set. A copy that checks it stops instead of
+    finishing in the background, e.g. closes its stream and raises
+    HedgeCancelled without recording metrics; one that does not check it
+    runs to the end and its result is dropped. Either way hedging spends a
+    few extra requests to cut the tail latency.
+
+    Args:
+        call (callable): Makes one request (with its own retries) and returns the result;
+                         takes the `cancelled` event
+        delay (float): Seconds to wait before sending the next copy (0 = no hedging)
+        service (str): Metrics label
+        max_copies (int): Most copies in flight, including the first
+
+    Returns:
+        The result of the first copy that succeeded
+
+    Raises:
+        Exception: The last error if every copy failed
+    """
+    cancelled = threading.Event()
+    if not delay or delay <= 0 or max_copies < 2:
+        return call(cancelled)
+
+    pool = _hedge_pool()
+    first = pool.submit(call, cancelled)
+    running = {first}
+    sent = 1
+    error = None
+    while running:
+        timeout = delay if sent < max_copies else None
+        done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            METRICS.increment("hedged_requests_total", service=service)
+            running.add(pool.submit(call, cancelled))
+            sent += 1
+            continue
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as e:
+                error = e
+                continue
+            cancelled.set()  # Tell the copies still running to stop
+            if future is not first:
+                METRICS.increment("hedge_wins_total", service=service)
+            return result
+    raise error
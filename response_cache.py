@@ -0,0 +1,274 @@
+"""
+NewsAPI Response Cache
+Caches NewsAPI responses by query and keeps count of the daily request quota
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from metrics import METRICS
+
+# Never part of the cache key: the key is the same for everyone sharing the cache
+_SECRET_PARAMS = {"apikey"}
+
+
+def request_key(url, params):
+    """
+    Build the cache key for a GET request
+
+    Parameter names are lower-cased, values have their whitespace collapsed
+    and the API key is left out, so the same query always gets the same key
+    regardless of parameter order or who sends it.
+
+    Args:
+        url (str): Endpoint URL
+        params (dict): Query parameters
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    normalized = sorted(
+        (name.lower(), " ".join(str(value).split()))
+        for name, value in params.items()
+        if name.lower() not in _SECRET_PARAMS and value is not None
+    )
+    material = json.dumps([url, normalized], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of JSON responses with stale-while-revalidate and a daily quota
+
+    A response younger than `ttl_seconds` is fresh and served without a
+    request. Up to `stale_seconds` past that it is stale: it is still
+    served at once, and a background request refreshes it for next time.
+    Older entries are only used as a fallback when a request fails or the
+    quota is nearly used up.
+
+    The quota counter allows `daily_quota - quota_reserve` requests per UTC
+    day (NewsAPI resets its counters daily) and is stored in the same
+    database, so separate runs on the same day share it.
+    """
+
+    def __init__(self, path="newsapi_cache.db", ttl_seconds=900, stale_seconds=3600,
+                 daily_quota=100, quota_reserve=5):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway cache)
+            ttl_seconds (float): How long a response is served without asking NewsAPI
+            stale_seconds (float): How long after that it is served while being refreshed
+            daily_quota (int): Requests the NewsAPI plan allows per day (0 = no limit)
+            quota_reserve (int): Requests kept back for manual runs and retries
+        """
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.daily_quota = daily_quota
+        self.quota_reserve = quota_reserve
+        self.hits = 0
+        self.stale_hits = 0
+        self.fallbacks = 0
+        self.misses = 0
+        self.refused = 0
+        self._lock = threading.Lock()
+        self._revalidating = set()
+        self._executor = None
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE TABLE IF NOT EXISTS quota (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+        self._db.commit()
+
+    # ---------- responses ----------
+
+    def lookup(self, url, params):
+        """
+        Look up a cached response
+
+        Returns:
+            tuple: (payload or None, state) where state is "fresh", "stale",
+                   "expired" (only usable as a fallback) or None (not cached)
+        """
+        key = request_key(url, params)
+        with self._lock:
+            row = self._db.execute("SELECT body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses", "miss")
+            return None, None
+
+        age = time.time() - row[1]
+        if age <= self.ttl_seconds:
+            state = "fresh"
+            self._count("hits", "hit")
+        elif age <= self.ttl_seconds + self.stale_seconds:
+            state = "stale"
+            self._count("stale_hits", "stale")
+        else:
+            state = "expired"
+            self._count("misses", "miss")
+        return json.loads(row[0]), state
+
+    def use_fallback(self):
+        """Record that an expired response was served because the request could not be made"""
+        self._count("fallbacks", "fallback")
+
+    def validators(self, url, params):
+        """
+        Returns:
+            dict: Conditional request headers (If-None-Match / If-Modified-Since) for a cached response
+        """
+        with self._lock:
+            row = self._db.execute("SELECT etag, last_modified FROM responses WHERE key = ?",
+                                   (request_key(url, params),)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def store(self, url, params, payload, headers=None):
+        """
+        Save a response
+
+        Args:
+            url (str): Endpoint URL
+            params (dict): Query parameters
+            payload (dict): Decoded JSON response
+            headers (Mapping): Response headers (ETag and Last-Modified are kept)
+        """
+        headers = headers or {}
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (request_key(url, params), json.dumps(payload, ensure_ascii=False),
+                 headers.get("ETag"), headers.get("Last-Modified"), time.time())
+            )
+            self._db.commit()
+
+    def refresh(self, url, params):
+        """
+        Mark a cached response as fresh again (after a 304 Not Modified)
+
+        Returns:
+            dict or None: The cached payload
+        """
+        key = request_key(url, params)
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            row = self._db.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def revalidate(self, url, params, fetch):
+        """
+        Refresh a stale response in the background
+
+        Only one refresh per query runs at a time; further calls while it
+        is in flight are ignored.
+
+        Args:
+            url (str): Endpoint URL
+            params (dict): Query parameters
+            fetch (callable): Function with no arguments that requests and stores the response
+        """
+        key = request_key(url, params)
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="revalidate")
+
+        def run():
+            try:
+                fetch()
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        self._executor.submit(run)
+
+    # ---------- quota ----------
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def acquire_quota(self):
+        """
+        Count one request against today's quota
+
+        Returns:
+            bool: True if the request may be sent, False if the quota is nearly used up
+        """
+        if not self.daily_quota:
+            return True
+        day = self._today()
+        limit = max(0, self.daily_quota - self.quota_reserve)
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO quota (day, used) VALUES (?, 0)", (day,))
+            # Check and increment in one statement so concurrent runs cannot both take the last request
+            allowed = self._db.execute("UPDATE quota SET used = used + 1 WHERE day = ? AND used < ?",
+                                       (day, limit)).rowcount == 1
+            self._db.commit()
+            if not allowed:
+                self.refused += 1
+        if not allowed:
+            METRICS.increment("quota_refusals_total", service="newsapi")
+        return allowed
+
+    def exhaust_quota(self):
+        """Mark today's quota as used up (NewsAPI answered with a rate-limit error)"""
+        if not self.daily_quota:
+            return
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO quota (day, used) VALUES (?, ?)",
+                             (self._today(), self.daily_quota))
+            self._db.commit()
+
+    def quota_used(self):
+        """
+        Returns:
+            int: Requests counted against today's quota
+        """
+        with self._lock:
+            row = self._db.execute("SELECT used FROM quota WHERE day = ?", (self._today(),)).fetchone()
+        return row[0] if row else 0
+
+    # ---------- stats ----------
+
+    def _count(self, attribute, result):
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+        METRICS.increment("cache_lookups_total", cache="newsapi", result=result)
+
+    @property
+    def requests_saved(self):
+        """Requests this run did not make because a fresh response was cached (stale hits are refreshed)"""
+        return self.hits
+
+    def wait(self):
+        """Wait for background refreshes to finish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def close(self):
+        """Wait for background refreshes, then close the database"""
+        self.wait()
+        with self._lock:
+            self._db.close()
@@ -3,92 +3,89 @@ Part 3: Send Email Newsletter
 This script sends the summarized articles via email
 """
 
-import json
 import smtplib
+from html import escape
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 
+from article_store import ArticleStore
+from metrics import METRICS
+
 # Import configuration from config.py
 try:
-    from config import (
-        SENDER_EMAIL,
-        SENDER_PASSWORD,
-        RECIPIENT_EMAIL,
-        SMTP_SERVER,
-        SMTP_PORT
-    )
+    from settings import load_settings
+    SETTINGS = load_settings(required=("SENDER_EMAIL", "SENDER_PASSWORD", "RECIPIENT_EMAIL",
+                                       "SMTP_SERVER", "SMTP_PORT"))
 except ImportError:
     print("⚠️  ERROR: config.py not found!")
     print("\nPlease make sure config.py has your email settings")
     exit(1)
 
+SENDER_EMAIL = SETTINGS.sender_email
+SENDER_PASSWORD = SETTINGS.sender_password
+RECIPIENT_EMAIL = SETTINGS.recipient_email
+SMTP_SERVER = SETTINGS.smtp_server
+SMTP_PORT = SETTINGS.smtp_port
+SMTP_USE_TLS = SETTINGS.smtp_use_tls
+SMTP_POOL_SIZE = SETTINGS.smtp_pool_size
+SMTP_MESSAGES_PER_MINUTE = SETTINGS.smtp_messages_per_minute
 
-def create_email_html(articles):
-    """
-    Create a nicely formatted HTML email from articles
-    
-    Args:
-        articles (list): List of article dictionaries with summaries
-        
-    Returns:
-        str: HTML formatted email content
-    """
-    
-    # Get current date for the newsletter
-    today = datetime.now().strftime("%B %d, %Y")
-    
-    # Start building HTML
-    html = f"""
+
+# ========== TEMPLATE PARTS ==========
+# Static parts of the newsletter are built once at import time; only the
+# article blocks and per-recipient fields are filled in per newsletter.
+
+EMAIL_HEAD = """
     <html>
     <head>
         <style>
-            body {{
+            body {
                 font-family: Arial, sans-serif;
                 line-height: 1.6;
                 color: #333;
                 max-width: 600px;
                 margin: 0 auto;
                 padding: 20px;
-            }}
-            .header {{
+            }
+            .header {
                 background-color: #2c3e50;
                 color: white;
                 padding: 20px;
                 text-align: center;
                 border-radius: 5px;
-            }}
-            .article {{
+            }
+            .article {
                 background-color: #f8f9fa;
                 padding: 20px;
                 margin: 20px 0;
                 border-left: 4px solid #3498db;
                 border-radius: 5px;
-            }}
-            .topic {{
+            }
+            .topic {
                 color: #3498db;
                 font-size: 12px;
                 font-weight: bold;
                 text-transform: uppercase;
                 margin-bottom: 10px;
-            }}
-            .title {{
+            }
+            .title {
                 font-size: 18px;
                 font-weight: bold;
                 color: #2c3e50;
                 margin-bottom: 10px;
-            }}
-            .summary {{
+            }
+            .summary {
                 font-size: 14px;
                 color: #555;
                 margin-bottom: 15px;
-            }}
-            .source {{
+            }
+            .source {
                 font-size: 12px;
                 color: #7f8c8d;
                 margin-bottom: 10px;
-            }}
-            .read-more {{
+            }
+            .read-more {
                 display: inline-block;
                 padding: 8px 15px;
                 background-color: #3498db;
@@ -96,50 +93,171 @@ def create_email_html(articles):
                 text-decoration: none;
                 border-radius: 3px;
                 font-size: 14px;
-            }}
-            .read-more:hover {{
+            }
+            .read-more:hover {
                 background-color: #2980b9;
-            }}
-            .footer {{
+            }
+            .footer {
                 text-align: center;
                 margin-top: 30px;
                 padding-top: 20px;
                 border-top: 1px solid #ddd;
                 color: #7f8c8d;
                 font-size: 12px;
-            }}
+            }
         </style>
     </head>
     <body>
+"""
+
+EMAIL_HEADER_TEMPLATE = """
         <div class="header">
             <h1>📰 Your Daily News Digest</h1>
             <p>{today}</p>
         </div>
     """
-    
-    # Add each article
-    for i, article in enumerate(articles, 1):
-        html += f"""
+
+ARTICLE_TEMPLATE = """
         <div class="article">
-            <div class="topic">{article['topic']}</div>
-            <div class="title">{article['title']}</div>
-            <div class="source">Source: {article['source']}</div>
-            <div class="summary">{article['summary']}</div>
-            <a href="{article['url']}" class="read-more">Read Full Article →</a>
+            <div class="topic">{topic}</div>
+            <div class="title">{title}</div>
+            <div class="source">Source: {source}</div>
+            <div class="summary">{summary}</div>
+            <a href="{url}" class="read-more">Read Full Article →</a>
         </div>
         """
-    
-    # Add footer
-    html += """
+
+EMAIL_FOOTER_TEMPLATE = """
         <div class="footer">
             <p>This newsletter was automatically generated by your AI News Assistant</p>
-            <p>Powered by NewsAPI & OpenAI GPT-4o-mini</p>
+            <p>Powered by NewsAPI &amp; OpenAI GPT-4o-mini</p>{recipient_line}
         </div>
     </body>
     </html>
     """
+
+RECIPIENT_LINE_TEMPLATE = """
+            <p>Sent to {recipient}</p>"""
+
+
+def safe_url(url):
+    """
+    Escape a link target, only allowing http(s) links
     
-    return html
+    Args:
+        url (str): Article URL
+        
+    Returns:
+        str: Attribute-safe URL ("#" for anything that is not http/https)
+    """
+    url = (url or "").strip()
+    if not url.lower().startswith(("http://", "https://")):
+        return "#"
+    return escape(url, quote=True)
+
+
+def render_article_html(article):
+    """
+    Render the HTML block for a single article
+    
+    Args:
+        article (dict): Article dictionary with a summary
+        
+    Returns:
+        str: HTML fragment for the article (all fields escaped)
+    """
+    return ARTICLE_TEMPLATE.format(
+        topic=escape(str(article['topic'])),
+        title=escape(str(article['title'])),
+        source=escape(str(article['source'])),
+        summary=escape(str(article['summary'])),
+        url=safe_url(article['url'])
+    )
+
+
+class NewsletterTemplate:
+    """
+    Newsletter compiled once and rendered cheaply for each recipient
+    
+    The head, header and every article block are rendered and joined a
+    single time; render() only splices the per-recipient footer line
+    between two precomputed strings.
+    """
+    
+    def __init__(self, articles, rendered_articles=None, today=None):
+        """
+        Args:
+            articles (list): List of article dictionaries with summaries
+            rendered_articles (list): Optional article fragments already rendered
+                                      with render_article_html (same order as articles)
+            today (str): Date shown in the header (defaults to today)
+        """
+        if today is None:
+            today = datetime.now().strftime("%B %d, %Y")
+        if rendered_articles is None:
+            rendered_articles = [render_article_html(article) for article in articles]
+        
+        footer_before, footer_after = EMAIL_FOOTER_TEMPLATE.split("{recipient_line}")
+        self._before = "".join([
+            EMAIL_HEAD,
+            EMAIL_HEADER_TEMPLATE.format(today=escape(today)),
+            "".join(rendered_articles),
+            footer_before
+        ])
+        self._after = footer_after
+    
+    def render(self, recipient=None):
+        """
+        Produce the full HTML for one recipient
+        
+        Args:
+            recipient (str): Recipient address shown in the footer (None for no line)
+            
+        Returns:
+            str: HTML formatted email content
+        """
+        if recipient is None:
+            return self._before + self._after
+        return "".join([self._before, RECIPIENT_LINE_TEMPLATE.format(recipient=escape(recipient)), self._after])
+
+
+def create_email_html(articles, rendered_articles=None):
+    """
+    Create a nicely formatted HTML email from articles
+    
+    Args:
+        articles (list): List of article dictionaries with summaries
+        rendered_articles (list): Optional article fragments already rendered
+                                  with render_article_html (same order as articles)
+        
+    Returns:
+        str: HTML formatted email content
+    """
+    return NewsletterTemplate(articles, rendered_articles).render()
+
+
+def build_message(subject, html_content, sender_email, recipient_email):
+    """
+    Build the MIME message for one recipient
+    
+    Args:
+        subject (str): Email subject line
+        html_content (str): HTML content of the email
+        sender_email (str): Sender's email address
+        recipient_email (str): Recipient's email address
+        
+    Returns:
+        MIMEMultipart: Message ready to send
+    """
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = sender_email
+    message["To"] = recipient_email
+    
+    # Attach HTML content
+    html_part = MIMEText(html_content, "html")
+    message.attach(html_part)
+    return message
 
 
 def send_email(subject, html_content, sender_email, sender_password, recipient_email):
@@ -159,30 +277,28 @@ def send_email(subject, html_content, sender_email, sender_password, recipient_e
     
     try:
         # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = sender_email
-        message["To"] = recipient_email
-        
-        # Attach HTML content
-        html_part = MIMEText(html_content, "html")
-        message.attach(html_part)
+        message = build_message(subject, html_content, sender_email, recipient_email)
         
         # Connect to Gmail SMTP server
         print(f"Connecting to {SMTP_SERVER}:{SMTP_PORT}...")
         with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()  # Secure the connection
+            if SMTP_USE_TLS:
+                server.starttls()  # Secure the connection
             
             print("Logging in...")
             server.login(sender_email, sender_password)
             
             print(f"Sending email to {recipient_email}...")
-            server.send_message(message)
+            with METRICS.timer("request_seconds", service="smtp"):
+                server.send_message(message)
         
+        METRICS.increment("bytes_sent_total", len(html_content.encode("utf-8")), service="smtp")
+        METRICS.increment("emails_total", result="sent")
         print("✓ Email sent successfully!")
         return True
         
     except smtplib.SMTPAuthenticationError:
+        METRICS.increment("emails_total", result="failed")
         print("❌ ERROR: Authentication failed!")
         print("\nPossible issues:")
         print("1. Wrong email or password")
@@ -192,10 +308,12 @@ def send_email(subject, html_content, sender_email, sender_password, recipient_e
         return False
         
     except smtplib.SMTPException as e:
+        METRICS.increment("emails_total", result="failed")
         print(f"❌ SMTP Error: {e}")
         return False
         
     except Exception as e:
+        METRICS.increment("emails_total", result="failed")
         print(f"❌ Unexpected error: {e}")
         return False
 
@@ -224,49 +342,63 @@ def main():
         print("⚠️  ERROR: Please add recipient email to config.py")
         return
     
-    # Load summarized articles
-    input_file = "summarized_articles.json"
-    
+    # Load the latest batch of summarized articles
+    store = ArticleStore()
     try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            articles = json.load(f)
-    except FileNotFoundError:
-        print(f"⚠️  ERROR: '{input_file}' not found!")
-        print("Please run 'summarize_articles.py' first.")
-        return
-    except json.JSONDecodeError:
-        print(f"⚠️  ERROR: '{input_file}' is not valid JSON")
-        return
+        batch = store.latest_batch()
+        articles = store.load(batch=batch, summarized=True) if batch is not None else []
+    finally:
+        store.close()
     
     if not articles:
-        print("⚠️  No articles found in the file.")
+        print(f"⚠️  ERROR: No summarized articles in '{store.path}'!")
+        print("Please run 'summarize_articles.py' first.")
         return
     
-    print(f"Loaded {len(articles)} articles from '{input_file}'")
+    print(f"Loaded {len(articles)} articles from '{store.path}' (batch {batch})")
     print()
     
     # Create email content
     print("Creating email content...")
     today = datetime.now().strftime("%B %d, %Y")
     subject = f"📰 Your Daily News Digest - {today}"
-    html_content = create_email_html(articles)
+    template = NewsletterTemplate(articles)
     print("✓ Email content created")
     print()
     
     # Send email
-    success = send_email(
-        subject,
-        html_content,
-        SENDER_EMAIL,
-        SENDER_PASSWORD,
-        RECIPIENT_EMAIL
-    )
+    if isinstance(RECIPIENT_EMAIL, (list, tuple)):
+        # Mailing list: pooled SMTP sessions, one message per recipient
+        from bulk_email import send_bulk_email, print_delivery_report
+        recipients = list(RECIPIENT_EMAIL)
+        report = send_bulk_email(
+            subject,
+            template.render,
+            SENDER_EMAIL,
+            SENDER_PASSWORD,
+            recipients,
+            pool_size=SMTP_POOL_SIZE,
+            messages_per_minute=SMTP_MESSAGES_PER_MINUTE
+        )
+        print_delivery_report(report)
+        delivered_to = [recipient for recipient, result in report.items() if result["ok"]]
+        success = bool(delivered_to)
+    else:
+        delivered_to = [RECIPIENT_EMAIL]
+        success = send_email(
+            subject,
+            template.render(RECIPIENT_EMAIL),
+            SENDER_EMAIL,
+            SENDER_PASSWORD,
+            RECIPIENT_EMAIL
+        )
     
     if success:
         print()
         print("=" * 60)
         print("SUCCESS! Check your inbox at:")
-        print(f"  📧 {RECIPIENT_EMAIL}")
+        for recipient in delivered_to:
+            print(f"  📧 {recipient}")
         print("=" * 60)
     else:
         print()
@@ -0,0 +1,145 @@
+"""
+Settings
+Loads config.py once into a typed, read-only settings object shared by every module
+"""
+
+import importlib
+import types
+import typing
+from dataclasses import dataclass, fields
+from functools import lru_cache
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Every setting from config.py, with the default used when config.py does not define it
+
+    Field names are the lower-case versions of the config.py names. The
+    settings without a default (None) are required by the scripts that use
+    them; see load_settings(required=...).
+    """
+    # API keys and email
+    news_api_key: str = None
+    openai_api_key: str = None
+    sender_email: str = None
+    sender_password: str = None
+    recipient_email: str | list | tuple = None
+
+    # Newsletter
+    topics: list | tuple = None
+    articles_per_topic: int = None
+    openai_model: str = None
+    max_summary_tokens: int = None
+
+    # Fetching
+    max_concurrent_fetches: int = 5
+    relevance_weighting: str = "binary"
+    near_duplicate_threshold: float = 0.6
+    watermarks_path: str = ""
+    news_api_url: str = "https://newsapi.org/v2/everything"
+    newsapi_coalesce_topics: bool = False
+    newsapi_topics_per_query: int = 10
+    newsapi_page_size: int = 100
+    newsapi_max_pages: int = 3
+    embedding_backend: str = ""
+    embedding_model: str = ""
+    embedding_cache_path: str = "embeddings.db"
+    embedding_min_similarity: float = 0.0
+    newsapi_cache_path: str = "newsapi_cache.db"
+    newsapi_cache_ttl_minutes: float = 15
+    newsapi_cache_stale_minutes: float = 60
+    newsapi_daily_quota: int = 100
+    newsapi_quota_reserve: int = 5
+    newsapi_timeout_seconds: float = 10
+    newsapi_max_retries: int = 2
+
+    # Summarizing
+    summary_workers: int = 4
+    openai_requests_per_minute: int = 500
+    openai_tokens_per_minute: int = 200000
+    summary_cache_path: str = "summary_cache.db"
+    summary_cache_ttl_hours: float = 48
+    summary_cache_max_entries: int = 5000
+    summary_batch_mode: bool = False
+    summary_batch_token_budget: int = 8000
+    summary_batch_max_articles: int = 20
+    prompt_content_token_budget: int = 1000
+    prompt_truncation: str = "lead"
+    local_summary_max_words: int = 0
+    local_summary_min_relevance: float = None
+    story_cluster_threshold: float = 0.85
+    summary_backend: str = "realtime"
+    batch_poll_seconds: float = 60
+    openai_timeout_seconds: float = 60
+    openai_max_retries: int = 5
+    openai_hedge_after_seconds: float = 0
+    summary_streaming: bool = False
+    summary_deadline_seconds: float = 0
+    summary_run_deadline_seconds: float = 0
+    digest_ready_by: str = ""
+
+    # Resilience
+    circuit_breaker_failures: int = 5
+    circuit_breaker_reset_seconds: float = 30
+
+    # Running
+    engine: str = "threads"
+    pipeline_mode: str = "staged"
+    metrics_report_path: str = "run_report.json"
+    metrics_prometheus_path: str = ""
+    checkpoint_dir: str = "runs"
+    article_store_path: str = "articles.db"
+    subscribers_path: str = "subscribers.json"
+    subscriber_state_path: str = "subscriber_state.json"
+
+    # SMTP
+    smtp_server: str = None
+    smtp_port: int = None
+    smtp_use_tls: bool = True
+    smtp_pool_size: int = 2
+    smtp_messages_per_minute: int = 60
+
+
+def _allowed_types(annotation):
+    """Concrete types a value of `annotation` may have (ints are fine where floats are expected)"""
+    allowed = typing.get_args(annotation) if isinstance(annotation, types.UnionType) else (annotation,)
+    if float in allowed:
+        allowed += (int,)
+    return allowed
+
+
+@lru_cache(maxsize=None)
+def _load(module_name):
+    config = importlib.import_module(module_name)
+    values = {}
+    for field in fields(Settings):
+        value = getattr(config, field.name.upper(), field.default)
+        if value is not None and not isinstance(value, _allowed_types(field.type)):
+            raise TypeError(f"{module_name}.py: {field.name.upper()} should be "
+                            f"{field.type.__name__ if isinstance(field.type, type) else field.type}, "
+                            f"not {type(value).__name__} ({value!r})")
+        values[field.name] = value
+    return Settings(**values)
+
+
+def load_settings(required=(), module_name="config"):
+    """
+    Return the settings from config.py (the module is only read the first time)
+
+    Args:
+        required (iterable): Upper-case config.py names the caller cannot run without
+        module_name (str): Module to read the settings from
+
+    Returns:
+        Settings: Typed settings
+
+    Raises:
+        ImportError: If config.py is missing or lacks a required setting
+        TypeError: If a setting has the wrong type
+    """
+    settings = _load(module_name)
+    missing = [name for name in required if getattr(settings, name.lower()) is None]
+    if missing:
+        raise ImportError(f"{module_name}.py does not define {', '.join(missing)}")
+    return settings
@@ -4,12 +4,32 @@ This script reads fetched articles and generates AI summaries
 """
 
 import json
+import queue
+import threading
 import time
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from article_store import ArticleStore
+from extractive import SummaryRouter, complete_sentences, extractive_summary
+from metrics import METRICS
+from prompt_builder import PromptBuilder
+from rate_limiter import RateLimiter
+from resilience import (
+    CircuitBreaker,
+    DeadlineExceeded,
+    HedgeCancelled,
+    RetryPolicy,
+    call_with_retries,
+    hedged,
+    remaining_seconds
+)
+from summary_cache import SummaryCache, cache_key
 
 # Import configuration from config.py
 try:
-    from config import OPENAI_API_KEY, OPENAI_MODEL, MAX_SUMMARY_TOKENS
+    from settings import load_settings
+    SETTINGS = load_settings(required=("OPENAI_API_KEY", "OPENAI_MODEL", "MAX_SUMMARY_TOKENS"))
 except ImportError:
     print("⚠️  ERROR: config.py not found!")
     print("\nPlease follow these steps:")
@@ -17,19 +37,77 @@ except ImportError:
     print("2. Run this script again")
     exit(1)
 
+OPENAI_API_KEY = SETTINGS.openai_api_key
+OPENAI_MODEL = SETTINGS.openai_model
+MAX_SUMMARY_TOKENS = SETTINGS.max_summary_tokens
+SUMMARY_WORKERS = SETTINGS.summary_workers
+OPENAI_REQUESTS_PER_MINUTE = SETTINGS.openai_requests_per_minute
+OPENAI_TOKENS_PER_MINUTE = SETTINGS.openai_tokens_per_minute
+SUMMARY_CACHE_PATH = SETTINGS.summary_cache_path
+SUMMARY_CACHE_TTL_HOURS = SETTINGS.summary_cache_ttl_hours
+SUMMARY_CACHE_MAX_ENTRIES = SETTINGS.summary_cache_max_entries
+SUMMARY_BATCH_MODE = SETTINGS.summary_batch_mode
+BATCH_TOKEN_BUDGET = SETTINGS.summary_batch_token_budget
+BATCH_MAX_ARTICLES = SETTINGS.summary_batch_max_articles
+PROMPT_CONTENT_TOKEN_BUDGET = SETTINGS.prompt_content_token_budget
+PROMPT_TRUNCATION = SETTINGS.prompt_truncation
+LOCAL_SUMMARY_MAX_WORDS = SETTINGS.local_summary_max_words
+LOCAL_SUMMARY_MIN_RELEVANCE = SETTINGS.local_summary_min_relevance
+EMBEDDING_BACKEND = SETTINGS.embedding_backend
+STORY_CLUSTER_THRESHOLD = SETTINGS.story_cluster_threshold
+OPENAI_TIMEOUT_SECONDS = SETTINGS.openai_timeout_seconds
+OPENAI_MAX_RETRIES = SETTINGS.openai_max_retries
+OPENAI_HEDGE_AFTER_SECONDS = SETTINGS.openai_hedge_after_seconds
+SUMMARY_STREAMING = SETTINGS.summary_streaming
+SUMMARY_DEADLINE_SECONDS = SETTINGS.summary_deadline_seconds
+SUMMARY_RUN_DEADLINE_SECONDS = SETTINGS.summary_run_deadline_seconds
+DIGEST_READY_BY = SETTINGS.digest_ready_by
+
+SYSTEM_PROMPT = "You are a helpful assistant that summarizes news articles concisely and accurately."
+
+# Trims article content to the configured input budget before it goes into a prompt
+PROMPT_BUILDER = PromptBuilder(OPENAI_MODEL, PROMPT_CONTENT_TOKEN_BUDGET, PROMPT_TRUNCATION)
+
+# Sends short and low-relevance articles to the local extractive summarizer instead of OpenAI
+ROUTER = SummaryRouter(LOCAL_SUMMARY_MAX_WORDS, LOCAL_SUMMARY_MIN_RELEVANCE,
+                       weighting=SETTINGS.relevance_weighting)
+
+# Bump whenever SYSTEM_PROMPT or build_prompt() changes so cached summaries are not reused
+PROMPT_VERSION = "1" if PROMPT_BUILDER.version == "full" else f"1-{PROMPT_BUILDER.version}"
+
+# Shared by every OpenAI call in this process (the streaming and asyncio engines too)
+OPENAI_BREAKER = CircuitBreaker("openai", SETTINGS.circuit_breaker_failures, SETTINGS.circuit_breaker_reset_seconds)
+
+ERROR_PREFIX = "Error summarizing article"
+
+# How often a hedged stream waiting for its next chunk checks whether another copy has won
+HEDGE_CANCEL_POLL_SECONDS = 0.05
 
-def summarize_article(client, article, model="gpt-4o-mini", max_tokens=150):
+
+def estimate_tokens(text):
     """
-    Summarize a single article using OpenAI's GPT-4o-mini
+    Rough token count for rate limiting (about 4 characters per token)
+    
+    Args:
+        text (str): Text that will be sent to the model
+        
+    Returns:
+        int: Estimated number of tokens
+    """
+    return len(text) // 4 + 1
+
+
+def build_prompt(article):
+    """
+    Build the user prompt for summarizing one article
+    
+    The content is trimmed to PROMPT_CONTENT_TOKEN_BUDGET tokens first.
     
     Args:
-        client: OpenAI client instance
         article (dict): Article dictionary with title, description, and content
-        model (str): OpenAI model to use
-        max_tokens (int): Maximum length of summary
         
     Returns:
-        str: AI-generated summary or error message
+        str: Prompt text
     """
     
     # Combine article information for summarization
@@ -38,81 +116,832 @@ Title: {article['title']}
 
 Description: {article['description']}
 
-Content: {article['content']}
+Content: {PROMPT_BUILDER.trim_content(article)}
     """.strip()
     
     # Create the prompt for the AI
-    prompt = f"""Please provide a concise, informative summary of this news article in 2-3 sentences. 
+    return f"""Please provide a concise, informative summary of this news article in 2-3 sentences. 
 Focus on the key facts and main points.
 
 {article_text}
 
 Summary:"""
+
+
+def record_usage(raw_response, response, elapsed):
+    """
+    Record latency, bytes and token usage of one chat completion in METRICS
     
-    try:
-        # Call OpenAI API
-        response = client.chat.completions.create(
+    Args:
+        raw_response: Raw API response (for the HTTP body size)
+        response (ChatCompletion): Parsed response (for usage)
+        elapsed (float): Request latency in seconds
+    """
+    METRICS.observe("request_seconds", elapsed, service="openai")
+    http_response = getattr(raw_response, "http_response", None)
+    if http_response is not None:
+        METRICS.increment("bytes_received_total", len(http_response.content), service="openai")
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        METRICS.increment("openai_tokens_total", usage.prompt_tokens or 0, kind="prompt")
+        METRICS.increment("openai_tokens_total", usage.completion_tokens or 0, kind="completion")
+
+
+def log_prompt_savings(tokens_before, tokens_after, trimmed):
+    """
+    Print how many content tokens the prompt budget saved since a PROMPT_BUILDER snapshot
+    
+    Args:
+        tokens_before (int): Snapshot value of PROMPT_BUILDER.tokens_before
+        tokens_after (int): Snapshot value of PROMPT_BUILDER.tokens_after
+        trimmed (int): Snapshot value of PROMPT_BUILDER.trimmed
+    """
+    now_before, now_after, now_trimmed = PROMPT_BUILDER.snapshot()
+    before = now_before - tokens_before
+    saved = before - (now_after - tokens_after)
+    if saved > 0:
+        print(f"Prompt budget: trimmed {now_trimmed - trimmed} articles to {PROMPT_BUILDER.content_budget} "
+              f"content tokens ({PROMPT_BUILDER.strategy}), saved {saved} of {before} tokens ({saved / before:.0%})")
+
+
+def summary_deadline(now=None):
+    """
+    Time by which every summary of a run has to be finished (call it when the run starts)
+    
+    The sooner of SUMMARY_RUN_DEADLINE_SECONDS from now and the next
+    DIGEST_READY_BY ("HH:MM", local time).
+    
+    Args:
+        now (datetime): Current local time (defaults to datetime.now())
+        
+    Returns:
+        float: time.monotonic() deadline, or None if neither setting is used
+        
+    Raises:
+        ValueError: If DIGEST_READY_BY is not "HH:MM"
+    """
+    now = now or datetime.now()
+    remaining = []
+    if SUMMARY_RUN_DEADLINE_SECONDS:
+        remaining.append(SUMMARY_RUN_DEADLINE_SECONDS)
+    if DIGEST_READY_BY:
+        ready_by = datetime.combine(now.date(), datetime.strptime(DIGEST_READY_BY, "%H:%M").time())
+        if ready_by <= now:
+            ready_by += timedelta(days=1)
+        remaining.append((ready_by - now).total_seconds())
+    return time.monotonic() + min(remaining) if remaining else None
+
+
+def article_deadline(run_deadline=None):
+    """
+    Deadline of one summary started now
+    
+    Args:
+        run_deadline (float): Optional deadline of the whole run (see summary_deadline)
+        
+    Returns:
+        float: SUMMARY_DEADLINE_SECONDS from now or `run_deadline`, whichever is
+               sooner (None if neither applies)
+    """
+    deadlines = [run_deadline] if run_deadline is not None else []
+    if SUMMARY_DEADLINE_SECONDS:
+        deadlines.append(time.monotonic() + SUMMARY_DEADLINE_SECONDS)
+    return min(deadlines) if deadlines else None
+
+
+def request_timeout(deadline):
+    """
+    Timeout for one OpenAI request that has to be done by `deadline`
+    
+    Args:
+        deadline (float): time.monotonic() deadline (None = OPENAI_TIMEOUT_SECONDS only)
+        
+    Returns:
+        float: Seconds
+        
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    remaining = remaining_seconds(deadline)
+    if remaining is None:
+        return OPENAI_TIMEOUT_SECONDS
+    if remaining <= 0:
+        raise DeadlineExceeded("deadline passed before the request was sent")
+    return min(OPENAI_TIMEOUT_SECONDS, remaining)
+
+
+def check_cancelled(cancelled):
+    """
+    Raises:
+        resilience.HedgeCancelled: If another hedged copy has already answered
+    """
+    if cancelled is not None and cancelled.is_set():
+        raise HedgeCancelled("another hedged copy answered first")
+
+
+def create_completion(client, messages, model, max_tokens, limiter=None, max_retries=None, deadline=None,
+                      cancelled=None, **options):
+    """
+    Call the chat completions API with rate limiting, retries and the circuit breaker
+    
+    429s, 5xx responses, timeouts and connection errors are retried with
+    exponential backoff, never sooner than the Retry-After the server asks
+    for. While OPENAI_BREAKER is open the call fails at once. With a
+    deadline, every attempt times out by then and no retry starts after it.
+    
+    Args:
+        client: OpenAI client instance
+        messages (list): Chat messages to send
+        model (str): OpenAI model to use
+        max_tokens (int): Maximum completion tokens
+        limiter (RateLimiter): Optional shared rate limiter
+        max_retries (int): How many times to retry a 429, 5xx or network error (None = OPENAI_MAX_RETRIES)
+        deadline (float): Optional time.monotonic() time the call has to be done by
+        cancelled (threading.Event): Optional event set once another hedged copy has
+                                     answered; no request is sent and nothing is
+                                     recorded in METRICS after that
+        **options: Extra arguments for chat.completions.create
+        
+    Returns:
+        ChatCompletion: Parsed API response
+        
+    Raises:
+        openai.OpenAIError: If the call fails for good
+        resilience.CircuitOpenError: If the circuit breaker is open
+        resilience.DeadlineExceeded: If the deadline passed before an attempt was sent
+        resilience.HedgeCancelled: If another hedged copy answered before an attempt was sent
+    """
+    
+    from openai import APIConnectionError
+    
+    estimated_tokens = estimate_tokens("".join(m["content"] for m in messages)) + max_tokens
+    
+    def attempt():
+        request_timeout(deadline)  # No point waiting for the limiter once the deadline has passed
+        if limiter is not None:
+            limiter.acquire(estimated_tokens)
+        check_cancelled(cancelled)
+        
+        started = time.perf_counter()
+        # Raw response so we can read the rate-limit headers
+        raw_response = client.chat.completions.with_raw_response.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.5,  # Balanced between creative and factual
+            timeout=request_timeout(deadline),
+            **options
+        )
+        if limiter is not None:
+            limiter.update_from_headers(raw_response.headers)
+        response = raw_response.parse()
+        check_cancelled(cancelled)  # Only the winning copy is measured
+        record_usage(raw_response, response, time.perf_counter() - started)
+        return response
+    
+    policy = RetryPolicy(OPENAI_MAX_RETRIES if max_retries is None else max_retries)
+    # After a 429 the limiter is paused, so every worker sharing it backs off
+    return call_with_retries(attempt, "openai", (APIConnectionError,), policy=policy, breaker=OPENAI_BREAKER,
+                             on_rate_limit=limiter.pause if limiter is not None else None, deadline=deadline)
+
+
+class CompletionStream:
+    """
+    Text and timing of one streamed chat completion, collected chunk by chunk
+    
+    finish() records the completion's latency, time to first token and
+    tokens per second (after the first token) in METRICS, one observation
+    per article.
+    """
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.parts = []
+        self.usage = None
+        self.finish_reason = None
+    
+    def add(self, chunk):
+        """Take in one ChatCompletionChunk"""
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage  # Last chunk, sent because of include_usage
+        for choice in chunk.choices:
+            if choice.delta.content:
+                if self.first_token_at is None:
+                    self.first_token_at = time.perf_counter()
+                self.parts.append(choice.delta.content)
+            if choice.finish_reason:
+                self.finish_reason = choice.finish_reason
+    
+    def finish(self, stopped=None):
+        """
+        Record the completion in METRICS
+        
+        Args:
+            stopped (str): Why reading stopped before the stream ended
+                           ("deadline" or "error"), None if it ended normally
+            
+        Returns:
+            tuple: (text received, finish reason: "stop", "length", "deadline" or "error")
+        """
+        ended = time.perf_counter()
+        METRICS.observe("request_seconds", ended - self.started, service="openai")
+        if self.first_token_at is not None:
+            METRICS.observe("time_to_first_token_seconds", self.first_token_at - self.started, service="openai")
+        # Without usage (the stream was cut short) each content chunk is about one token
+        tokens = len(self.parts)
+        if self.usage is not None:
+            tokens = self.usage.completion_tokens or tokens
+            METRICS.increment("openai_tokens_total", self.usage.prompt_tokens or 0, kind="prompt")
+        METRICS.increment("openai_tokens_total", tokens, kind="completion")
+        if tokens > 1 and self.first_token_at is not None and ended > self.first_token_at:
+            METRICS.observe("tokens_per_second", (tokens - 1) / (ended - self.first_token_at), service="openai")
+        return "".join(self.parts).strip(), self.finish_reason or stopped or "error"
+
+
+def stream_completion(client, messages, model, max_tokens, limiter=None, deadline=None, max_retries=None,
+                      cancelled=None):
+    """
+    Stream a chat completion, reading until it ends or `deadline` passes
+    
+    Opening the stream is rate limited and retried like create_completion.
+    Reading stops at the deadline even if the stream has stalled between
+    tokens, and the connection is closed as soon as the stream moves again
+    (or its read times out) so OpenAI stops generating. A
+    hedged copy whose `cancelled` event is set stops the same way, without
+    recording anything in METRICS, so only the winning copy is measured.
+    
+    Args:
+        client: OpenAI client instance
+        messages (list): Chat messages to send
+        model (str): OpenAI model to use
+        max_tokens (int): Maximum completion tokens
+        limiter (RateLimiter): Optional shared rate limiter
+        deadline (float): Optional time.monotonic() time to stop reading at
+        max_retries (int): Retries for opening the stream (None = OPENAI_MAX_RETRIES)
+        cancelled (threading.Event): Optional event set once another hedged copy has answered
+        
+    Returns:
+        tuple: (text received, finish reason: "stop", "length", "deadline" or "error")
+        
+    Raises:
+        Exception: Like create_completion, or if the stream broke off before its first token
+        resilience.HedgeCancelled: If another hedged copy answered first
+    """
+    
+    from openai import APIConnectionError
+    
+    estimated_tokens = estimate_tokens("".join(m["content"] for m in messages)) + max_tokens
+    
+    def attempt():
+        request_timeout(deadline)
+        if limiter is not None:
+            limiter.acquire(estimated_tokens)
+        check_cancelled(cancelled)
+        collector = CompletionStream()
+        raw_response = client.chat.completions.with_raw_response.create(
             model=model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that summarizes news articles concisely and accurately."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=messages,
             max_tokens=max_tokens,
-            temperature=0.5  # Balanced between creative and factual
+            temperature=0.5,
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=request_timeout(deadline)
         )
+        if limiter is not None:
+            limiter.update_from_headers(raw_response.headers)
+        return raw_response.parse(), collector
+    
+    policy = RetryPolicy(OPENAI_MAX_RETRIES if max_retries is None else max_retries)
+    stream, collector = call_with_retries(attempt, "openai", (APIConnectionError,), policy=policy,
+                                          breaker=OPENAI_BREAKER,
+                                          on_rate_limit=limiter.pause if limiter is not None else None,
+                                          deadline=deadline)
+    
+    # A reader thread hands over the chunks, so waiting for the next one can stop at the
+    # deadline even while the read itself is stuck on a stalled connection. Once told to
+    # stop, the reader closes the connection itself (closing it from here would not wake
+    # a read blocked on it), which is what tells OpenAI to stop generating
+    chunks = queue.Queue()
+    done = threading.Event()
+    
+    def read():
+        try:
+            for chunk in stream:
+                if done.is_set():
+                    break
+                chunks.put(chunk)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            stream.close()
+        chunks.put(None)
+    
+    threading.Thread(target=read, daemon=True, name="openai-stream").start()
+    stopped = None
+    try:
+        while True:
+            wait = remaining_seconds(deadline)
+            if cancelled is not None:
+                wait = HEDGE_CANCEL_POLL_SECONDS if wait is None else min(wait, HEDGE_CANCEL_POLL_SECONDS)
+            try:
+                chunk = chunks.get(timeout=wait)
+            except queue.Empty:
+                if cancelled is not None and cancelled.is_set():
+                    stopped = "cancelled"
+                    break
+                if remaining_seconds(deadline) == 0:
+                    stopped = "deadline"
+                    break
+                continue
+            if chunk is None:
+                break
+            if isinstance(chunk, Exception):
+                stopped = "deadline" if remaining_seconds(deadline) == 0 else "error"
+                if stopped == "error" and not collector.parts:
+                    raise chunk
+                break
+            collector.add(chunk)
+            if cancelled is not None and cancelled.is_set():
+                stopped = "cancelled"
+                break
+    finally:
+        done.set()
+    if stopped == "cancelled":
+        raise HedgeCancelled("another hedged copy answered first")
+    if stopped == "deadline" and not collector.parts:
+        raise DeadlineExceeded("deadline passed before the first token")
+    return collector.finish(stopped)
+
+
+class PartialSummary(str):
+    """
+    A streamed summary cut short by its deadline or a broken stream
+    
+    It is good enough to send, but it is never cached or checkpointed
+    (see reusable_summary), so a later run without time pressure asks for
+    the whole summary again.
+    """
+    
+    def __new__(cls, text, finish_reason):
+        summary = super().__new__(cls, text)
+        summary.finish_reason = finish_reason
+        return summary
+
+
+def reusable_summary(summary):
+    """
+    Decide whether a summary may go into the summary cache and the run checkpoint
+    
+    Args:
+        summary (str): Summary or error message from summarize_article
+        
+    Returns:
+        bool: False for failed summaries and for PartialSummary
+    """
+    return not summary.startswith(ERROR_PREFIX) and not isinstance(summary, PartialSummary)
+
+
+def streamed_summary(text, finish_reason):
+    """
+    Summary from a streamed completion, trimmed to its last complete sentence if it was cut short
+    
+    Args:
+        text (str): Text received
+        finish_reason (str): Finish reason from CompletionStream.finish
+        
+    Returns:
+        str: Summary; a PartialSummary if the deadline or a stream error cut it short
+             (a summary stopped by max_tokens is trimmed but final)
+        
+    Raises:
+        DeadlineExceeded: If the deadline cut it short before its first sentence was complete
+        RuntimeError: If something else did
+    """
+    if finish_reason == "stop":
+        return text
+    summary = " ".join(complete_sentences(text))
+    if not summary:
+        error = DeadlineExceeded if finish_reason == "deadline" else RuntimeError
+        raise error(f"summary cut short ({finish_reason}) before its first sentence was complete")
+    METRICS.increment("summaries_cut_short_total", reason=finish_reason)
+    print(f"  ✂️  Summary cut short ({finish_reason}); kept {len(summary)} of {len(text)} characters")
+    return summary if finish_reason == "length" else PartialSummary(summary, finish_reason)
+
+
+def summarize_article(client, article, model="gpt-4o-mini", max_tokens=150, limiter=None, deadline=None):
+    """
+    Summarize a single article using OpenAI's GPT-4o-mini
+    
+    With OPENAI_HEDGE_AFTER_SECONDS set, a second identical request is
+    sent if the first has not answered by then, and the faster one is used.
+    
+    The summary has to be done SUMMARY_DEADLINE_SECONDS after it starts,
+    or by the run's `deadline` if that is sooner. With SUMMARY_STREAMING
+    the completion is streamed, and a summary still being written at the
+    deadline is kept up to its last complete sentence.
+    
+    Args:
+        client: OpenAI client instance
+        article (dict): Article dictionary with title, description, and content
+        model (str): OpenAI model to use
+        max_tokens (int): Maximum length of summary
+        limiter (RateLimiter): Optional shared rate limiter
+        deadline (float): Optional time.monotonic() deadline of the whole run (see summary_deadline)
+        
+    Returns:
+        str: AI-generated summary (a PartialSummary if it was cut short), or an
+             error message starting with ERROR_PREFIX (see with_summary)
+    """
+    
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_prompt(article)}
+    ]
+    
+    deadline = article_deadline(deadline)
+    
+    try:
+        if SUMMARY_STREAMING:
+            text, finish_reason = hedged(
+                lambda cancelled: stream_completion(client, messages, model, max_tokens, limiter, deadline,
+                                                    cancelled=cancelled),
+                OPENAI_HEDGE_AFTER_SECONDS, "openai"
+            )
+            return streamed_summary(text, finish_reason)
+        
+        response = hedged(lambda cancelled: create_completion(client, messages, model, max_tokens, limiter,
+                                                              deadline=deadline, cancelled=cancelled),
+                          OPENAI_HEDGE_AFTER_SECONDS, "openai")
         
         # Extract the summary from the response
         summary = response.choices[0].message.content.strip()
         return summary
         
     except Exception as e:
-        error_msg = f"Error summarizing article: {str(e)}"
+        if isinstance(e, DeadlineExceeded) or (deadline is not None and time.monotonic() >= deadline):
+            METRICS.increment("summary_deadline_misses_total")
+        else:
+            METRICS.increment("errors_total", service="openai")
+        error_msg = f"{ERROR_PREFIX}: {str(e)}"
         print(f"  ❌ {error_msg}")
         return error_msg
 
 
-def summarize_all_articles(articles, api_key, model="gpt-4o-mini", max_tokens=150):
+def build_batch_prompt(batch, record=True):
+    """
+    Build one prompt asking for summaries of several articles
+    
+    Args:
+        batch (list): List of (article_id, article) pairs
+        record (bool): Count trimmed tokens in PROMPT_BUILDER's totals
+                       (False when the prompt is only built to be measured)
+        
+    Returns:
+        str: Prompt text requesting a JSON object keyed by article ID
+    """
+    
+    parts = [
+        "Please provide a concise, informative summary of each news article below in 2-3 sentences.",
+        "Focus on the key facts and main points.",
+        'Reply with a JSON object of the form {"summaries": [{"id": "<article id>", "summary": "<summary>"}]} '
+        "containing exactly one entry for every article ID.",
+        ""
+    ]
+    for article_id, article in batch:
+        parts.append(f"""### Article {article_id}
+Title: {article['title']}
+
+Description: {article['description']}
+
+Content: {PROMPT_BUILDER.trim_content(article, record)}
+""")
+    return "\n".join(parts)
+
+
+def plan_batches(articles, indices, max_tokens, token_budget=BATCH_TOKEN_BUDGET, max_batch_size=BATCH_MAX_ARTICLES):
+    """
+    Group articles into batches that fit under a per-request token budget
+    
+    Each article costs its prompt tokens plus `max_tokens` for its summary.
+    Articles are packed greedily in order; an article that is too large on
+    its own still gets a batch of one.
+    
+    Args:
+        articles (list): List of article dictionaries
+        indices (list): Positions in `articles` to batch
+        max_tokens (int): Maximum tokens per summary
+        token_budget (int): Prompt + completion tokens allowed per request
+        max_batch_size (int): Upper bound on articles per request
+        
+    Returns:
+        list: List of batches, each a list of positions in `articles`
+    """
+    
+    overhead = estimate_tokens(SYSTEM_PROMPT + build_batch_prompt([]))
+    batches = []
+    current = []
+    used = overhead
+    
+    for index in indices:
+        cost = estimate_tokens(build_batch_prompt([(index, articles[index])], record=False)) - overhead + max_tokens
+        if current and (used + cost > token_budget or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+            used = overhead
+        current.append(index)
+        used += cost
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+def summarize_batch(client, batch, model="gpt-4o-mini", max_tokens=150, limiter=None, deadline=None):
+    """
+    Summarize several articles in a single chat completion
+    
+    Args:
+        client: OpenAI client instance
+        batch (list): List of (article_id, article) pairs
+        model (str): OpenAI model to use
+        max_tokens (int): Maximum tokens per summary
+        limiter (RateLimiter): Optional shared rate limiter
+        deadline (float): Optional time.monotonic() deadline of the whole run
+        
+    Returns:
+        dict: article_id -> summary for every well-formed entry that came back
+              (missing or malformed entries are simply absent)
+    """
+    
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_batch_prompt(batch)}
+    ]
+    
+    try:
+        response = create_completion(
+            client, messages, model, max_tokens * len(batch) + 50, limiter, deadline=deadline,
+            response_format={"type": "json_object"}
+        )
+        data = json.loads(response.choices[0].message.content)
+    except Exception as e:
+        METRICS.increment("errors_total", service="openai")
+        print(f"  ❌ Batch of {len(batch)} failed, falling back to single calls: {e}")
+        return {}
+    
+    wanted = {str(article_id) for article_id, _ in batch}
+    summaries = {}
+    entries = data.get("summaries") if isinstance(data, dict) else None
+    
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        article_id = str(entry.get("id", ""))
+        summary = entry.get("summary")
+        if article_id in wanted and isinstance(summary, str) and summary.strip():
+            summaries[article_id] = summary.strip()
+    
+    return summaries
+
+
+def _summarize_one(client, articles, index, model, max_tokens, limiter, deadline=None):
+    """Summarize a single article, in the same result shape as a batch"""
+    return [(index, summarize_article(client, articles[index], model, max_tokens, limiter, deadline))]
+
+
+def _summarize_batch_with_fallback(client, articles, indices, model, max_tokens, limiter, deadline=None):
+    """
+    Summarize one batch, then retry any missing article on its own
+    
+    Returns:
+        list: (index, summary) pairs for every position in `indices`
+    """
+    batch_summaries = summarize_batch(
+        client, [(index, articles[index]) for index in indices], model, max_tokens, limiter, deadline
+    )
+    results = []
+    for index in indices:
+        summary = batch_summaries.get(str(index))
+        if summary is None:
+            summary = summarize_article(client, articles[index], model, max_tokens, limiter, deadline)
+        results.append((index, summary))
+    return results
+
+
+def open_summary_cache():
+    """
+    Open the summary cache configured in config.py
+    
+    Returns:
+        SummaryCache: Cache instance (None if SUMMARY_CACHE_PATH is empty)
+    """
+    if not SUMMARY_CACHE_PATH:
+        return None
+    ttl_seconds = SUMMARY_CACHE_TTL_HOURS * 3600 if SUMMARY_CACHE_TTL_HOURS else None
+    return SummaryCache(SUMMARY_CACHE_PATH, ttl_seconds, SUMMARY_CACHE_MAX_ENTRIES)
+
+
+def group_stories(articles, pending):
+    """
+    Cluster the articles that need an OpenAI call by story, so each story is summarized once
+    
+    Only used when EMBEDDING_BACKEND and STORY_CLUSTER_THRESHOLD are set.
+    The first article of each story (in `articles` order) is summarized
+    and the others share its summary.
+    
+    Args:
+        articles (list): All articles being summarized
+        pending (list): Positions of the articles that need an OpenAI call
+        
+    Returns:
+        tuple: (positions to summarize, dict of position -> position whose summary it shares)
+    """
+    if not (EMBEDDING_BACKEND and STORY_CLUSTER_THRESHOLD) or len(pending) < 2:
+        return pending, {}
+    from embeddings import cluster_stories, open_article_embedder
+    
+    embedder = open_article_embedder(EMBEDDING_BACKEND, SETTINGS.embedding_model, OPENAI_API_KEY,
+                                     SETTINGS.embedding_cache_path)
+    labels = cluster_stories(embedder.embed([articles[index] for index in pending]), STORY_CLUSTER_THRESHOLD)
+    representatives = []
+    followers = {}
+    for index, label in zip(pending, labels):
+        if pending[label] == index:
+            representatives.append(index)
+        else:
+            followers[index] = pending[label]
+    return representatives, followers
+
+
+def with_summary(article, summary):
+    """
+    Copy an article with its summary added
+    
+    A failed summary (starting with ERROR_PREFIX) is never sent as error
+    text: the article gets a local extractive summary instead and is
+    marked with 'summary_fallback' (the error), so the newsletter can
+    still go out when OpenAI is down.
+    
+    Args:
+        article (dict): Article dictionary
+        summary (str): Summary or error message from summarize_article
+        
+    Returns:
+        dict: Article with 'summary' (and 'summary_fallback' if the summary failed)
+    """
+    article_with_summary = article.copy()
+    if summary.startswith(ERROR_PREFIX):
+        METRICS.increment("summary_fallbacks_total")
+        article_with_summary['summary'] = extractive_summary(article, ROUTER.max_sentences)
+        article_with_summary['summary_fallback'] = summary[len(ERROR_PREFIX):].lstrip(": ")
+    else:
+        article_with_summary['summary'] = summary
+    return article_with_summary
+
+
+def summarize_all_articles(articles, api_key, model="gpt-4o-mini", max_tokens=150,
+                           max_workers=SUMMARY_WORKERS,
+                           requests_per_minute=OPENAI_REQUESTS_PER_MINUTE,
+                           tokens_per_minute=OPENAI_TOKENS_PER_MINUTE,
+                           cache=None,
+                           batch_mode=SUMMARY_BATCH_MODE,
+                           checkpoint=None,
+                           deadline=None):
     """
-    Summarize multiple articles with rate limiting
+    Summarize multiple articles concurrently with rate limiting
+    
+    A pool of workers shares one token-bucket limiter, so the overall pace
+    stays under the requests/min and tokens/min budgets no matter how many
+    workers run. The returned list is in the same order as `articles`.
+    
+    In batch mode several articles share one request (see plan_batches),
+    and any article missing from a batch reply is summarized on its own.
+    
+    Articles that ROUTER considers short or low-value get a local
+    extractive summary and never reach the API. With embeddings enabled,
+    articles about the same story share one summary (see group_stories).
+    
+    With a checkpoint, every summary is saved the moment it arrives and
+    summaries saved by an earlier attempt of the same run are reused.
+    
+    Articles whose summary failed get a local fallback (see with_summary).
+    So do articles not summarized by `deadline`: once it has passed no
+    more requests are sent, and streamed summaries still being written
+    keep their complete sentences (see summarize_article).
     
     Args:
         articles (list): List of article dictionaries
         api_key (str): OpenAI API key
         model (str): OpenAI model to use
         max_tokens (int): Maximum tokens per summary
+        max_workers (int): Number of summaries generated in parallel
+        requests_per_minute (int): OpenAI request budget
+        tokens_per_minute (int): OpenAI token budget
+        cache (SummaryCache): Optional summary cache; hits skip the API call
+        batch_mode (bool): Pack several articles into each request
+        checkpoint (RunCheckpoint): Optional run checkpoint (see checkpoint.py)
+        deadline (float): Optional time.monotonic() deadline of the whole run (see summary_deadline)
         
     Returns:
         list: Articles with added 'summary' field
     """
     
-    # Initialize OpenAI client
-    client = OpenAI(api_key=api_key)
-    
     print(f"Using model: {model}")
     print(f"Max tokens per summary: {max_tokens}")
+    print(f"Workers: {max_workers} ({requests_per_minute} req/min, {tokens_per_minute} tokens/min)")
+    if SUMMARY_DEADLINE_SECONDS:
+        print(f"Deadline per summary: {SUMMARY_DEADLINE_SECONDS:g}s" + (" (streamed)" if SUMMARY_STREAMING else ""))
+    if deadline is not None:
+        print(f"Run deadline: {remaining_seconds(deadline):.0f}s left for summaries")
     print()
     
-    summarized_articles = []
+    summaries = [None] * len(articles)
+    keys = [None] * len(articles)
+    pending = []
+    tokens_before, tokens_after, trimmed = PROMPT_BUILDER.snapshot()
+    
+    # Summaries from an interrupted attempt first, then local summaries, then the cache
+    resumed = 0
+    avoided = ROUTER.snapshot()
+    for index, article in enumerate(articles):
+        if checkpoint is not None:
+            summaries[index] = checkpoint.load_summary(article)
+            if summaries[index] is not None:
+                resumed += 1
+                continue
+        summaries[index] = ROUTER.local_summary(article)
+        if summaries[index] is not None:
+            continue
+        if cache is not None:
+            keys[index] = cache_key(article, model, max_tokens, PROMPT_VERSION)
+            summaries[index] = cache.get(keys[index])
+        if summaries[index] is None:
+            pending.append(index)
+    
+    avoided = ROUTER.snapshot() - avoided
+    if resumed:
+        print(f"Checkpoint: {resumed} summaries restored from run {checkpoint.run_id}")
+    if avoided:
+        reasons = ", ".join(f"{count} {reason.replace('_', ' ')}" for reason, count in sorted(avoided.items()))
+        print(f"Local summaries: {sum(avoided.values())} OpenAI calls avoided ({reasons})")
+    if cache is not None:
+        print(f"Cache: {len(articles) - len(pending) - sum(avoided.values()) - resumed} of {len(articles)} summaries reused")
+    
+    pending, followers = group_stories(articles, pending)
+    if followers:
+        METRICS.increment("llm_calls_avoided_total", len(followers), reason="same_story")
+        print(f"Story clusters: {len(followers)} articles share a summary with another article about the same story")
     
-    for i, article in enumerate(articles, 1):
-        print(f"[{i}/{len(articles)}] Summarizing: {article['title'][:60]}...")
+    if pending:
+        # Initialize OpenAI client (retries are handled here, not by the SDK)
+        from openai import OpenAI  # Only runs that call the API pay for importing the SDK
         
-        # Generate summary
-        summary = summarize_article(client, article, model, max_tokens)
+        client = OpenAI(api_key=api_key, max_retries=0, timeout=OPENAI_TIMEOUT_SECONDS)
+        limiter = RateLimiter(requests_per_minute, tokens_per_minute)
         
-        # Add summary to article
-        article_with_summary = article.copy()
-        article_with_summary['summary'] = summary
-        summarized_articles.append(article_with_summary)
+        if batch_mode:
+            batches = plan_batches(articles, pending, max_tokens)
+            print(f"Batch mode: {len(pending)} articles in {len(batches)} requests")
+            jobs = [(_summarize_batch_with_fallback, (client, articles, batch, model, max_tokens, limiter, deadline))
+                    for batch in batches]
+        else:
+            jobs = [(_summarize_one, (client, articles, index, model, max_tokens, limiter, deadline))
+                    for index in pending]
         
-        print(f"  ✓ Summary generated ({len(summary)} characters)")
-        print()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [executor.submit(function, *args) for function, args in jobs]
+            done = 0
+            
+            for future in as_completed(futures):
+                for index, summary in future.result():
+                    done += 1
+                    summaries[index] = summary
+                    print(f"[{done}/{len(pending)}] Summarized: {articles[index]['title'][:60]}... "
+                          f"({len(summary)} characters)")
+                    
+                    if reusable_summary(summary):
+                        if cache is not None:
+                            cache.put(keys[index], summary)
+                        if checkpoint is not None:
+                            checkpoint.save_summary(articles[index], summary)
         
-        # Rate limiting: small delay between requests to avoid hitting limits
-        if i < len(articles):
-            time.sleep(0.5)  # 0.5 second delay between requests
+        log_prompt_savings(tokens_before, tokens_after, trimmed)
+    
+    for index, representative in followers.items():
+        summaries[index] = summaries[representative]
+        if reusable_summary(summaries[index]):
+            if cache is not None:
+                cache.put(keys[index], summaries[index])
+            if checkpoint is not None:
+                checkpoint.save_summary(articles[index], summaries[index])
+    
+    failed = sum(1 for summary in summaries if summary.startswith(ERROR_PREFIX))
+    if failed:
+        print(f"⚠️  {failed} summaries failed and were replaced with local extractive summaries")
+    print()
     
-    return summarized_articles
+    return [with_summary(article, summary) for article, summary in zip(articles, summaries)]
 
 
 def main():
@@ -131,34 +960,34 @@ def main():
         print("Get your key at: https://platform.openai.com/api-keys")
         return
     
-    # Load articles from Part 1
-    input_file = "fetched_articles.json"
-    
-    try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            articles = json.load(f)
-    except FileNotFoundError:
-        print(f"⚠️  ERROR: '{input_file}' not found!")
-        print("Please run 'fetch_news.py' first to fetch articles.")
-        return
-    except json.JSONDecodeError:
-        print(f"⚠️  ERROR: '{input_file}' is not valid JSON")
-        return
+    # Load the latest batch of articles from Part 1
+    store = ArticleStore()
+    batch = store.latest_batch()
     
-    if not articles:
-        print("⚠️  No articles found in the file.")
+    if batch is None:
+        store.close()
+        print(f"⚠️  ERROR: No articles in '{store.path}'!")
+        print("Please run 'fetch_news.py' first to fetch articles")
+        print("(or 'python article_store.py --migrate' to import an old fetched_articles.json).")
         return
     
-    print(f"Loaded {len(articles)} articles from '{input_file}'")
+    articles = store.load(batch=batch)
+    print(f"Loaded {len(articles)} articles from '{store.path}' (batch {batch})")
     print()
     
     # Summarize all articles
+    cache = open_summary_cache()
     summarized_articles = summarize_all_articles(
         articles,
         OPENAI_API_KEY,
         OPENAI_MODEL,
-        MAX_SUMMARY_TOKENS
+        MAX_SUMMARY_TOKENS,
+        cache=cache,
+        deadline=summary_deadline()
     )
+    if cache is not None:
+        print(f"Cache hit rate: {cache.hit_rate:.0%}")
+        cache.close()
     
     # Display results
     print("=" * 60)
@@ -178,13 +1007,12 @@ def main():
         print(f"{article['summary']}")
         print(f"\nRead more: {article['url']}")
     
-    # Save summarized articles
-    output_file = "summarized_articles.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(summarized_articles, f, indent=2, ensure_ascii=False)
+    # Save the summaries next to the articles
+    store.add(summarized_articles, batch)
+    store.close()
     
     print("\n" + "=" * 60)
-    print(f"✓ Summarized articles saved to '{output_file}'")
+    print(f"✓ Summarized articles saved to '{store.path}' (batch {batch})")
     print("=" * 60)
 
 
@@ -0,0 +1,127 @@
+"""
+Summary Cache
+Persistent, content-addressed cache of article summaries stored in SQLite
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from metrics import METRICS
+
+
+def cache_key(article, model, max_tokens, prompt_version):
+    """
+    Build the cache key for an article summary
+
+    The key covers everything that changes the model's answer: the article
+    text, the model, the prompt version and the summary length.
+
+    Args:
+        article (dict): Article dictionary with title, description, and content
+        model (str): OpenAI model used for the summary
+        max_tokens (int): Maximum tokens per summary
+        prompt_version (str): Version of the summarization prompt
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    material = json.dumps([
+        article.get("title") or "",
+        article.get("description") or "",
+        article.get("content") or "",
+        model,
+        prompt_version,
+        max_tokens
+    ], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    On-disk summary cache with a time-to-live and least-recently-used eviction
+    """
+
+    def __init__(self, path="summary_cache.db", ttl_seconds=48 * 3600, max_entries=5000):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway cache)
+            ttl_seconds (float): How long a summary stays valid (None = forever)
+            max_entries (int): Maximum number of cached summaries
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries (accessed_at)")
+        self._db.commit()
+
+    def get(self, key):
+        """
+        Look up a summary
+
+        Returns:
+            str or None: Cached summary, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT summary, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._db.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                METRICS.increment("cache_lookups_total", cache="summary", result="miss")
+                return None
+
+            self._db.execute("UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            METRICS.increment("cache_lookups_total", cache="summary", result="hit")
+            return row[0]
+
+    def put(self, key, summary):
+        """Store a summary and evict the least recently used entries if over size"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, summary, now, now)
+            )
+            self._db.execute("""
+                DELETE FROM summaries WHERE key IN (
+                    SELECT key FROM summaries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups in this run that were served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,75 @@
+"""
+Topic Watermarks
+Remembers, per topic, the newest article seen and which URLs were already processed
+"""
+
+import json
+import os
+import threading
+
+
+class WatermarkStore:
+    """
+    JSON-backed store of per-topic fetch watermarks
+
+    For every topic it keeps the newest `publishedAt` timestamp seen and a
+    bounded list of recently seen URLs. NewsAPI's `from=` filter has
+    second granularity and is inclusive, so the URL list is what stops the
+    article sitting exactly on the watermark from being processed twice.
+    """
+
+    def __init__(self, path="watermarks.json", max_urls_per_topic=500):
+        """
+        Args:
+            path (str): JSON file holding the watermarks
+            max_urls_per_topic (int): How many seen URLs to remember per topic
+        """
+        self.path = path
+        self.max_urls_per_topic = max_urls_per_topic
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._topics = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._topics = {}
+
+    def since(self, topic):
+        """
+        Returns:
+            str or None: Newest publishedAt seen for the topic (ISO 8601)
+        """
+        with self._lock:
+            return self._topics.get(topic, {}).get("latest")
+
+    def is_seen(self, topic, url):
+        """Return True if `url` was already recorded for `topic`"""
+        with self._lock:
+            return url in self._topics.get(topic, {}).get("seen", ())
+
+    def record(self, topic, articles):
+        """
+        Advance a topic's watermark past the given articles
+
+        Args:
+            topic (str): Topic the articles were fetched for
+            articles (list): Article dictionaries with url and published_at
+        """
+        with self._lock:
+            entry = self._topics.setdefault(topic, {"latest": None, "seen": []})
+            seen = entry["seen"]
+            for article in articles:
+                published_at = article.get("published_at") or None
+                # ISO 8601 UTC timestamps compare correctly as strings
+                if published_at and (entry["latest"] is None or published_at > entry["latest"]):
+                    entry["latest"] = published_at
+                if article.get("url") and article["url"] not in seen:
+                    seen.append(article["url"])
+            del seen[:-self.max_urls_per_topic]
+
+    def save(self):
+        """Write the watermarks to disk atomically"""
+        with self._lock:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._topics, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)